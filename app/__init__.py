@@ -1,13 +1,15 @@
 # app/__init__.py
 import os
+import sqlite3  # noqa: F401  (lihat catatan di bawah)
 from flask import Flask
 from .config import config_by_name, Config  # Pastikan Config diimpor jika merujuknya
 from .extensions import db, migrate, jwt
 
-# --- TAMBAHKAN IMPOR UNTUK ML ---
-from . import ml_services  # Impor modul ml_services
-
-# --- AKHIR IMPOR ML ---
+# Catatan: ml_services (dan TensorFlow) sengaja TIDAK diimpor di sini agar proses
+# yang tidak memakai ML (flask db upgrade, test, worker non-ML) tetap cepat start.
+# sqlite3 justru diimpor lebih dulu: TensorFlow membawa SQLite sendiri tanpa FTS5,
+# dan library itulah yang dipakai jika TensorFlow dimuat sebelum sqlite3
+# (index pencarian konten di SQLite membutuhkan FTS5).
 
 
 def create_app(config_name=None):
@@ -21,6 +23,11 @@ def create_app(config_name=None):
     app.config.from_object(selected_config)
     print(f" * Loading configuration: {config_name}")
 
+    # Serialisasi JSON respons memakai orjson (fallback ke json stdlib)
+    from .core.utils import OrjsonProvider
+
+    app.json = OrjsonProvider(app)
+
     # Pastikan folder upload ada
     upload_folder = app.config.get("UPLOAD_FOLDER")
     if upload_folder and not os.path.exists(upload_folder):
@@ -39,10 +46,26 @@ def create_app(config_name=None):
     )
 
     # --- MEMUAT MODEL ML SAAT STARTUP ---
+    # Default "lazy": model (dan TensorFlow) baru dimuat saat endpoint /ml/* pertama kali
+    # dipakai. Set ML_MODEL_LOADING=eager untuk memuat model di sini saat startup,
+    # atau ML_MODEL_LOADING=background untuk memuat di thread terpisah tanpa memblokir.
     try:
-        # Menggunakan app_context() memastikan konfigurasi aplikasi (seperti logger) tersedia
-        with app.app_context():
-            ml_services.load_model_and_preprocessors()
+        if app.config.get("ML_MODEL_LOADING") == "eager":
+            from . import ml_services
+
+            # Menggunakan app_context() memastikan konfigurasi aplikasi (seperti logger) tersedia
+            with app.app_context():
+                ml_services.load_model_and_preprocessors()
+        elif app.config.get("ML_MODEL_LOADING") == "background":
+            from . import ml_services
+
+            ml_services.start_background_model_load(app)
+
+        if app.config.get("ML_RELOAD_ON_SIGHUP"):
+            from . import ml_services
+
+            # `kill -HUP <pid>` memuat ulang versi model di file CURRENT registry
+            ml_services.install_reload_signal_handler(app)
     except FileNotFoundError as e:
         app.logger.error(
             f"PENTING: File model ML tidak ditemukan. Aplikasi mungkin tidak berfungsi dengan benar untuk fitur ML. Error: {e}"
@@ -58,10 +81,17 @@ def create_app(config_name=None):
         # raise SystemExit(f"Kritis: Model ML gagal dimuat: {str(e)}")
     # --- AKHIR MEMUAT MODEL ML ---
 
+    from .contents.models import include_schema_object
+
     db.init_app(app)
-    migrate.init_app(app, db)
+    # Tabel index pencarian konten dikelola lewat DDL khusus database, bukan autogenerate
+    migrate.init_app(app, db, include_object=include_schema_object)
     jwt.init_app(app)
 
+    from .core.cache import init_response_cache
+
+    init_response_cache(app)
+
     # --- REGISTRASI BLUEPRINT ---
     from .auth.routes import auth_bp
 
@@ -86,6 +116,19 @@ def create_app(config_name=None):
     from .ml_routes import ml_bp  # <-- Impor ml_bp
 
     app.register_blueprint(ml_bp)  # <-- Daftarkan ml_bp
+
+    from .analytics.routes import analytics_bp
+
+    app.register_blueprint(analytics_bp)
+
+    from .health.routes import health_bp
+
+    app.register_blueprint(health_bp)
+
+    # Perintah CLI ML (`flask ml ...`)
+    from .ml_cli import ml_cli
+
+    app.cli.add_command(ml_cli)
     # --- AKHIR REGISTRASI BLUEPRINT ---
 
     # Impor model database di dalam konteks aplikasi agar terdeteksi oleh Flask-Migrate
@@ -0,0 +1,86 @@
+# app/analytics/routes.py
+from flask import Blueprint, request, jsonify, current_app
+from app.ml_services import InferenceOverloadedError, ModelUnavailableError
+from .services import (
+    EmbeddingIndexStaleError,
+    is_embedding_index_enabled,
+    search_contents,
+    similar_contents,
+)
+
+# Blueprint untuk analisis & rekomendasi konten
+analytics_bp = Blueprint("analytics_bp", __name__, url_prefix="/analytics")
+
+
+def _parse_k():
+    """Parameter query "k" (jumlah hasil). Mengembalikan tuple (k, error_message)."""
+    k = request.args.get("k", current_app.config.get("ML_EMBEDDING_SEARCH_K", 10))
+    try:
+        k = int(k)
+    except (TypeError, ValueError):
+        return None, "'k' harus berupa bilangan bulat positif."
+    if k < 1:
+        return None, "'k' harus berupa bilangan bulat positif."
+    return k, None
+
+
+def _service_unavailable(message, retry_after):
+    response = jsonify({"error": message})
+    response.status_code = 503  # Service Unavailable
+    response.headers["Retry-After"] = str(retry_after)
+    return response
+
+
+@analytics_bp.before_request
+def require_embedding_index():
+    if not is_embedding_index_enabled():
+        return (
+            jsonify({"error": "Index embedding dinonaktifkan (ML_EMBEDDING_INDEX_ENABLED)."}),
+            404,
+        )
+    return None
+
+
+@analytics_bp.route("/search", methods=["GET"])
+def semantic_search():
+    """
+    Endpoint pencarian semantik konten: ?q=<teks>&k=10.
+    Hasil diurutkan dari cosine similarity tertinggi terhadap embedding query.
+    """
+    query_text = (request.args.get("q") or "").strip()
+    if not query_text:
+        return jsonify({"error": "Parameter 'q' tidak boleh kosong."}), 400
+    k, error = _parse_k()
+    if error:
+        return jsonify({"error": error}), 400
+
+    try:
+        result = search_contents(query_text, k)
+    except InferenceOverloadedError as e:
+        return _service_unavailable(str(e), e.retry_after)
+    except ModelUnavailableError as e:
+        return _service_unavailable(
+            str(e), current_app.config.get("ML_RETRY_AFTER_SECONDS", 5)
+        )
+    except EmbeddingIndexStaleError as e:
+        return jsonify({"error": str(e)}), 409  # Conflict: index perlu dibangun ulang
+    return jsonify(result), 200
+
+
+@analytics_bp.route("/contents/<string:content_id>/similar", methods=["GET"])
+def get_similar_contents(content_id):
+    """
+    Endpoint rekomendasi: konten yang paling mirip dengan konten ini (?k=10),
+    dihitung dari embedding yang sudah tersimpan di index.
+    """
+    k, error = _parse_k()
+    if error:
+        return jsonify({"error": error}), 400
+
+    result = similar_contents(content_id, k)
+    if result is None:
+        return (
+            jsonify({"error": f"Konten dengan ID {content_id} belum ada di index embedding."}),
+            404,
+        )
+    return jsonify(result), 200
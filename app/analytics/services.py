@@ -0,0 +1,162 @@
+# app/analytics/services.py
+"""
+Pencarian semantik dan rekomendasi "konten serupa" berbasis embedding model
+ML (output layer sebelum layer klasifikasi). Embedding disimpan di
+EmbeddingIndex (lihat app/ml_embeddings.py) dan diperbarui oleh worker
+klasifikasi konten setiap kali konten dibuat/diubah, serta oleh
+`flask ml backfill`.
+"""
+import threading
+
+from flask import current_app
+from sqlalchemy import select
+
+from app import ml_services
+from app.contents.models import Content
+from app.extensions import db
+from app.ml_embeddings import EmbeddingIndex
+
+_embedding_index = None
+_embedding_index_lock = threading.Lock()
+
+
+class EmbeddingIndexStaleError(Exception):
+    """Index dibangun dengan versi model lain; embedding query tidak sebanding."""
+
+
+def is_embedding_index_enabled():
+    return current_app.config.get("ML_EMBEDDING_INDEX_ENABLED", False)
+
+
+def get_embedding_index():
+    """EmbeddingIndex di ML_EMBEDDING_INDEX_DIR, dibuka sekali per proses."""
+    global _embedding_index
+    if _embedding_index is None:
+        with _embedding_index_lock:
+            if _embedding_index is None:
+                _embedding_index = EmbeddingIndex(
+                    current_app.config["ML_EMBEDDING_INDEX_DIR"]
+                )
+    return _embedding_index
+
+
+def index_content_embeddings(content_ids, texts):
+    """
+    Hitung embedding untuk teks klasifikasi konten (satu panggilan batch) lalu
+    simpan ke index. Jika index berisi embedding dari versi model lain, index
+    tidak diubah sampai dibangun ulang dengan `flask ml backfill --restart`.
+    Mengembalikan jumlah konten yang diindeks.
+    """
+    if not content_ids:
+        return 0
+    vectors, model_version = ml_services.embed_texts(texts)
+    index = get_embedding_index()
+    index_version = index.model_version
+    if index_version is not None and index_version != model_version:
+        if index.count:
+            current_app.logger.warning(
+                f"Index embedding berisi versi model {index_version}, model aktif {model_version}; "
+                "jalankan `flask ml backfill --restart` untuk membangun ulang."
+            )
+            return 0
+        index.reset(model_version)
+    index.upsert(content_ids, vectors, model_version=model_version)
+    return len(content_ids)
+
+
+def remove_content_embeddings(content_ids):
+    """
+    Hapus embedding konten yang sudah dihapus dari database. Dipanggil setelah
+    commit, jadi kegagalan (I/O, lock index) hanya dicatat: embedding yang
+    tertinggal tidak pernah muncul di hasil pencarian karena kontennya sudah
+    tidak ada (lihat _with_content_details), dan dibersihkan saat index
+    dibangun ulang dengan `flask ml backfill --restart`.
+    """
+    if not content_ids or not is_embedding_index_enabled():
+        return 0
+    try:
+        return get_embedding_index().remove(content_ids)
+    except Exception as e:
+        current_app.logger.error(
+            f"Gagal menghapus embedding untuk {len(content_ids)} konten: {e}",
+            exc_info=True,
+        )
+        return 0
+
+
+def _search_options(k):
+    config = current_app.config
+    index = get_embedding_index()
+    approximate = index.count >= config.get("ML_EMBEDDING_IVF_MIN_ROWS", 1_000_000)
+    return index, {
+        "k": min(int(k), config.get("ML_EMBEDDING_SEARCH_MAX_K", 100)),
+        "nprobe": config.get("ML_EMBEDDING_IVF_NPROBE", 8),
+        "approximate": approximate,
+    }
+
+
+def _with_content_details(matches):
+    """Lengkapi hasil pencarian (id, skor) dengan judul & tipe konten (satu query IN)."""
+    ids = [content_id for content_id, _ in matches]
+    details = {
+        row.id: row
+        for row in db.session.execute(
+            select(Content.id, Content.title, Content.content_type).where(
+                Content.id.in_(ids)
+            )
+        )
+    }
+    results = []
+    for content_id, score in matches:
+        row = details.get(content_id)
+        if row is None:
+            continue  # Konten sudah dihapus tetapi index belum diperbarui
+        results.append(
+            {
+                "content_id": content_id,
+                "title": row.title,
+                "content_type": row.content_type,
+                "score": round(score, 4),
+            }
+        )
+    return results
+
+
+def search_contents(query_text, k=10):
+    """
+    Pencarian semantik: embedding teks query dibandingkan (cosine) dengan
+    embedding seluruh konten. Melempar EmbeddingIndexStaleError jika index
+    dibangun dengan versi model lain.
+    """
+    vectors, model_version = ml_services.embed_texts([query_text])
+    index, options = _search_options(k)
+    if index.model_version not in (None, model_version):
+        raise EmbeddingIndexStaleError(
+            f"Index embedding dibangun dengan versi model {index.model_version}, "
+            f"sedangkan model aktif {model_version}."
+        )
+    matches, approximate = index.search(vectors[0], **options)
+    return {
+        "query": query_text,
+        "model_version": model_version,
+        "approximate": approximate,
+        "results": _with_content_details(matches),
+    }
+
+
+def similar_contents(content_id, k=10):
+    """
+    Konten yang paling mirip dengan content_id, memakai embedding yang sudah
+    tersimpan di index (tanpa memanggil model). None jika konten belum diindeks.
+    """
+    index, options = _search_options(k)
+    vector = index.get_vector(content_id)
+    if vector is None:
+        return None
+    matches, approximate = index.search(vector, exclude_ids=[content_id], **options)
+    return {
+        "content_id": content_id,
+        "model_version": index.model_version,
+        "approximate": approximate,
+        "results": _with_content_details(matches),
+    }
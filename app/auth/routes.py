@@ -3,6 +3,7 @@ from flask import Blueprint, request, jsonify
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from app.extensions import db
+from app.core.utils import USER
 from .models import User  # Impor model User dari modul auth
 
 # Buat Blueprint untuk modul auth
@@ -130,17 +131,7 @@ def get_user_profile():
     if not user:
         return jsonify({"msg": "Pengguna tidak ditemukan"}), 404
 
-    return (
-        jsonify(
-            {
-                "id": str(user.id),
-                "username": user.username,
-                "email": user.email,
-                "created_at": user.created_at.isoformat() + "Z",
-            }
-        ),
-        200,
-    )
+    return jsonify(USER(user)), 200
 
 
 # Anda bisa menambahkan endpoint lain di sini, misalnya untuk logout, refresh token, dll.
@@ -32,6 +32,9 @@ class Category(db.Model):
     # Relasi ke content_categories (akan dibuat nanti di model Content)
     # contents = db.relationship('ContentCategory', back_populates='category', cascade="all, delete-orphan")
 
+    # Index untuk paginasi keyset GET /categories (urutan name, id)
+    __table_args__ = (db.Index("ix_categories_name_id", "name", "id"),)
+
     def __repr__(self):
         return f"<Category {self.name}>"
 
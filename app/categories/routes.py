@@ -2,6 +2,12 @@
 from flask import Blueprint, request, jsonify
 from app.extensions import db
 from app.auth.models import User  # Untuk relasi atau otorisasi di masa depan
+from app.core.cache import add_cache_tags, cached_response, invalidate_cache_tags
+from app.core.etag import bump_resource_versions, conditional_get
+from app.core.fieldsets import InvalidFieldsetError, batch_relation, parse_fieldset
+from app.core.pagination import InvalidPaginationError, paginate_keyset
+from app.core.streaming import get_stream_format, stream_keyset
+from app.core.utils import CATEGORY
 from .models import Category  # Impor model Category
 from flask_jwt_extended import (
     jwt_required,
@@ -11,6 +17,27 @@ from flask_jwt_extended import (
 # Buat Blueprint untuk modul categories
 categories_bp = Blueprint("categories_bp", __name__, url_prefix="/categories")
 
+_CATEGORY_UPDATED = CATEGORY.only(
+    "id", "name", "description", "parent_id", "updated_at"
+)
+
+
+def _category_fieldset(required=()):
+    """Fieldset ?fields= / ?expand=children (subkategori, urut nama)."""
+    return parse_fieldset(
+        Category,
+        CATEGORY,
+        {
+            "children": batch_relation(
+                Category,
+                Category.parent_id,
+                CATEGORY,
+                order_by=(Category.name, Category.id),
+            )
+        },
+        required=required,
+    )
+
 
 @categories_bp.route("", methods=["POST"])
 @jwt_required()  # Contoh: Hanya user yang login bisa membuat kategori
@@ -54,8 +81,9 @@ def create_category():
 
     try:
         db.session.add(new_category)
+        bump_resource_versions("categories")
         db.session.commit()
-        category_id_str = str(new_category.id)
+        invalidate_cache_tags("categories")
     except Exception as e:
         db.session.rollback()
         return jsonify({"msg": "Gagal membuat kategori", "error": str(e)}), 500
@@ -64,14 +92,7 @@ def create_category():
         jsonify(
             {
                 "msg": "Kategori berhasil dibuat",
-                "category": {
-                    "id": category_id_str,
-                    "name": new_category.name,
-                    "description": new_category.description,
-                    "parent_id": new_category.parent_id,  # Akan null jika tidak ada parent
-                    "created_at": new_category.created_at.isoformat() + "Z",
-                    "updated_at": new_category.updated_at.isoformat() + "Z",
-                },
+                "category": CATEGORY(new_category),  # parent_id null jika tanpa parent
             }
         ),
         201,
@@ -79,58 +100,54 @@ def create_category():
 
 
 @categories_bp.route("", methods=["GET"])
+@conditional_get("categories")
+@cached_response(tags=["categories"])
 def get_all_categories():
     """
-    Endpoint untuk mendapatkan daftar semua kategori.
-    Nantinya bisa ditambahkan filter dan paginasi.
+    Endpoint untuk mendapatkan daftar kategori, urut nama.
+    Paginasi cursor: ?limit=50&cursor=<next_cursor dari halaman sebelumnya>.
+    Ekspor seluruh data: ?stream=ndjson|json (lihat app.core.streaming).
+    Mendukung If-None-Match: 304 tanpa memuat data jika kategori tidak berubah.
+    Pilih field dengan ?fields=id,name dan muat subkategori dengan
+    ?expand=children (lihat app.core.fieldsets).
     """
-    # Untuk sementara, ambil semua kategori
-    # Pertimbangkan paginasi untuk data yang besar
-    categories = Category.query.order_by(Category.name).all()
-
-    output = []
-    for category in categories:
-        category_data = {
-            "id": str(category.id),
-            "name": category.name,
-            "description": category.description,
-            "parent_id": str(category.parent_id) if category.parent_id else None,
-            "created_at": category.created_at.isoformat() + "Z",
-            "updated_at": category.updated_at.isoformat() + "Z",
-            # Anda bisa menambahkan jumlah konten atau subkategori jika diperlukan
-        }
-        output.append(category_data)
-
-    return jsonify(output), 200
+    # Urutan (name, id) memakai index ix_categories_name_id
+    columns = (Category.name, Category.id)
+    try:
+        fieldset = _category_fieldset(required=[column.key for column in columns])
+        query = fieldset.apply(Category.query)
+        stream_format = get_stream_format()
+        if stream_format:
+            return stream_keyset(query, columns, fieldset, stream_format)
+        page = paginate_keyset(query, columns)
+    except (InvalidPaginationError, InvalidFieldsetError) as e:
+        return jsonify({"msg": str(e)}), 400
+
+    return jsonify(page.to_dict(fieldset)), 200
 
 
 @categories_bp.route("/<string:category_id>", methods=["GET"])
+@cached_response(tags=lambda category_id: [f"category:{category_id}"])
 def get_category_by_id(category_id):
     """
     Endpoint untuk mendapatkan detail satu kategori berdasarkan ID.
+    Mendukung ?fields= dan ?expand=children seperti GET /categories.
     """
-    category = Category.query.get(category_id)
+    try:
+        fieldset = _category_fieldset()
+    except InvalidFieldsetError as e:
+        return jsonify({"msg": str(e)}), 400
+    if "children" in fieldset.keys:
+        # Subkategori bisa berubah lewat kategori lain: ikut basi di setiap perubahan
+        # (versi tag dicatat sebelum subkategori dimuat)
+        add_cache_tags("categories")
+    category = db.session.get(
+        Category, category_id, options=fieldset.query_options(), populate_existing=True
+    )
     if not category:
         return jsonify({"msg": "Kategori tidak ditemukan"}), 404
 
-    # Anda bisa menambahkan logika untuk menampilkan subkategori atau konten terkait
-    # Misalnya, mengambil children:
-    # children = [{"id": str(child.id), "name": child.name} for child in category.children.all()]
-
-    return (
-        jsonify(
-            {
-                "id": str(category.id),
-                "name": category.name,
-                "description": category.description,
-                "parent_id": str(category.parent_id) if category.parent_id else None,
-                "created_at": category.created_at.isoformat() + "Z",
-                "updated_at": category.updated_at.isoformat() + "Z",
-                # "children": children # Jika ingin menampilkan subkategori
-            }
-        ),
-        200,
-    )
+    return jsonify(fieldset(category)), 200
 
 
 @categories_bp.route("/<string:category_id>", methods=["PUT"])
@@ -190,24 +207,19 @@ def update_category(category_id):
             category.parent_id = None
 
     try:
+        bump_resource_versions("categories")
         db.session.commit()
     except Exception as e:
         db.session.rollback()
         return jsonify({"msg": "Gagal memperbarui kategori", "error": str(e)}), 500
+    # Detail kategori, daftar kategori, dan detail konten yang memuat nama kategori ini
+    invalidate_cache_tags("categories", f"category:{category_id}")
 
     return (
         jsonify(
             {
                 "msg": "Kategori berhasil diperbarui",
-                "category": {
-                    "id": str(category.id),
-                    "name": category.name,
-                    "description": category.description,
-                    "parent_id": (
-                        str(category.parent_id) if category.parent_id else None
-                    ),
-                    "updated_at": category.updated_at.isoformat() + "Z",
-                },
+                "category": _CATEGORY_UPDATED(category),
             }
         ),
         200,
@@ -241,8 +253,21 @@ def delete_category(category_id):
         #     child.parent_id = None
         # db.session.commit() # Commit perubahan pada children dulu jika ada
 
+        # parent_id subkategori di-set NULL oleh database: detailnya ikut berubah
+        child_ids = [
+            child_id
+            for (child_id,) in db.session.query(Category.id).filter_by(
+                parent_id=category_id
+            )
+        ]
         db.session.delete(category)
+        bump_resource_versions("categories")
         db.session.commit()
+        invalidate_cache_tags(
+            "categories",
+            f"category:{category_id}",
+            *[f"category:{child_id}" for child_id in child_ids],
+        )
     except Exception as e:
         db.session.rollback()
         # Periksa apakah error disebabkan oleh foreign key constraint dari tabel lain
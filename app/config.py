@@ -12,6 +12,27 @@ basedir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 load_dotenv(os.path.join(basedir, ".env"))
 
 
+def _env_bool(name, default=False):
+    """Baca environment variable sebagai boolean ("1", "true", "yes", "on")."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int_list(name, default):
+    """Baca environment variable berisi daftar angka yang dipisah koma, mis. "16,32,64"."""
+    value = os.environ.get(name)
+    if not value:
+        return list(default)
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def _env_list(name):
+    """Baca environment variable berisi daftar teks yang dipisah koma."""
+    return [part.strip() for part in os.environ.get(name, "").split(",") if part.strip()]
+
+
 class Config:
     """
     Konfigurasi dasar untuk aplikasi Flask.
@@ -68,6 +89,208 @@ class Config:
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # Batas ukuran file: 16MB
     # --- AKHIR KONFIGURASI UPLOAD FILE ---
 
+    # --- KONFIGURASI PAGINASI ---
+    # Endpoint daftar memakai paginasi cursor (?limit=&cursor=); limit default & maksimum
+    PAGINATION_DEFAULT_LIMIT = int(os.environ.get("PAGINATION_DEFAULT_LIMIT", 50))
+    PAGINATION_MAX_LIMIT = int(os.environ.get("PAGINATION_MAX_LIMIT", 200))
+    # Mode ekspor ?stream=ndjson|json: jumlah baris per batch yield_per & per potongan respons
+    STREAM_CHUNK_SIZE = int(os.environ.get("STREAM_CHUNK_SIZE", 500))
+    # --- AKHIR KONFIGURASI PAGINASI ---
+
+    # --- KONFIGURASI IMPOR KONTEN MASSAL ---
+    # Jumlah item maksimum per request POST /contents/bulk
+    CONTENTS_BULK_MAX_ITEMS = int(os.environ.get("CONTENTS_BULK_MAX_ITEMS", 5000))
+    # --- AKHIR KONFIGURASI IMPOR KONTEN MASSAL ---
+
+    # --- KONFIGURASI CACHE RESPONS ---
+    # Respons GET /categories, /categories/<id>, dan /contents/<id> di-cache dan
+    # diinvalidasi oleh handler tulis. Backend "memory" (LRU per proses) atau
+    # "redis" (dipakai bersama antar proses, butuh paket redis).
+    RESPONSE_CACHE_ENABLED = _env_bool("RESPONSE_CACHE_ENABLED", True)
+    RESPONSE_CACHE_BACKEND = os.environ.get("RESPONSE_CACHE_BACKEND", "memory")
+    RESPONSE_CACHE_REDIS_URL = os.environ.get(
+        "RESPONSE_CACHE_REDIS_URL", "redis://localhost:6379/0"
+    )
+    RESPONSE_CACHE_KEY_PREFIX = os.environ.get("RESPONSE_CACHE_KEY_PREFIX", "respcache:")
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", 10000))
+    RESPONSE_CACHE_TTL_SECONDS = float(os.environ.get("RESPONSE_CACHE_TTL_SECONDS", 300))
+    # Backend memory: versi tag disimpan di tabel resource_versions ("database",
+    # default) agar invalidasi dari proses lain (worker gunicorn lain,
+    # `flask ml classify-worker`, `flask ml backfill`) terlihat di semua proses.
+    # "memory" menyimpannya di memori proses; hanya benar untuk satu proses web
+    # tanpa penulis di luar proses itu.
+    RESPONSE_CACHE_TAG_VERSIONS = os.environ.get(
+        "RESPONSE_CACHE_TAG_VERSIONS", "database"
+    ).lower()
+    # Backend memory + RESPONSE_CACHE_TAG_VERSIONS="memory": jumlah versi tag yang
+    # disimpan (default 4x MAX_ENTRIES)
+    RESPONSE_CACHE_MAX_TAGS = int(os.environ.get("RESPONSE_CACHE_MAX_TAGS", 0)) or None
+    # Batas waktu request yang menunggu request lain membangun respons yang sama
+    RESPONSE_CACHE_WAIT_TIMEOUT_SECONDS = float(
+        os.environ.get("RESPONSE_CACHE_WAIT_TIMEOUT_SECONDS", 10)
+    )
+    # --- AKHIR KONFIGURASI CACHE RESPONS ---
+
+    # --- KONFIGURASI PENCARIAN KONTEN ---
+    # GET /contents/search: konfigurasi text search PostgreSQL (regconfig) untuk tsvector.
+    # Dokumen yang sudah terindex tetap memakai konfigurasi lama sampai kontennya diubah.
+    CONTENT_SEARCH_TS_CONFIG = os.environ.get("CONTENT_SEARCH_TS_CONFIG", "simple")
+    # --- AKHIR KONFIGURASI PENCARIAN KONTEN ---
+
+    # --- KONFIGURASI PEMUATAN MODEL ML ---
+    # "lazy": model & TensorFlow dimuat saat endpoint ML pertama kali dipakai (default)
+    # "eager": model dimuat saat create_app() dipanggil
+    # "background": model dimuat di thread terpisah; route non-ML langsung melayani
+    # request dan /ml/predict mengembalikan 503 + Retry-After sampai model siap
+    ML_MODEL_LOADING = os.environ.get("ML_MODEL_LOADING", "lazy").lower()
+    ML_RETRY_AFTER_SECONDS = int(os.environ.get("ML_RETRY_AFTER_SECONDS", 5))
+    # Warm-up: inferensi sintetis setelah model dimuat untuk setiap ukuran batch yang
+    # dilayani, agar request pertama tidak menanggung biaya tracing graph TensorFlow.
+    # ML_WARMUP_BATCH_SIZES kosong = otomatis (1, ML_BATCH_MAX_SIZE, ML_BATCH_ENDPOINT_CHUNK_SIZE)
+    ML_WARMUP_ENABLED = _env_bool("ML_WARMUP_ENABLED", True)
+    ML_WARMUP_RUNS = int(os.environ.get("ML_WARMUP_RUNS", 2))
+    ML_WARMUP_BATCH_SIZES = _env_int_list("ML_WARMUP_BATCH_SIZES", [])
+    # Override path file model (default: ml_models/model_ml.h5 di root proyek)
+    ML_MODEL_PATH = os.environ.get("ML_MODEL_PATH")
+    # Backend inferensi: "keras" (TensorFlow) atau "numpy" (bundle .npz hasil
+    # `flask ml export-numpy`, tanpa TensorFlow sehingga worker lebih ringan)
+    ML_RUNTIME_BACKEND = os.environ.get("ML_RUNTIME_BACKEND", "keras").lower()
+    # Default: path model dengan ekstensi .npz
+    ML_NUMPY_BUNDLE_PATH = os.environ.get("ML_NUMPY_BUNDLE_PATH")
+    # Registry model berversi: <ML_MODEL_REGISTRY_DIR>/<versi>/model_ml.h5. Jika diset,
+    # versi aktif diambil dari ML_MODEL_VERSION, lalu file CURRENT, lalu versi terbaru.
+    # Tanpa registry, model dimuat dari ML_MODEL_PATH seperti sebelumnya.
+    ML_MODEL_REGISTRY_DIR = os.environ.get("ML_MODEL_REGISTRY_DIR")
+    ML_MODEL_VERSION = os.environ.get("ML_MODEL_VERSION")
+    # Muat ulang versi di file CURRENT saat proses menerima SIGHUP (hot-swap tanpa restart)
+    ML_RELOAD_ON_SIGHUP = _env_bool("ML_RELOAD_ON_SIGHUP", False)
+    # ID user (dipisah koma) yang boleh mengganti versi model lewat
+    # POST /ml/models/<versi>/activate. Kosong = endpoint ditolak untuk semua user;
+    # ganti versi lewat `flask ml` + SIGHUP.
+    ML_ADMIN_USER_IDS = _env_list("ML_ADMIN_USER_IDS")
+    # Nama label kelas (JSON) yang dimuat bersama model, dicari di direktori file model
+    # kecuali ML_LABELS_PATH diset. Respons prediksi hanya berisi ML_TOP_K label teratas;
+    # klien boleh meminta top_k lain (maks. ML_TOP_K_MAX) atau include_scores=true.
+    ML_LABELS_FILENAME = os.environ.get("ML_LABELS_FILENAME", "labels.json")
+    ML_LABELS_PATH = os.environ.get("ML_LABELS_PATH")
+    ML_TOP_K = int(os.environ.get("ML_TOP_K", 3))
+    ML_TOP_K_MAX = int(os.environ.get("ML_TOP_K_MAX", 50))
+    # Vocabulary tokenizer (JSON token -> index, atau teks satu token per baris) yang
+    # dimuat bersama model. Sekuens di-padding/dipotong "post" ke ML_MAX_SEQUENCE_LENGTH
+    # (dipakai jika panjang input model tidak tetap). ML_OOV_INDEX=0 membuang token
+    # yang tidak dikenal; ML_VOCAB_NUM_WORDS > 0 memperlakukan index >= nilai itu sebagai OOV.
+    ML_VOCAB_FILENAME = os.environ.get("ML_VOCAB_FILENAME", "vocab.json")
+    ML_VOCAB_PATH = os.environ.get("ML_VOCAB_PATH")
+    ML_MAX_SEQUENCE_LENGTH = int(os.environ.get("ML_MAX_SEQUENCE_LENGTH", 128))
+    ML_OOV_INDEX = int(os.environ.get("ML_OOV_INDEX", 1))
+    ML_TEXT_LOWERCASE = _env_bool("ML_TEXT_LOWERCASE", True)
+    ML_VOCAB_NUM_WORDS = int(os.environ.get("ML_VOCAB_NUM_WORDS", 0)) or None
+    # Mode inferensi: "inprocess" (model di setiap worker web) atau "pool"
+    # (proses inferensi terpisah, satu salinan model per proses, tensor lewat shared memory)
+    ML_INFERENCE_MODE = os.environ.get("ML_INFERENCE_MODE", "inprocess").lower()
+    # Jumlah proses inferensi (kosong = jumlah core CPU)
+    ML_POOL_WORKERS = int(os.environ.get("ML_POOL_WORKERS", 0)) or None
+    # Ukuran segmen shared memory per arah per proses; batch yang lebih besar dipecah
+    ML_POOL_SHM_BYTES = int(os.environ.get("ML_POOL_SHM_BYTES", 16 * 1024 * 1024))
+    ML_POOL_TIMEOUT_SECONDS = float(os.environ.get("ML_POOL_TIMEOUT_SECONDS", 30))
+    # Batas inferensi bersamaan per proses web (0 = tanpa batas). Request yang tidak
+    # mendapat slot dalam ML_INFERENCE_QUEUE_TIMEOUT_MS dibalas 503 + Retry-After.
+    ML_MAX_CONCURRENT_INFERENCES = int(os.environ.get("ML_MAX_CONCURRENT_INFERENCES", 0))
+    ML_INFERENCE_QUEUE_TIMEOUT_MS = float(
+        os.environ.get("ML_INFERENCE_QUEUE_TIMEOUT_MS", 1000)
+    )
+    # Ukuran thread pool TensorFlow (0 = default TF, yang menganggap semua core miliknya)
+    TF_INTRA_OP_THREADS = int(os.environ.get("TF_INTRA_OP_THREADS", 0))
+    TF_INTER_OP_THREADS = int(os.environ.get("TF_INTER_OP_THREADS", 0))
+    # --- AKHIR KONFIGURASI PEMUATAN MODEL ML ---
+
+    # --- KONFIGURASI MICRO-BATCHING ML ---
+    # Request /ml/predict yang datang bersamaan digabung menjadi satu panggilan predict.
+    # Batch di-flush saat berisi ML_BATCH_MAX_SIZE item atau setelah ML_BATCH_MAX_WAIT_MS.
+    ML_BATCHING_ENABLED = _env_bool("ML_BATCHING_ENABLED", True)
+    ML_BATCH_MAX_SIZE = int(os.environ.get("ML_BATCH_MAX_SIZE", 32))
+    ML_BATCH_MAX_WAIT_MS = float(os.environ.get("ML_BATCH_MAX_WAIT_MS", 5))
+    # Batas bucket panjang sekuens (token non-padding) agar input sepanjang mirip dibatch bersama
+    ML_BATCH_LENGTH_BUCKETS = _env_int_list(
+        "ML_BATCH_LENGTH_BUCKETS", [16, 32, 64, 128, 256]
+    )
+    # Potong padding batch ke batas bucket (hanya untuk model dengan panjang input dinamis)
+    ML_BATCH_TRIM_PADDING = _env_bool("ML_BATCH_TRIM_PADDING", False)
+    ML_BATCH_STATS_WINDOW = int(os.environ.get("ML_BATCH_STATS_WINDOW", 500))
+    # Endpoint POST /ml/predict/batch: jumlah item maksimum per request
+    # dan ukuran chunk per panggilan model.predict
+    ML_BATCH_ENDPOINT_MAX_ITEMS = int(os.environ.get("ML_BATCH_ENDPOINT_MAX_ITEMS", 1000))
+    ML_BATCH_ENDPOINT_CHUNK_SIZE = int(
+        os.environ.get("ML_BATCH_ENDPOINT_CHUNK_SIZE", 64)
+    )
+    # --- AKHIR KONFIGURASI MICRO-BATCHING ML ---
+
+    # --- KONFIGURASI CACHE PREDIKSI ML ---
+    # Hasil prediksi untuk input yang sama (setelah normalisasi) disimpan di memori.
+    # Cache otomatis dikosongkan saat model yang berbeda dimuat.
+    ML_CACHE_ENABLED = _env_bool("ML_CACHE_ENABLED", True)
+    ML_CACHE_MAX_ENTRIES = int(os.environ.get("ML_CACHE_MAX_ENTRIES", 10000))
+    ML_CACHE_TTL_SECONDS = float(os.environ.get("ML_CACHE_TTL_SECONDS", 3600))
+    # Samakan dengan preprocessing: True jika tokenizer mengabaikan huruf besar/kecil
+    ML_CACHE_CASE_INSENSITIVE = _env_bool("ML_CACHE_CASE_INSENSITIVE", True)
+    # --- AKHIR KONFIGURASI CACHE PREDIKSI ML ---
+
+    # --- KONFIGURASI KLASIFIKASI OTOMATIS KONTEN ---
+    # Konten yang dibuat/diubah diklasifikasikan di thread background (bukan di jalur
+    # request). Job diambil per ML_AUTO_CLASSIFY_BATCH_SIZE konten dan diprediksi dengan
+    # satu panggilan batch. Label dengan confidence >= ML_AUTO_CLASSIFY_MIN_CONFIDENCE
+    # yang namanya sama dengan sebuah kategori ditambahkan sebagai kategori "auto".
+    # Default mati. Jika dinyalakan, job dicatat bersama perubahan konten dan diproses
+    # oleh proses terpisah `flask ml classify-worker` (satu salinan model untuk
+    # seluruh deployment). ML_AUTO_CLASSIFY_IN_WEB=True menjalankan worker sebagai
+    # thread di setiap proses web: satu thread dan satu salinan model per worker
+    # gunicorn, hanya cocok untuk deployment kecil/development.
+    ML_AUTO_CLASSIFY_ENABLED = _env_bool("ML_AUTO_CLASSIFY_ENABLED", False)
+    ML_AUTO_CLASSIFY_IN_WEB = _env_bool("ML_AUTO_CLASSIFY_IN_WEB", False)
+    ML_AUTO_CLASSIFY_BATCH_SIZE = int(os.environ.get("ML_AUTO_CLASSIFY_BATCH_SIZE", 64))
+    ML_AUTO_CLASSIFY_MIN_CONFIDENCE = float(
+        os.environ.get("ML_AUTO_CLASSIFY_MIN_CONFIDENCE", 0.5)
+    )
+    ML_AUTO_CLASSIFY_TOP_K = int(os.environ.get("ML_AUTO_CLASSIFY_TOP_K", 3))
+    # Worker juga memeriksa antrean secara berkala (job dari proses lain / sebelum restart)
+    ML_AUTO_CLASSIFY_POLL_SECONDS = float(
+        os.environ.get("ML_AUTO_CLASSIFY_POLL_SECONDS", 30)
+    )
+    # Job "processing" yang lebih lama dari ini dianggap macet (worker mati) dan diulang
+    ML_AUTO_CLASSIFY_STALE_SECONDS = int(
+        os.environ.get("ML_AUTO_CLASSIFY_STALE_SECONDS", 600)
+    )
+    ML_AUTO_CLASSIFY_MAX_ATTEMPTS = int(
+        os.environ.get("ML_AUTO_CLASSIFY_MAX_ATTEMPTS", 3)
+    )
+    # Backfill (`flask ml backfill`): klasifikasi ulang seluruh tabel contents per chunk.
+    # Progres dicatat di file checkpoint agar bisa dilanjutkan jika terhenti.
+    ML_BACKFILL_CHUNK_SIZE = int(os.environ.get("ML_BACKFILL_CHUNK_SIZE", 500))
+    ML_BACKFILL_CHECKPOINT_PATH = os.environ.get(
+        "ML_BACKFILL_CHECKPOINT_PATH"
+    ) or os.path.join(basedir, "ml_backfill_checkpoint.json")
+    # Berapa kali chunk yang ditolak karena inferensi sibuk dicoba lagi (jeda naik
+    # dua kali lipat tiap percobaan) sebelum backfill dihentikan.
+    ML_BACKFILL_MAX_RETRIES = int(os.environ.get("ML_BACKFILL_MAX_RETRIES", 5))
+    # --- AKHIR KONFIGURASI KLASIFIKASI OTOMATIS KONTEN ---
+
+    # --- KONFIGURASI INDEX EMBEDDING (PENCARIAN SEMANTIK & KONTEN SERUPA) ---
+    # Embedding konten (output layer sebelum layer klasifikasi) disimpan sebagai matriks
+    # float32 memory-mapped di ML_EMBEDDING_INDEX_DIR dan diperbarui oleh worker klasifikasi.
+    ML_EMBEDDING_INDEX_ENABLED = _env_bool("ML_EMBEDDING_INDEX_ENABLED", True)
+    ML_EMBEDDING_INDEX_DIR = os.environ.get("ML_EMBEDDING_INDEX_DIR") or os.path.join(
+        basedir, "embedding_index"
+    )
+    ML_EMBEDDING_SEARCH_K = int(os.environ.get("ML_EMBEDDING_SEARCH_K", 10))
+    ML_EMBEDDING_SEARCH_MAX_K = int(os.environ.get("ML_EMBEDDING_SEARCH_MAX_K", 100))
+    # Index IVF (perkiraan) dipakai jika sudah dilatih (`flask ml train-ivf`) dan jumlah
+    # baris mencapai ML_EMBEDDING_IVF_MIN_ROWS; NPROBE = jumlah cluster yang diperiksa.
+    ML_EMBEDDING_IVF_MIN_ROWS = int(
+        os.environ.get("ML_EMBEDDING_IVF_MIN_ROWS", 1_000_000)
+    )
+    ML_EMBEDDING_IVF_NPROBE = int(os.environ.get("ML_EMBEDDING_IVF_NPROBE", 8))
+    # --- AKHIR KONFIGURASI INDEX EMBEDDING ---
+
 
 class DevelopmentConfig(Config):
     """Konfigurasi untuk lingkungan pengembangan."""
@@ -87,6 +310,9 @@ class TestingConfig(Config):
     # Nonaktifkan CSRF protection dalam form saat testing (jika menggunakan Flask-WTF)
     # WTF_CSRF_ENABLED = False
     UPLOAD_FOLDER = os.path.join(basedir, "test_uploads")
+    # Test tidak menjalankan thread klasifikasi background
+    ML_AUTO_CLASSIFY_ENABLED = False
+    ML_EMBEDDING_INDEX_ENABLED = False
 
 
 class ProductionConfig(Config):
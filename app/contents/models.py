@@ -1,6 +1,8 @@
 # app/contents/models.py
+import sqlite3
 import uuid
 from datetime import datetime, timezone
+from sqlalchemy import DDL, event
 from app.extensions import db
 
 
@@ -33,6 +35,20 @@ class Content(db.Model):
     categories_assoc = db.relationship(
         "ContentCategory", back_populates="content", cascade="all, delete-orphan"
     )
+    # Tag ternormalisasi dari metadata_tags untuk filter tag (lihat ContentTag)
+    tags = db.relationship(
+        "ContentTag", back_populates="content", cascade="all, delete-orphan"
+    )
+    # Status klasifikasi otomatis (satu baris per konten)
+    classification = db.relationship(
+        "ContentClassification",
+        back_populates="content",
+        uselist=False,
+        cascade="all, delete-orphan",
+    )
+
+    # Index untuk paginasi keyset GET /contents (urutan created_at, id)
+    __table_args__ = (db.Index("ix_contents_created_at_id", "created_at", "id"),)
 
     def __repr__(self):
         return f"<Content {self.title}>"
@@ -53,6 +69,10 @@ class ContentCategory(db.Model):
         nullable=False,
         default=lambda: datetime.now(timezone.utc),
     )
+    # "manual" = dipilih pengguna, "auto" = saran klasifikasi otomatis
+    source = db.Column(
+        db.String(20), nullable=False, default="manual", server_default="manual"
+    )
 
     # Definisikan relasi kembali ke Content dan Category
     content = db.relationship("Content", back_populates="categories_assoc")
@@ -75,3 +95,165 @@ class ContentCategory(db.Model):
     # created_at = db.Column(db.DateTime(timezone=True), nullable=False, default=datetime.utcnow)
     # updated_at = db.Column(db.DateTime(timezone=True), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     # assigned_at = db.Column(db.DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+
+
+# Salinan ternormalisasi metadata_tags (satu baris per pasangan key/value, huruf
+# kecil) agar filter tag GET /contents memakai index, bukan memindai kolom JSON.
+# Disinkronkan dari metadata_tags setiap kali konten dibuat atau diubah.
+class ContentTag(db.Model):
+    __tablename__ = "content_tags"
+
+    content_id = db.Column(
+        db.String(36), db.ForeignKey("contents.id"), primary_key=True
+    )
+    # Key dict metadata_tags; "" untuk tag dari list atau nilai tunggal
+    key = db.Column(db.String(100), primary_key=True, default="")
+    value = db.Column(db.String(255), primary_key=True)
+
+    content = db.relationship("Content", back_populates="tags")
+
+    __table_args__ = (
+        # tags_any / tags_all (berdasarkan nilai) dan tag=key:value
+        db.Index("ix_content_tags_value_content_id", "value", "content_id"),
+        db.Index("ix_content_tags_key_value_content_id", "key", "value", "content_id"),
+    )
+
+    def __repr__(self):
+        return f"<ContentTag content_id={self.content_id} {self.key}={self.value}>"
+
+
+# Hasil dan status klasifikasi otomatis sebuah konten. Baris berstatus "pending"
+# sekaligus berfungsi sebagai antrean job untuk worker klasifikasi di background.
+class ContentClassification(db.Model):
+    __tablename__ = "content_classifications"
+
+    content_id = db.Column(
+        db.String(36), db.ForeignKey("contents.id"), primary_key=True
+    )
+    # "pending" | "processing" | "done" | "failed"
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    # Token worker yang sedang memproses baris ini (mencegah dua worker memproses baris yang sama)
+    claim_token = db.Column(db.String(36), index=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    model_version = db.Column(db.String(64))
+    predicted_category = db.Column(db.String(150))
+    confidence = db.Column(db.Float)
+    top_k = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    requested_at = db.Column(
+        db.DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
+    started_at = db.Column(db.DateTime(timezone=True))
+    completed_at = db.Column(db.DateTime(timezone=True))
+
+    content = db.relationship("Content", back_populates="classification")
+
+    __table_args__ = (
+        db.Index(
+            "ix_content_classifications_status_requested_at", "status", "requested_at"
+        ),
+    )
+
+    def __repr__(self):
+        return f"<ContentClassification content_id={self.content_id} status={self.status}>"
+
+
+# Index full-text konten untuk GET /contents/search. Bukan model ORM karena
+# bentuknya bergantung database: tabel virtual FTS5 di SQLite, tabel tsvector
+# dengan index GIN di PostgreSQL. Isinya disinkronkan oleh app.contents.search.
+CONTENT_SEARCH_TABLE = "content_search_index"
+# SQLite: pemetaan content_id -> rowid FTS5 yang stabil. Kolom content_id di
+# tabel FTS5 tidak ter-index (UNINDEXED), sehingga hapus/tulis ulang dokumen
+# dilakukan lewat rowid agar tidak memindai seluruh index.
+CONTENT_SEARCH_DOCS_TABLE = f"{CONTENT_SEARCH_TABLE}_docs"
+
+
+def sqlite_supports_fts5():
+    """
+    Apakah library SQLite yang dimuat proses ini mendukung FTS5. Tidak selalu:
+    TensorFlow membawa SQLite sendiri tanpa FTS5 yang dipakai jika ia diimpor
+    sebelum modul sqlite3 (lihat app/__init__.py).
+    """
+    connection = sqlite3.connect(":memory:")
+    try:
+        return bool(
+            connection.execute(
+                "SELECT sqlite_compileoption_used('ENABLE_FTS5')"
+            ).fetchone()[0]
+        )
+    finally:
+        connection.close()
+
+
+def _fts5_available(ddl, target, bind, **kw):
+    return bind.dialect.name == "sqlite" and sqlite_supports_fts5()
+
+
+event.listen(
+    db.metadata,
+    "after_create",
+    DDL(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {CONTENT_SEARCH_TABLE} USING fts5("
+        "content_id UNINDEXED, title, body, tags, "
+        "tokenize = 'unicode61 remove_diacritics 2')"
+    ).execute_if(callable_=_fts5_available),
+)
+event.listen(
+    db.metadata,
+    "after_create",
+    DDL(
+        f"CREATE TABLE IF NOT EXISTS {CONTENT_SEARCH_DOCS_TABLE} ("
+        "doc_id INTEGER PRIMARY KEY, content_id VARCHAR(36) NOT NULL UNIQUE)"
+    ).execute_if(callable_=_fts5_available),
+)
+event.listen(
+    db.metadata,
+    "after_create",
+    DDL(
+        f"CREATE TABLE IF NOT EXISTS {CONTENT_SEARCH_TABLE} ("
+        "content_id VARCHAR(36) PRIMARY KEY "
+        "REFERENCES contents (id) ON DELETE CASCADE, "
+        "document TSVECTOR NOT NULL)"
+    ).execute_if(dialect="postgresql"),
+)
+event.listen(
+    db.metadata,
+    "after_create",
+    DDL(
+        f"CREATE INDEX IF NOT EXISTS ix_{CONTENT_SEARCH_TABLE}_document "
+        f"ON {CONTENT_SEARCH_TABLE} USING GIN (document)"
+    ).execute_if(dialect="postgresql"),
+)
+event.listen(
+    db.metadata,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {CONTENT_SEARCH_TABLE}").execute_if(
+        callable_=_fts5_available
+    ),
+)
+event.listen(
+    db.metadata,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {CONTENT_SEARCH_DOCS_TABLE}").execute_if(
+        callable_=_fts5_available
+    ),
+)
+event.listen(
+    db.metadata,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {CONTENT_SEARCH_TABLE}").execute_if(
+        dialect="postgresql"
+    ),
+)
+
+
+def include_schema_object(object, name, type_, reflected, compare_to):
+    """
+    Filter autogenerate Alembic: abaikan tabel index pencarian (beserta tabel
+    shadow FTS5) yang dikelola di luar metadata ORM.
+    """
+    if type_ == "table" and name and name.startswith(CONTENT_SEARCH_TABLE):
+        return False
+    return True
@@ -1,15 +1,181 @@
 # app/contents/routes.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload, selectinload
 from app.extensions import db
 from app.auth.models import User
 from app.categories.models import Category
-from .models import Content, ContentCategory
+from .models import Content, ContentCategory, ContentTag
+from app.analytics.services import remove_content_embeddings
+from app.core.cache import (
+    add_cache_tags,
+    building_cached_response,
+    cached_response,
+    invalidate_cache_tags,
+)
+from app.core.fieldsets import (
+    InvalidFieldsetError,
+    Relation,
+    batch_relation,
+    parse_fieldset,
+)
+from app.core.pagination import (
+    InvalidPaginationError,
+    paginate_keyset,
+    parse_limit,
+    parse_offset,
+)
+from app.core.streaming import get_stream_format, stream_keyset
+from app.core.utils import CONTENT, FILE
+from app.files.models import File
+from .search import (
+    index_contents,
+    index_new_contents,
+    remove_contents,
+    search_content_ids,
+)
+from .services import (
+    bulk_create_contents,
+    enqueue_content_classification,
+    get_classification_status,
+    normalize_tag,
+    notify_classification_worker,
+    sync_content_tags,
+)
 from flask_jwt_extended import jwt_required, get_jwt_identity
 import uuid  # Untuk memastikan ID konsisten jika dibuat manual
 
 # Buat Blueprint untuk modul contents
 contents_bp = Blueprint("contents_bp", __name__, url_prefix="/contents")
 
+# Eager loading asosiasi kategori beserta kategorinya, agar serialisasi
+# `categories` tidak memicu lazy load per konten (N+1 query).
+# - daftar konten: selectinload = satu query tambahan untuk semua konten di halaman
+# - satu konten: joinedload = konten, asosiasi, dan kategori dalam satu query
+_CATEGORIES_SELECTIN = selectinload(Content.categories_assoc).joinedload(
+    ContentCategory.category
+)
+_CATEGORIES_JOINED = joinedload(Content.categories_assoc).joinedload(
+    ContentCategory.category
+)
+
+
+def _get_content_with_categories(content_id):
+    """
+    Satu konten beserta kategorinya (satu query), atau None jika tidak ada.
+    populate_existing: objek yang sudah expired setelah commit ikut dimuat ulang
+    dengan eager loading, bukan lazy load per atribut.
+    """
+    return db.session.get(
+        Content, content_id, options=[_CATEGORIES_JOINED], populate_existing=True
+    )
+
+
+# File yang melekat pada konten (?expand=files), tanpa data milik pengunggah
+_CONTENT_FILE = FILE.only(
+    "id",
+    "file_name_server",
+    "original_file_name",
+    "file_type",
+    "file_size_bytes",
+    "uploaded_at",
+    "download_url",
+)
+_FILES_RELATION = batch_relation(
+    File, File.content_id, _CONTENT_FILE, order_by=(File.uploaded_at, File.id)
+)
+
+
+def _content_fieldset(categories_option, required=()):
+    """
+    Fieldset ?fields= / ?expand= untuk endpoint baca konten. Kategori tetap
+    dimuat secara default (bentuk respons lama) lewat `categories_option`;
+    file hanya dimuat jika diminta dengan ?expand=files.
+    """
+    return parse_fieldset(
+        Content,
+        CONTENT,
+        {
+            "categories": Relation(option=categories_option, default=True),
+            "files": _FILES_RELATION,
+        },
+        required=required,
+    )
+
+
+_CONTENT_UPDATED = CONTENT.only(
+    "id",
+    "title",
+    "content_type",
+    "data_url",
+    "metadata_tags",
+    "categories",
+    "updated_at",
+)
+
+
+def _tag_values(raw):
+    """Daftar tag dari parameter berformat "a,b,c" (dinormalisasi, tanpa duplikat)."""
+    values = (normalize_tag(value) for value in (raw or "").split(","))
+    return list(dict.fromkeys(value for value in values if value))
+
+
+def _apply_tag_filters(query):
+    """
+    Filter tag GET /contents lewat tabel content_tags (ber-index):
+    ?tags_any=a,b (salah satu), ?tags_all=a,b (semuanya), dan ?tag=key:value
+    (boleh diulang, semuanya harus cocok). Mengembalikan tuple (query, error_message).
+    """
+    tags_any = _tag_values(request.args.get("tags_any"))
+    if tags_any:
+        query = query.filter(
+            Content.id.in_(
+                select(ContentTag.content_id).where(ContentTag.value.in_(tags_any))
+            )
+        )
+
+    tags_all = _tag_values(request.args.get("tags_all"))
+    if tags_all:
+        query = query.filter(
+            Content.id.in_(
+                select(ContentTag.content_id)
+                .where(ContentTag.value.in_(tags_all))
+                .group_by(ContentTag.content_id)
+                .having(func.count(func.distinct(ContentTag.value)) == len(tags_all))
+            )
+        )
+
+    for raw in request.args.getlist("tag"):
+        key, separator, value = raw.partition(":")
+        key, value = normalize_tag(key) or "", normalize_tag(value)
+        if not separator or not value:
+            return None, "Parameter 'tag' harus berformat key:value"
+        query = query.filter(
+            Content.id.in_(
+                select(ContentTag.content_id).where(
+                    ContentTag.key == key, ContentTag.value == value
+                )
+            )
+        )
+    return query, None
+
+
+def _find_categories(category_ids):
+    """
+    Validasi daftar ID kategori dengan satu query IN.
+    Mengembalikan tuple (list kategori sesuai urutan input tanpa duplikat,
+    ID pertama yang tidak ditemukan atau None).
+    """
+    requested_ids = list(dict.fromkeys(str(cat_id) for cat_id in category_ids))
+    found = {
+        category.id: category
+        for category in Category.query.filter(Category.id.in_(requested_ids))
+    }
+    for cat_id in requested_ids:
+        if cat_id not in found:
+            return [], cat_id
+    return [found[cat_id] for cat_id in requested_ids], None
+
 
 @contents_bp.route("", methods=["POST"])
 @jwt_required()
@@ -45,16 +211,12 @@ def create_content():
     if category_ids:
         if not isinstance(category_ids, list):
             return jsonify({"msg": "category_ids harus berupa array/list"}), 400
-        for cat_id in category_ids:
-            category = Category.query.get(
-                str(cat_id)
-            )  # Pastikan ID adalah string jika UUID
-            if not category:
-                return (
-                    jsonify({"msg": f"Kategori dengan ID {cat_id} tidak ditemukan"}),
-                    404,
-                )
-            categories_to_assign.append(category)
+        categories_to_assign, missing_id = _find_categories(category_ids)
+        if missing_id:
+            return (
+                jsonify({"msg": f"Kategori dengan ID {missing_id} tidak ditemukan"}),
+                404,
+            )
 
     new_content = Content(
         title=title,
@@ -66,28 +228,28 @@ def create_content():
 
     try:
         db.session.add(new_content)
-        # Jika ada kategori yang akan di-assign, buat entri di ContentCategory
-        if categories_to_assign:
-            for category in categories_to_assign:
-                # new_content.id belum ada sebelum commit, jadi kita commit dulu kontennya
-                # atau kita bisa buat relasi melalui objek ContentCategory secara langsung
-                # setelah new_content memiliki ID.
-                # Cara yang lebih aman adalah commit new_content dulu, lalu assign kategori.
-                # Atau, jika menggunakan relasi backref, bisa langsung:
-                # new_content.categories_assoc.append(ContentCategory(category=category))
-                # tapi ini memerlukan new_content.id, jadi kita buat setelah commit konten.
-                pass  # Penanganan asosiasi setelah commit
-
-        db.session.commit()  # Commit untuk mendapatkan new_content.id
-
-        # Sekarang assign kategori setelah new_content punya ID
-        if categories_to_assign:
-            for category in categories_to_assign:
-                assoc = ContentCategory(
-                    content_id=new_content.id, category_id=category.id
-                )
-                db.session.add(assoc)
-            db.session.commit()  # Commit asosiasi
+        # Asosiasi dibuat lewat relasi; SQLAlchemy mengisi content_id saat flush,
+        # sehingga konten dan kategorinya tersimpan dalam satu commit
+        for category in categories_to_assign:
+            new_content.categories_assoc.append(ContentCategory(category=category))
+        sync_content_tags(new_content)
+        # Flush untuk mendapatkan ID konten, lalu index pencarian di transaksi yang
+        # sama langsung dari nilai yang baru disimpan (tanpa SELECT/DELETE ulang)
+        db.session.flush()
+        index_new_contents(
+            [
+                {
+                    "id": new_content.id,
+                    "title": title,
+                    "content_type": content_type,
+                    "data_url": data_url,
+                    "metadata_tags": metadata_tags,
+                }
+            ]
+        )
+        # Job klasifikasi otomatis ikut tersimpan di commit yang sama
+        enqueue_content_classification(new_content)
+        db.session.commit()
 
         content_id_str = str(new_content.id)
 
@@ -95,43 +257,87 @@ def create_content():
         db.session.rollback()
         return jsonify({"msg": "Gagal membuat konten", "error": str(e)}), 500
 
-    # Siapkan data kategori untuk respons
-    assigned_categories_data = []
-    if new_content.categories_assoc:  # Akses melalui relasi yang sudah didefinisikan
-        for assoc in new_content.categories_assoc:
-            assigned_categories_data.append(
-                {"id": str(assoc.category.id), "name": assoc.category.name}
-            )
+    # Klasifikasi berjalan di background, respons tidak menunggu model
+    notify_classification_worker()
+
+    # Muat ulang konten beserta kategorinya dalam satu query untuk respons
+    new_content = _get_content_with_categories(content_id_str)
+
+    return (
+        jsonify({"msg": "Konten berhasil dibuat", "content": CONTENT(new_content)}),
+        201,
+    )
+
+
+@contents_bp.route("/bulk", methods=["POST"])
+@jwt_required()
+def create_contents_bulk():
+    """
+    Endpoint untuk membuat banyak konten sekaligus (impor katalog).
+    Menerima {"contents": [{title, content_type, data_url, metadata_tags,
+    category_ids}, ...]}. Item yang valid disimpan dalam satu transaksi; item
+    yang tidak valid dilaporkan per indeks di "errors" tanpa menggagalkan yang lain.
+    Memerlukan autentikasi JWT.
+    """
+    data = request.get_json(silent=True)
+    current_user_id = get_jwt_identity()
+
+    items = data.get("contents") if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return (
+            jsonify({"msg": "contents diperlukan dan harus berupa array/list"}),
+            400,
+        )
+    max_items = current_app.config.get("CONTENTS_BULK_MAX_ITEMS", 5000)
+    if len(items) > max_items:
+        return (
+            jsonify({"msg": f"Maksimal {max_items} konten per request"}),
+            413,  # Payload Too Large
+        )
+
+    try:
+        created, errors = bulk_create_contents(items, current_user_id)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"msg": "Gagal membuat konten", "error": str(e)}), 500
+
+    if created:
+        notify_classification_worker()
 
     return (
         jsonify(
             {
-                "msg": "Konten berhasil dibuat",
-                "content": {
-                    "id": content_id_str,
-                    "title": new_content.title,
-                    "content_type": new_content.content_type,
-                    "data_url": new_content.data_url,
-                    "metadata_tags": new_content.metadata_tags,
-                    "user_id": new_content.user_id,
-                    "created_at": new_content.created_at.isoformat() + "Z",
-                    "updated_at": new_content.updated_at.isoformat() + "Z",
-                    "categories": assigned_categories_data,
-                },
+                "msg": f"{len(created)} konten berhasil dibuat, {len(errors)} gagal",
+                "created": created,
+                "errors": errors,
             }
         ),
-        201,
+        201 if created else 400,
     )
 
 
 @contents_bp.route("", methods=["GET"])
 def get_all_contents():
     """
-    Endpoint untuk mendapatkan daftar semua konten.
-    Mendukung filter berdasarkan category_id.
+    Endpoint untuk mendapatkan daftar konten, terbaru lebih dulu.
+    Mendukung filter berdasarkan category_id, tag (?tags_any=a,b, ?tags_all=a,b,
+    ?tag=key:value), dan paginasi cursor:
+    ?limit=50&cursor=<next_cursor dari halaman sebelumnya>.
+    Ekspor seluruh data: ?stream=ndjson|json (lihat app.core.streaming).
+    Pilih field dengan ?fields=id,title dan muat relasi dengan ?expand=files
+    (lihat app.core.fieldsets).
     """
     category_id_filter = request.args.get("category_id")
-    query = Content.query.order_by(Content.created_at.desc())
+    # Urutan (created_at, id) memakai index ix_contents_created_at_id
+    columns = (Content.created_at, Content.id)
+    try:
+        fieldset = _content_fieldset(
+            _CATEGORIES_SELECTIN, required=[column.key for column in columns]
+        )
+    except InvalidFieldsetError as e:
+        return jsonify({"msg": str(e)}), 400
+    query = fieldset.apply(Content.query)
 
     if category_id_filter:
         # Filter konten yang termasuk dalam kategori tertentu
@@ -143,64 +349,108 @@ def get_all_contents():
         # query = query.join(ContentCategory, Content.id == ContentCategory.content_id)\
         #              .filter(ContentCategory.category_id == category_id_filter)
 
-    contents = query.all()
-    output = []
-    for content_item in contents:
-        categories_data = []
-        for assoc in content_item.categories_assoc:
-            categories_data.append(
-                {"id": str(assoc.category.id), "name": assoc.category.name}
-            )
+    query, error = _apply_tag_filters(query)
+    if error:
+        return jsonify({"msg": error}), 400
 
-        content_data = {
-            "id": str(content_item.id),
-            "title": content_item.title,
-            "content_type": content_item.content_type,
-            "data_url": content_item.data_url,
-            "metadata_tags": content_item.metadata_tags,
-            "user_id": str(content_item.user_id),
-            "created_at": content_item.created_at.isoformat() + "Z",
-            "updated_at": content_item.updated_at.isoformat() + "Z",
-            "categories": categories_data,
-        }
-        output.append(content_data)
+    try:
+        stream_format = get_stream_format()
+        if stream_format:
+            # Kategori (selectinload) dan relasi expand dimuat per batch yield_per
+            return stream_keyset(
+                query, columns, fieldset, stream_format, descending=True
+            )
+        page = paginate_keyset(query, columns, descending=True)
+    except InvalidPaginationError as e:
+        return jsonify({"msg": str(e)}), 400
 
-    return jsonify(output), 200
+    return jsonify(page.to_dict(fieldset)), 200
 
 
-@contents_bp.route("/<string:content_id>", methods=["GET"])
-def get_content_by_id(content_id):
+@contents_bp.route("/search", methods=["GET"])
+def search_contents():
     """
-    Endpoint untuk mendapatkan detail satu konten berdasarkan ID.
+    Endpoint pencarian full-text konten: ?q=<kata kunci>&limit=50&offset=0.
+    Mencari di judul, isi teks, dan tag; semua kata harus cocok. Hasil diurutkan
+    dari yang paling relevan, dengan "score" (makin besar makin relevan).
+    Mendukung ?fields= dan ?expand= seperti GET /contents.
     """
-    content_item = Content.query.get(content_id)
-    if not content_item:
-        return jsonify({"msg": "Konten tidak ditemukan"}), 404
-
-    categories_data = []
-    for assoc in content_item.categories_assoc:
-        categories_data.append(
-            {"id": str(assoc.category.id), "name": assoc.category.name}
+    query_text = (request.args.get("q") or "").strip()
+    if not query_text:
+        return jsonify({"msg": "Parameter 'q' tidak boleh kosong"}), 400
+    try:
+        limit = parse_limit()
+        offset = parse_offset()
+        fieldset = _content_fieldset(_CATEGORIES_SELECTIN)
+    except (InvalidPaginationError, InvalidFieldsetError) as e:
+        return jsonify({"msg": str(e)}), 400
+
+    # Satu hasil ekstra untuk mengetahui apakah masih ada halaman berikutnya
+    matches = search_content_ids(query_text, limit + 1, offset)
+    next_offset = offset + limit if len(matches) > limit else None
+    matches = matches[:limit]
+
+    contents_by_id = {}
+    if matches:
+        contents_by_id = {
+            content_item.id: content_item
+            for content_item in fieldset.apply(Content.query).filter(
+                Content.id.in_([content_id for content_id, _ in matches])
+            )
+        }
+    matches = [
+        (contents_by_id[content_id], score)
+        for content_id, score in matches
+        if content_id in contents_by_id
+    ]
+    items = [
+        dict(data, score=score)
+        for data, (_, score) in zip(
+            fieldset.many([content_item for content_item, _ in matches]), matches
         )
-
+    ]
     return (
         jsonify(
             {
-                "id": str(content_item.id),
-                "title": content_item.title,
-                "content_type": content_item.content_type,
-                "data_url": content_item.data_url,
-                "metadata_tags": content_item.metadata_tags,
-                "user_id": str(content_item.user_id),
-                "created_at": content_item.created_at.isoformat() + "Z",
-                "updated_at": content_item.updated_at.isoformat() + "Z",
-                "categories": categories_data,
+                "items": items,
+                "limit": limit,
+                "offset": offset,
+                "next_offset": next_offset,
             }
         ),
         200,
     )
 
 
+@contents_bp.route("/<string:content_id>", methods=["GET"])
+@cached_response(tags=lambda content_id: [f"content:{content_id}"])
+def get_content_by_id(content_id):
+    """
+    Endpoint untuk mendapatkan detail satu konten berdasarkan ID.
+    Mendukung ?fields= dan ?expand= seperti GET /contents.
+    """
+    try:
+        fieldset = _content_fieldset(_CATEGORIES_JOINED)
+    except InvalidFieldsetError as e:
+        return jsonify({"msg": str(e)}), 400
+    if "categories" in fieldset.keys and building_cached_response():
+        # Respons memuat nama kategori: ikut basi saat kategori tersebut diubah/
+        # dihapus. Versi tag dicatat sebelum nama kategorinya dimuat.
+        category_ids = db.session.scalars(
+            select(ContentCategory.category_id).where(
+                ContentCategory.content_id == content_id
+            )
+        )
+        add_cache_tags(*[f"category:{category_id}" for category_id in category_ids])
+    content_item = db.session.get(
+        Content, content_id, options=fieldset.query_options(), populate_existing=True
+    )
+    if not content_item:
+        return jsonify({"msg": "Konten tidak ditemukan"}), 404
+
+    return jsonify(fieldset(content_item)), 200
+
+
 @contents_bp.route("/<string:content_id>/metadata", methods=["PUT"])
 @jwt_required()
 def update_content_metadata(content_id):
@@ -209,7 +459,7 @@ def update_content_metadata(content_id):
     Juga bisa digunakan untuk memperbarui kategori yang terasosiasi.
     Memerlukan autentikasi JWT.
     """
-    content_item = Content.query.get(content_id)
+    content_item = _get_content_with_categories(content_id)
     if not content_item:
         return jsonify({"msg": "Konten tidak ditemukan"}), 404
 
@@ -226,6 +476,15 @@ def update_content_metadata(content_id):
         )
 
     updated = False
+    # Field yang menjadi input klasifikasi otomatis; hanya perubahan nilai pada
+    # field ini yang memicu klasifikasi ulang
+    classification_inputs = (
+        content_item.title,
+        content_item.content_type,
+        content_item.data_url,
+        content_item.metadata_tags,
+    )
+    previous_tags = content_item.metadata_tags
     if "title" in data:
         content_item.title = data["title"]
         updated = True
@@ -247,31 +506,38 @@ def update_content_metadata(content_id):
                 400,
             )
 
-        # Hapus asosiasi kategori lama
-        ContentCategory.query.filter_by(content_id=content_item.id).delete()
-
-        # Tambah asosiasi kategori baru
-        if new_category_ids:
-            for cat_id in new_category_ids:
-                category = Category.query.get(str(cat_id))
-                if not category:
-                    db.session.rollback()  # Batalkan penghapusan asosiasi lama jika ada kategori baru yang tidak valid
-                    return (
-                        jsonify(
-                            {"msg": f"Kategori dengan ID {cat_id} tidak ditemukan"}
-                        ),
-                        404,
-                    )
-                assoc = ContentCategory(
-                    content_id=content_item.id, category_id=category.id
-                )
-                db.session.add(assoc)
+        # Validasi semua kategori baru (satu query) sebelum mengubah asosiasi lama
+        new_categories, missing_id = _find_categories(new_category_ids or [])
+        if missing_id:
+            db.session.rollback()
+            return (
+                jsonify({"msg": f"Kategori dengan ID {missing_id} tidak ditemukan"}),
+                404,
+            )
+
+        # Ganti asosiasi lama dengan yang baru lewat relasi (delete-orphan menghapus
+        # baris lama); asosiasi yang sudah ada sudah dimuat bersama kontennya
+        content_item.categories_assoc = [
+            ContentCategory(category=category) for category in new_categories
+        ]
         updated = True
 
     if not updated:
         return jsonify({"msg": "Tidak ada data yang diubah"}), 200
 
+    reclassify = classification_inputs != (
+        content_item.title,
+        content_item.content_type,
+        content_item.data_url,
+        content_item.metadata_tags,
+    )
     try:
+        if reclassify:
+            # Input klasifikasi sama dengan isi dokumen index pencarian
+            enqueue_content_classification(content_item)
+            index_contents([content_item.id])
+        if content_item.metadata_tags != previous_tags:
+            sync_content_tags(content_item)
         db.session.commit()
     except Exception as e:
         db.session.rollback()
@@ -279,33 +545,38 @@ def update_content_metadata(content_id):
             jsonify({"msg": "Gagal memperbarui metadata konten", "error": str(e)}),
             500,
         )
+    invalidate_cache_tags(f"content:{content_id}")
+    if reclassify:
+        notify_classification_worker()
 
-    # Ambil ulang data kategori setelah update
-    categories_data = []
-    for assoc in content_item.categories_assoc:
-        categories_data.append(
-            {"id": str(assoc.category.id), "name": assoc.category.name}
-        )
+    # Ambil ulang konten dan kategorinya setelah commit dalam satu query
+    content_item = _get_content_with_categories(content_id)
 
     return (
         jsonify(
             {
                 "msg": "Metadata konten berhasil diperbarui",
-                "content": {
-                    "id": str(content_item.id),
-                    "title": content_item.title,
-                    "content_type": content_item.content_type,
-                    "data_url": content_item.data_url,
-                    "metadata_tags": content_item.metadata_tags,
-                    "categories": categories_data,
-                    "updated_at": content_item.updated_at.isoformat() + "Z",
-                },
+                "content": _CONTENT_UPDATED(content_item),
             }
         ),
         200,
     )
 
 
+@contents_bp.route("/<string:content_id>/classification", methods=["GET"])
+def get_content_classification(content_id):
+    """
+    Endpoint untuk melihat status klasifikasi otomatis sebuah konten
+    (pending, processing, done, failed) beserta hasil prediksinya.
+    """
+    status = get_classification_status(content_id)
+    if status is None:
+        if db.session.get(Content, content_id) is None:
+            return jsonify({"msg": "Konten tidak ditemukan"}), 404
+        return jsonify({"content_id": content_id, "status": "not_requested"}), 200
+    return jsonify(status), 200
+
+
 @contents_bp.route("/<string:content_id>", methods=["DELETE"])
 @jwt_required()
 def delete_content(content_id):
@@ -324,10 +595,15 @@ def delete_content(content_id):
 
     try:
         # Asosiasi di ContentCategory akan terhapus otomatis karena cascade di model Content.categories_assoc
+        remove_contents([content_item.id])
         db.session.delete(content_item)
         db.session.commit()
+        invalidate_cache_tags(f"content:{content_id}")
     except Exception as e:
         db.session.rollback()
         return jsonify({"msg": "Gagal menghapus konten", "error": str(e)}), 500
 
+    # Konten yang dihapus tidak boleh muncul lagi di pencarian semantik
+    remove_content_embeddings([content_id])
+
     return jsonify({"msg": "Konten berhasil dihapus"}), 200
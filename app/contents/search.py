@@ -0,0 +1,307 @@
+# app/contents/search.py
+"""
+Pencarian full-text konten (GET /contents/search).
+
+Dokumen setiap konten terdiri dari judul, isi teks pendek (data_url konten
+bertipe "text"), dan tag teks dari metadata_tags, dengan bobot menurun:
+- PostgreSQL: kolom tsvector berbobot (A/B/C) di tabel content_search_index
+  dengan index GIN, diperingkat dengan ts_rank_cd.
+- SQLite: tabel virtual FTS5, diperingkat dengan bm25. Setiap konten punya
+  rowid FTS5 tetap (tabel content_search_index_docs), sehingga dokumen dihapus
+  atau ditulis ulang lewat lookup rowid, bukan pemindaian kolom content_id.
+
+Route create/bulk/update/delete menyinkronkan index di transaksi yang sama
+dengan perubahan kontennya. Jika database tidak punya index full-text (dialek
+lain, atau SQLite tanpa FTS5), pencarian memakai LIKE tanpa peringkat dan
+sinkronisasi dilewati.
+"""
+import re
+
+from flask import current_app
+from sqlalchemy import String, and_, bindparam, cast, or_, select, text
+
+from app.extensions import db
+from .models import (
+    CONTENT_SEARCH_DOCS_TABLE,
+    CONTENT_SEARCH_TABLE,
+    Content,
+    sqlite_supports_fts5,
+)
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+# Jumlah konten per query saat menyinkronkan index (batas parameter SQLite)
+_SYNC_CHUNK_SIZE = 500
+# Bobot kolom FTS5 untuk bm25: content_id (tidak diindex), title, body, tags
+_FTS5_WEIGHTS = "0.0, 10.0, 1.0, 4.0"
+
+# Kolom Content yang membentuk dokumen index
+_DOCUMENT_COLUMNS = (
+    Content.id,
+    Content.title,
+    Content.content_type,
+    Content.data_url,
+    Content.metadata_tags,
+)
+
+_PG_DOCUMENT = (
+    "setweight(to_tsvector(CAST(:config AS regconfig), :title), 'A') || "
+    "setweight(to_tsvector(CAST(:config AS regconfig), :tags), 'B') || "
+    "setweight(to_tsvector(CAST(:config AS regconfig), :body), 'C')"
+)
+
+# Backend per URL database; dukungan FTS5 tidak berubah selama proses berjalan
+_backend_by_url = {}
+
+
+def content_body_text(content_type, data_url):
+    """Isi teks pendek konten: data_url untuk konten bertipe "text" yang bukan URL."""
+    if (
+        content_type == "text"
+        and isinstance(data_url, str)
+        and not data_url.startswith(("http://", "https://", "/"))
+    ):
+        return data_url
+    return ""
+
+
+def metadata_tag_texts(metadata_tags):
+    """Nilai tag berupa teks dari metadata_tags (dict, list, atau nilai tunggal)."""
+    if isinstance(metadata_tags, dict):
+        tags = list(metadata_tags.values())
+    elif isinstance(metadata_tags, list):
+        tags = metadata_tags
+    else:
+        tags = [metadata_tags]
+    texts = []
+    for tag in tags:
+        if isinstance(tag, str):
+            texts.append(tag)
+        elif isinstance(tag, list):
+            texts.extend(item for item in tag if isinstance(item, str))
+    return texts
+
+
+def search_backend():
+    """Backend index yang dipakai: "postgresql", "fts5", atau None (fallback LIKE)."""
+    key = str(db.engine.url)
+    if key not in _backend_by_url:
+        dialect = db.engine.dialect.name
+        backend = None
+        if dialect == "postgresql":
+            backend = "postgresql"
+        elif dialect == "sqlite" and sqlite_supports_fts5():
+            backend = "fts5"
+        if backend is None:
+            current_app.logger.warning(
+                f"Index full-text konten tidak tersedia untuk database '{dialect}'; "
+                "pencarian memakai LIKE tanpa peringkat."
+            )
+        _backend_by_url[key] = backend
+    return _backend_by_url[key]
+
+
+def search_terms(query_text):
+    """Kata-kata dalam query (huruf kecil). Semua kata harus cocok (AND)."""
+    return [term.lower() for term in _TERM_RE.findall(query_text or "")]
+
+
+def _chunks(values):
+    values = list(values)
+    for start in range(0, len(values), _SYNC_CHUNK_SIZE):
+        yield values[start : start + _SYNC_CHUNK_SIZE]
+
+
+def _execute_for_ids(sql, content_ids):
+    db.session.execute(
+        text(sql).bindparams(bindparam("content_ids", expanding=True)),
+        {"content_ids": content_ids},
+    )
+
+
+def _delete_documents(backend, content_ids, forget=False):
+    """
+    Hapus dokumen index konten-konten ini. FTS5: lewat rowid dari tabel
+    pemetaan (lookup per rowid); forget=True ikut menghapus pemetaannya.
+    """
+    if backend != "fts5":
+        _execute_for_ids(
+            f"DELETE FROM {CONTENT_SEARCH_TABLE} WHERE content_id IN :content_ids",
+            content_ids,
+        )
+        return
+    _execute_for_ids(
+        f"DELETE FROM {CONTENT_SEARCH_TABLE} WHERE rowid IN ("
+        f"SELECT doc_id FROM {CONTENT_SEARCH_DOCS_TABLE} "
+        "WHERE content_id IN :content_ids)",
+        content_ids,
+    )
+    if forget:
+        _execute_for_ids(
+            f"DELETE FROM {CONTENT_SEARCH_DOCS_TABLE} "
+            "WHERE content_id IN :content_ids",
+            content_ids,
+        )
+
+
+def _document(content_id, title, content_type, data_url, metadata_tags):
+    return {
+        "content_id": content_id,
+        "title": title or "",
+        "body": content_body_text(content_type, data_url),
+        "tags": " ".join(metadata_tag_texts(metadata_tags)),
+    }
+
+
+def _insert_documents(backend, documents):
+    if not documents:
+        return
+    if backend == "fts5":
+        # rowid dokumen = doc_id konten (dibuat sekali, tetap saat ditulis ulang)
+        db.session.execute(
+            text(
+                f"INSERT OR IGNORE INTO {CONTENT_SEARCH_DOCS_TABLE} (content_id) "
+                "VALUES (:content_id)"
+            ),
+            [{"content_id": document["content_id"]} for document in documents],
+        )
+        db.session.execute(
+            text(
+                f"INSERT INTO {CONTENT_SEARCH_TABLE} "
+                "(rowid, content_id, title, body, tags) "
+                "SELECT doc_id, :content_id, :title, :body, :tags "
+                f"FROM {CONTENT_SEARCH_DOCS_TABLE} WHERE content_id = :content_id"
+            ),
+            documents,
+        )
+        return
+    config = current_app.config.get("CONTENT_SEARCH_TS_CONFIG", "simple")
+    db.session.execute(
+        text(
+            f"INSERT INTO {CONTENT_SEARCH_TABLE} (content_id, document) "
+            f"VALUES (:content_id, {_PG_DOCUMENT}) "
+            "ON CONFLICT (content_id) DO UPDATE SET document = EXCLUDED.document"
+        ),
+        [dict(document, config=config) for document in documents],
+    )
+
+
+def index_contents(content_ids):
+    """
+    Tulis ulang dokumen index untuk konten-konten ini dari nilai terbarunya di
+    database (flush dulu konten yang baru dibuat). Tidak melakukan commit.
+    """
+    backend = search_backend()
+    if backend is None:
+        return
+    for chunk in _chunks(content_ids):
+        rows = db.session.execute(
+            select(*_DOCUMENT_COLUMNS).where(Content.id.in_(chunk))
+        ).all()
+        if backend == "fts5":
+            # FTS5 tidak punya upsert: hapus dokumen lama lalu sisipkan ulang
+            _delete_documents(backend, chunk)
+        _insert_documents(backend, [_document(*row) for row in rows])
+
+
+def index_new_contents(content_rows):
+    """
+    Index konten yang baru disisipkan langsung dari dict baris insert-nya
+    (kunci id, title, content_type, data_url, metadata_tags), tanpa membaca
+    ulang dari database. Dipakai oleh create dan impor massal. Tidak
+    melakukan commit.
+    """
+    backend = search_backend()
+    if backend is None:
+        return
+    _insert_documents(
+        backend,
+        [
+            _document(
+                row["id"],
+                row["title"],
+                row["content_type"],
+                row.get("data_url"),
+                row.get("metadata_tags"),
+            )
+            for row in content_rows
+        ],
+    )
+
+
+def remove_contents(content_ids):
+    """Hapus dokumen index konten-konten ini. Tidak melakukan commit."""
+    backend = search_backend()
+    if backend is None:
+        return
+    for chunk in _chunks(content_ids):
+        _delete_documents(backend, chunk, forget=True)
+
+
+def _like_pattern(term):
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def search_content_ids(query_text, limit, offset=0):
+    """
+    ID konten yang cocok dengan query, terurut dari peringkat tertinggi.
+    Mengembalikan list tuple (content_id, score); score None pada fallback LIKE.
+    """
+    terms = search_terms(query_text)
+    if not terms:
+        return []
+    backend = search_backend()
+    params = {"limit": limit, "offset": offset}
+
+    if backend == "fts5":
+        # Setiap kata dikutip sehingga sintaks FTS5 dari pengguna tidak dieksekusi
+        rows = db.session.execute(
+            text(
+                f"SELECT content_id, bm25({CONTENT_SEARCH_TABLE}, {_FTS5_WEIGHTS}) "
+                f"AS rank FROM {CONTENT_SEARCH_TABLE} "
+                f"WHERE {CONTENT_SEARCH_TABLE} MATCH :match "
+                "ORDER BY rank, content_id LIMIT :limit OFFSET :offset"
+            ),
+            dict(params, match=" ".join(f'"{term}"' for term in terms)),
+        )
+        # bm25 bernilai negatif: makin kecil makin relevan
+        return [(row.content_id, -row.rank) for row in rows]
+
+    if backend == "postgresql":
+        rows = db.session.execute(
+            text(
+                "SELECT content_id, ts_rank_cd(document, query) AS rank "
+                f"FROM {CONTENT_SEARCH_TABLE}, "
+                "plainto_tsquery(CAST(:config AS regconfig), :query) AS query "
+                "WHERE document @@ query "
+                "ORDER BY rank DESC, content_id LIMIT :limit OFFSET :offset"
+            ),
+            dict(
+                params,
+                config=current_app.config.get("CONTENT_SEARCH_TS_CONFIG", "simple"),
+                query=" ".join(terms),
+            ),
+        )
+        return [(row.content_id, row.rank) for row in rows]
+
+    conditions = [
+        or_(
+            *[
+                column.ilike(_like_pattern(term), escape="\\")
+                for column in (
+                    Content.title,
+                    Content.data_url,
+                    cast(Content.metadata_tags, String),
+                )
+            ]
+        )
+        for term in terms
+    ]
+    rows = db.session.execute(
+        select(Content.id)
+        .where(and_(*conditions))
+        .order_by(Content.created_at.desc(), Content.id.desc())
+        .limit(limit)
+        .offset(offset)
+    )
+    return [(row.id, None) for row in rows]
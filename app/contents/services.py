@@ -0,0 +1,729 @@
+# app/contents/services.py
+"""
+Klasifikasi otomatis konten di background.
+
+Route create/update hanya menandai konten sebagai "pending" (baris
+ContentClassification, ikut di transaksi yang sama) lalu membangunkan worker.
+Worker mengambil job per batch, menjalankan satu prediksi batch untuk semua
+teksnya, lalu menulis hasil dengan bulk update, sehingga request tulis tidak
+pernah menunggu model.
+"""
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import bindparam, delete, func, insert, select, update
+
+from app.categories.models import Category
+from app.core.cache import invalidate_cache_tags
+from app.extensions import db
+from .models import Content, ContentCategory, ContentClassification, ContentTag
+from .search import content_body_text, index_new_contents, metadata_tag_texts
+
+# Worker dibuat sekali per proses saat job pertama masuk
+_worker = None
+_worker_lock = threading.Lock()
+
+
+# Panjang maksimum key/value ContentTag; nilai yang lebih panjang bukan tag dan dilewati
+_TAG_KEY_MAX_LENGTH = 100
+_TAG_VALUE_MAX_LENGTH = 255
+
+
+def normalize_tag(value):
+    """Bentuk tag untuk disimpan dan dicocokkan (teks huruf kecil), atau None."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (str, int, float)):
+        return str(value).strip().lower() or None
+    return None
+
+
+def metadata_tag_pairs(metadata_tags):
+    """
+    Pasangan (key, value) unik dari metadata_tags: {"genre": ["a", "b"]} menjadi
+    ("genre", "a"), ("genre", "b"); tag dari list atau nilai tunggal ber-key "".
+    """
+    if isinstance(metadata_tags, dict):
+        entries = metadata_tags.items()
+    else:
+        entries = [("", metadata_tags)]
+    pairs = {}
+    for key, values in entries:
+        key = normalize_tag(key) or ""
+        if len(key) > _TAG_KEY_MAX_LENGTH:
+            continue
+        for value in values if isinstance(values, list) else [values]:
+            value = normalize_tag(value)
+            if value and len(value) <= _TAG_VALUE_MAX_LENGTH:
+                pairs[(key, value)] = None
+    return list(pairs)
+
+
+def sync_content_tags(content):
+    """
+    Samakan baris ContentTag konten dengan metadata_tags-nya. Tag yang tidak
+    berubah dipertahankan; sisanya dihapus (delete-orphan) atau ditambahkan.
+    """
+    existing = {(tag.key, tag.value): tag for tag in content.tags}
+    content.tags = [
+        existing.get((key, value)) or ContentTag(key=key, value=value)
+        for key, value in metadata_tag_pairs(content.metadata_tags)
+    ]
+
+
+def build_classification_text(title, content_type, data_url, metadata_tags):
+    """
+    Teks yang dikirim ke model untuk satu konten: judul, isi teks pendek
+    (data_url untuk konten bertipe "text" yang bukan URL), dan tag berupa teks.
+    """
+    parts = [title or "", content_body_text(content_type, data_url)]
+    parts.extend(metadata_tag_texts(metadata_tags))
+    return " ".join(part for part in parts if part).strip()
+
+
+# Kolom Content yang dibutuhkan untuk membangun teks klasifikasi; query hanya
+# mengambil kolom ini, tanpa memuat objek Content penuh
+CLASSIFICATION_TEXT_COLUMNS = (
+    Content.id,
+    Content.title,
+    Content.content_type,
+    Content.data_url,
+    Content.metadata_tags,
+)
+
+
+def classification_texts(rows):
+    """Teks klasifikasi untuk baris hasil query CLASSIFICATION_TEXT_COLUMNS."""
+    return [
+        build_classification_text(
+            row.title, row.content_type, row.data_url, row.metadata_tags
+        )
+        for row in rows
+    ]
+
+
+def enqueue_content_classification(content):
+    """
+    Tandai konten untuk diklasifikasikan ulang. Dipanggil sebelum commit agar
+    job ikut tersimpan di transaksi yang sama dengan perubahan kontennya.
+    Tidak melakukan apa-apa jika ML_AUTO_CLASSIFY_ENABLED dimatikan.
+    """
+    if not current_app.config.get("ML_AUTO_CLASSIFY_ENABLED", False):
+        return None
+    job = content.classification
+    if job is None:
+        job = ContentClassification(status="pending", attempts=0)
+        content.classification = job
+    else:
+        job.status = "pending"
+        job.claim_token = None
+        job.attempts = 0
+        job.error = None
+        job.started_at = None
+        job.requested_at = datetime.now(timezone.utc)
+    return job
+
+
+# Panjang maksimum kolom teks yang diisi langsung dari item POST /contents/bulk
+_BULK_STRING_LIMITS = {
+    name: Content.__table__.c[name].type.length for name in ("title", "content_type")
+}
+
+
+def _validate_bulk_item(item):
+    """
+    Pesan error untuk satu item POST /contents/bulk, atau None jika valid. Tipe
+    dan panjang diperiksa di sini agar satu item yang salah tidak menggagalkan
+    executemany seluruh batch.
+    """
+    if not isinstance(item, dict):
+        return "Item harus berupa objek JSON"
+    if not item.get("title") or not item.get("content_type"):
+        return "Title dan content_type diperlukan"
+    for name, max_length in _BULK_STRING_LIMITS.items():
+        if not isinstance(item[name], str):
+            return f"{name} harus berupa teks"
+        if len(item[name]) > max_length:
+            return f"{name} maksimal {max_length} karakter"
+    data_url = item.get("data_url")
+    if data_url is not None and not isinstance(data_url, str):
+        return "data_url harus berupa teks atau null"
+    category_ids = item.get("category_ids")
+    if category_ids is not None:
+        if not isinstance(category_ids, list):
+            return "category_ids harus berupa array/list"
+        if not all(isinstance(cat_id, str) for cat_id in category_ids):
+            return "Setiap category_id harus berupa teks"
+    return None
+
+
+def bulk_create_contents(items, user_id):
+    """
+    Buat banyak konten sekaligus dalam satu transaksi.
+
+    Semua category_ids divalidasi dengan satu query IN; konten, asosiasi
+    kategori, tag, job klasifikasi, dan dokumen index pencarian disisipkan
+    dengan executemany (satu statement per tabel, dipecah otomatis oleh driver).
+    Item yang tidak valid dilewati dan dilaporkan per indeks. Mengembalikan
+    tuple (list {"index", "id"} konten yang dibuat, list {"index", "msg"}
+    error). Tidak melakukan commit.
+    """
+    errors = {}
+    for index, item in enumerate(items):
+        message = _validate_bulk_item(item)
+        if message:
+            errors[index] = message
+
+    requested_ids = {
+        cat_id
+        for index, item in enumerate(items)
+        if index not in errors
+        for cat_id in item.get("category_ids") or []
+    }
+    found_ids = set()
+    if requested_ids:
+        found_ids = set(
+            db.session.scalars(
+                select(Category.id).where(Category.id.in_(requested_ids))
+            )
+        )
+
+    now = datetime.now(timezone.utc)
+    auto_classify = current_app.config.get("ML_AUTO_CLASSIFY_ENABLED", False)
+    content_rows, category_rows, tag_rows, job_rows, created = [], [], [], [], []
+    for index, item in enumerate(items):
+        if index in errors:
+            continue
+        category_ids = list(dict.fromkeys(item.get("category_ids") or []))
+        missing = [cat_id for cat_id in category_ids if cat_id not in found_ids]
+        if missing:
+            errors[index] = f"Kategori dengan ID {missing[0]} tidak ditemukan"
+            continue
+
+        content_id = str(uuid.uuid4())
+        content_rows.append(
+            {
+                "id": content_id,
+                "title": item["title"],
+                "content_type": item["content_type"],
+                "data_url": item.get("data_url"),
+                "metadata_tags": item.get("metadata_tags"),
+                "user_id": user_id,
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        category_rows.extend(
+            {
+                "content_id": content_id,
+                "category_id": category_id,
+                "assigned_at": now,
+                "source": "manual",
+            }
+            for category_id in category_ids
+        )
+        tag_rows.extend(
+            {"content_id": content_id, "key": key, "value": value}
+            for key, value in metadata_tag_pairs(item.get("metadata_tags"))
+        )
+        if auto_classify:
+            job_rows.append(
+                {
+                    "content_id": content_id,
+                    "status": "pending",
+                    "attempts": 0,
+                    "requested_at": now,
+                }
+            )
+        created.append({"index": index, "id": content_id})
+
+    if content_rows:
+        db.session.execute(insert(Content), content_rows)
+    if category_rows:
+        db.session.execute(insert(ContentCategory), category_rows)
+    if tag_rows:
+        db.session.execute(insert(ContentTag), tag_rows)
+    if job_rows:
+        db.session.execute(insert(ContentClassification), job_rows)
+    index_new_contents(content_rows)
+
+    error_list = [{"index": index, "msg": errors[index]} for index in sorted(errors)]
+    return created, error_list
+
+
+def notify_classification_worker():
+    """
+    Bangunkan worker (dan jalankan jika belum ada) setelah job baru di-commit.
+    Hanya jika ML_AUTO_CLASSIFY_IN_WEB; selain itu job diambil oleh
+    `flask ml classify-worker` pada pemeriksaan antrean berikutnya.
+    """
+    config = current_app.config
+    if not (
+        config.get("ML_AUTO_CLASSIFY_ENABLED", False)
+        and config.get("ML_AUTO_CLASSIFY_IN_WEB", False)
+    ):
+        return
+    get_classification_worker(current_app._get_current_object()).notify()
+
+
+def get_classification_worker(app):
+    global _worker
+    if _worker is None:
+        with _worker_lock:
+            if _worker is None:
+                _worker = ContentClassificationWorker(app)
+    return _worker
+
+
+def get_classification_status(content_id):
+    """Status klasifikasi satu konten dalam bentuk dict, atau None jika belum pernah diminta."""
+    job = db.session.get(ContentClassification, content_id)
+    if job is None:
+        return None
+    return {
+        "content_id": job.content_id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "model_version": job.model_version,
+        "predicted_category": job.predicted_category,
+        "confidence": job.confidence,
+        "top_k": job.top_k,
+        "error": job.error,
+        "requested_at": _isoformat(job.requested_at),
+        "started_at": _isoformat(job.started_at),
+        "completed_at": _isoformat(job.completed_at),
+    }
+
+
+def _isoformat(value):
+    return value.isoformat() + "Z" if value else None
+
+
+def _reset_stale_jobs(now):
+    """
+    Job "processing" milik worker yang mati dikembalikan ke antrean. Job yang
+    sudah diambil ML_AUTO_CLASSIFY_MAX_ATTEMPTS kali ditandai gagal, agar konten
+    yang membuat worker crash (OOM, segfault) tidak diulang terus-menerus.
+    """
+    config = current_app.config
+    stale_seconds = config.get("ML_AUTO_CLASSIFY_STALE_SECONDS", 600)
+    max_attempts = config.get("ML_AUTO_CLASSIFY_MAX_ATTEMPTS", 3)
+    table = ContentClassification
+    stale = (
+        table.status == "processing",
+        table.started_at < now - timedelta(seconds=stale_seconds),
+    )
+    failed = db.session.execute(
+        update(table)
+        .where(*stale, table.attempts >= max_attempts)
+        .values(
+            status="failed",
+            claim_token=None,
+            error=(
+                f"Worker berhenti saat memproses job ini sebanyak {max_attempts} kali "
+                "(macet lebih dari ML_AUTO_CLASSIFY_STALE_SECONDS)."
+            ),
+            completed_at=now,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if failed.rowcount:
+        current_app.logger.error(
+            f"{failed.rowcount} job klasifikasi konten macet ditandai gagal "
+            f"(sudah dicoba {max_attempts} kali)"
+        )
+    result = db.session.execute(
+        update(table)
+        .where(*stale, table.attempts < max_attempts)
+        .values(status="pending", claim_token=None)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        current_app.logger.warning(
+            f"{result.rowcount} job klasifikasi konten macet dikembalikan ke antrean"
+        )
+
+
+def _claim_jobs(batch_size, token):
+    """
+    Ambil paling banyak batch_size job "pending" (terlama dulu) untuk worker ini.
+    UPDATE bersyarat status="pending" memastikan satu job hanya diambil satu worker,
+    meskipun beberapa proses web menjalankan worker masing-masing.
+    """
+    candidate_ids = (
+        db.session.execute(
+            select(ContentClassification.content_id)
+            .where(ContentClassification.status == "pending")
+            .order_by(ContentClassification.requested_at)
+            .limit(batch_size)
+        )
+        .scalars()
+        .all()
+    )
+    if not candidate_ids:
+        return []
+    db.session.execute(
+        update(ContentClassification)
+        .where(
+            ContentClassification.content_id.in_(candidate_ids),
+            ContentClassification.status == "pending",
+        )
+        .values(
+            status="processing",
+            claim_token=token,
+            started_at=datetime.now(timezone.utc),
+            attempts=ContentClassification.attempts + 1,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return (
+        db.session.execute(
+            select(ContentClassification.content_id).where(
+                ContentClassification.claim_token == token
+            )
+        )
+        .scalars()
+        .all()
+    )
+
+
+def _release_jobs(token, error):
+    """Kembalikan job yang gagal diproses karena error sementara ke antrean (atau gagal permanen)."""
+    max_attempts = current_app.config.get("ML_AUTO_CLASSIFY_MAX_ATTEMPTS", 3)
+    table = ContentClassification
+    db.session.rollback()
+    db.session.execute(
+        update(table)
+        .where(table.claim_token == token, table.attempts >= max_attempts)
+        .values(
+            status="failed",
+            claim_token=None,
+            error=error,
+            completed_at=datetime.now(timezone.utc),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.session.execute(
+        update(table)
+        .where(table.claim_token == token)
+        .values(status="pending", claim_token=None, error=error)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+
+def _apply_suggested_categories(results_by_content):
+    """
+    Ganti kategori "auto" setiap konten dengan label hasil prediksi yang
+    confidence-nya cukup dan namanya cocok dengan kategori yang ada.
+    Kategori "manual" pilihan pengguna tidak pernah diubah.
+    """
+    if not results_by_content:
+        return 0
+    min_confidence = current_app.config.get("ML_AUTO_CLASSIFY_MIN_CONFIDENCE", 0.5)
+    content_ids = list(results_by_content)
+
+    wanted = {}  # content_id -> set nama label (lowercase)
+    for content_id, result in results_by_content.items():
+        wanted[content_id] = {
+            str(entry["label"]).lower()
+            for entry in result.get("top_k") or []
+            if entry.get("score") is not None and entry["score"] >= min_confidence
+        }
+    all_labels = set().union(*wanted.values())
+
+    db.session.execute(
+        delete(ContentCategory)
+        .where(
+            ContentCategory.content_id.in_(content_ids),
+            ContentCategory.source == "auto",
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if not all_labels:
+        return 0
+
+    # Satu query untuk semua label, satu query untuk kategori manual yang sudah ada
+    category_ids_by_name = {}
+    for category_id, name in db.session.execute(
+        select(Category.id, func.lower(Category.name)).where(
+            func.lower(Category.name).in_(all_labels)
+        )
+    ):
+        category_ids_by_name.setdefault(name, []).append(category_id)
+    existing_pairs = set(
+        db.session.execute(
+            select(ContentCategory.content_id, ContentCategory.category_id).where(
+                ContentCategory.content_id.in_(content_ids)
+            )
+        ).all()
+    )
+
+    now = datetime.now(timezone.utc)
+    rows = []
+    for content_id, labels in wanted.items():
+        for label in labels:
+            for category_id in category_ids_by_name.get(label, []):
+                if (content_id, category_id) not in existing_pairs:
+                    existing_pairs.add((content_id, category_id))
+                    rows.append(
+                        {
+                            "content_id": content_id,
+                            "category_id": category_id,
+                            "assigned_at": now,
+                            "source": "auto",
+                        }
+                    )
+    if rows:
+        db.session.execute(insert(ContentCategory), rows)
+    return len(rows)
+
+
+def store_classification_results(content_ids, results, claim_token=None):
+    """
+    Simpan hasil classify_batch untuk banyak konten sekaligus (executemany),
+    lalu perbarui kategori "auto" konten yang berhasil. Tidak melakukan commit.
+
+    Dengan claim_token, hanya baris yang masih dipegang worker tersebut yang
+    ditulis, sehingga hasil lama tidak menimpa job yang sudah diantrekan ulang
+    karena kontennya diubah lagi. Tanpa claim_token (backfill), baris yang belum
+    ada dibuat. Mengembalikan tuple (jumlah gagal, jumlah kategori otomatis).
+    """
+    completed_at = datetime.now(timezone.utc)
+    params = []
+    for content_id, result in zip(content_ids, results):
+        params.append(
+            {
+                "b_content_id": content_id,
+                "status": "failed" if "error" in result else "done",
+                "model_version": result.get("model_version"),
+                "predicted_category": result.get("predicted_category"),
+                "confidence": result.get("confidence"),
+                "top_k": result.get("top_k"),
+                "error": result.get("error"),
+                "completed_at": completed_at,
+            }
+        )
+    if not params:
+        return 0, 0
+
+    table = ContentClassification.__table__
+    statement = update(table).values(
+        status=bindparam("status"),
+        model_version=bindparam("model_version"),
+        predicted_category=bindparam("predicted_category"),
+        confidence=bindparam("confidence"),
+        top_k=bindparam("top_k"),
+        error=bindparam("error"),
+        completed_at=bindparam("completed_at"),
+    )
+    if claim_token is not None:
+        db.session.execute(
+            statement.where(
+                table.c.content_id == bindparam("b_content_id"),
+                table.c.claim_token == claim_token,
+            ),
+            params,
+        )
+        done_ids = set(
+            db.session.execute(
+                select(table.c.content_id).where(
+                    table.c.claim_token == claim_token, table.c.status == "done"
+                )
+            )
+            .scalars()
+            .all()
+        )
+        db.session.execute(
+            update(table)
+            .where(table.c.claim_token == claim_token)
+            .values(claim_token=None)
+        )
+    else:
+        existing_ids = set(
+            db.session.execute(
+                select(table.c.content_id).where(table.c.content_id.in_(content_ids))
+            )
+            .scalars()
+            .all()
+        )
+        updates = [p for p in params if p["b_content_id"] in existing_ids]
+        if updates:
+            db.session.execute(
+                statement.values(claim_token=None).where(
+                    table.c.content_id == bindparam("b_content_id")
+                ),
+                updates,
+            )
+        inserts = [
+            {
+                "content_id": p["b_content_id"],
+                "attempts": 1,
+                "requested_at": completed_at,
+                "started_at": completed_at,
+                **{k: v for k, v in p.items() if k != "b_content_id"},
+            }
+            for p in params
+            if p["b_content_id"] not in existing_ids
+        ]
+        if inserts:
+            db.session.execute(insert(table), inserts)
+        done_ids = {p["b_content_id"] for p in params if p["status"] == "done"}
+
+    assigned = _apply_suggested_categories(
+        {
+            content_id: result
+            for content_id, result in zip(content_ids, results)
+            if content_id in done_ids
+        }
+    )
+    failed_count = sum(1 for p in params if p["status"] == "failed")
+    return failed_count, assigned
+
+
+def update_embedding_index(content_ids, texts):
+    """
+    Perbarui index embedding (pencarian semantik) untuk konten yang baru
+    diklasifikasikan. Kegagalan hanya dicatat: index bisa dilengkapi lagi
+    dengan `flask ml backfill`.
+    """
+    if not content_ids or not current_app.config.get("ML_EMBEDDING_INDEX_ENABLED", False):
+        return 0
+    from app.analytics.services import index_content_embeddings
+
+    try:
+        return index_content_embeddings(content_ids, texts)
+    except Exception as e:
+        current_app.logger.error(
+            f"Gagal memperbarui index embedding untuk {len(content_ids)} konten: {e}",
+            exc_info=True,
+        )
+        return 0
+
+
+def process_pending_classifications(batch_size=None):
+    """
+    Proses satu batch job klasifikasi. Mengembalikan jumlah job yang diambil
+    (0 jika antrean kosong atau model belum siap). Harus dipanggil di app context.
+    """
+    from app import ml_services
+
+    config = current_app.config
+    batch_size = batch_size or config.get("ML_AUTO_CLASSIFY_BATCH_SIZE", 64)
+    if ml_services.get_model_load_status()["state"] == "loading":
+        return 0  # Tunggu model selesai dimuat; job tetap di antrean
+
+    _reset_stale_jobs(datetime.now(timezone.utc))
+    token = str(uuid.uuid4())
+    claimed_ids = _claim_jobs(batch_size, token)
+    if not claimed_ids:
+        return 0
+
+    rows = db.session.execute(
+        select(*CLASSIFICATION_TEXT_COLUMNS).where(Content.id.in_(claimed_ids))
+    ).all()
+    content_ids = [row.id for row in rows]
+    texts = classification_texts(rows)
+
+    started = time.perf_counter()
+    try:
+        results = (
+            ml_services.classify_batch(
+                texts, top_k=config.get("ML_AUTO_CLASSIFY_TOP_K", 3)
+            )
+            if texts
+            else []
+        )
+    except ml_services.InferenceOverloadedError as e:
+        _release_jobs(token, str(e))
+        return 0
+    except Exception as e:
+        current_app.logger.error(
+            f"Klasifikasi batch konten gagal: {e}", exc_info=True
+        )
+        _release_jobs(token, str(e))
+        return 0
+    predict_ms = (time.perf_counter() - started) * 1000.0
+
+    # Konten yang terhapus selagi job diproses
+    missing_ids = set(claimed_ids) - set(content_ids)
+    if missing_ids:
+        db.session.execute(
+            delete(ContentClassification)
+            .where(ContentClassification.content_id.in_(missing_ids))
+            .execution_options(synchronize_session=False)
+        )
+    failed_count, assigned = store_classification_results(
+        content_ids, results, claim_token=token
+    )
+    db.session.commit()
+    # Kategori "auto" berubah: detail konten yang di-cache tidak berlaku lagi
+    invalidate_cache_tags(*[f"content:{content_id}" for content_id in content_ids])
+    update_embedding_index(content_ids, texts)
+
+    current_app.logger.info(
+        f"Klasifikasi otomatis: {len(content_ids)} konten dalam {predict_ms:.1f} ms "
+        f"({failed_count} gagal, {assigned} kategori otomatis ditambahkan)"
+    )
+    return len(claimed_ids)
+
+
+class ContentClassificationWorker:
+    """
+    Loop yang mengosongkan antrean klasifikasi: sebagai thread background di
+    proses web (ML_AUTO_CLASSIFY_IN_WEB, dibangunkan setiap kali job baru
+    di-commit) atau di foreground lewat `flask ml classify-worker`. Antrean juga
+    diperiksa setiap ML_AUTO_CLASSIFY_POLL_SECONDS untuk job dari proses lain
+    atau sebelum restart.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopped = False
+
+    def notify(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped = False
+                self._thread = threading.Thread(
+                    target=self._run, name="content-classifier", daemon=True
+                )
+                self._thread.start()
+        self._wakeup.set()
+
+    def run(self):
+        """Jalankan loop worker di thread pemanggil sampai stop() dipanggil."""
+        self._stopped = False
+        self._run()
+
+    def stop(self, timeout=None):
+        self._stopped = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    def _run(self):
+        poll_seconds = self.app.config.get("ML_AUTO_CLASSIFY_POLL_SECONDS", 30)
+        while not self._stopped:
+            self._wakeup.clear()
+            processed = 0
+            with self.app.app_context():
+                try:
+                    processed = process_pending_classifications()
+                except Exception as e:
+                    db.session.rollback()
+                    self.app.logger.error(
+                        f"Worker klasifikasi konten error: {e}", exc_info=True
+                    )
+                finally:
+                    db.session.remove()
+            if not processed:
+                # Antrean kosong (atau model belum siap): tidur sampai ada job baru
+                self._wakeup.wait(timeout=poll_seconds)
@@ -0,0 +1,487 @@
+# app/core/cache.py
+"""
+Cache respons untuk endpoint GET publik yang sering dibaca.
+
+Respons 200 yang sudah diserialisasi disimpan dengan kunci path + query string.
+Setiap entri membawa tag (mis. "category:<id>") beserta versi tag tersebut saat
+respons dibangun. Handler tulis memanggil invalidate_cache_tags() setelah commit
+untuk menaikkan versi tag, sehingga semua entri dengan tag itu langsung dianggap
+basi tanpa perlu memindai kunci.
+
+Miss yang bersamaan untuk kunci yang sama digabung (single-flight): satu request
+membangun respons, request lain di proses yang sama menunggu hasilnya.
+
+Backend: "memory" (LRU per proses, default) atau "redis" (store kompatibel
+Redis yang dipakai bersama antar proses; butuh paket `redis`).
+
+Dengan backend memory, versi tag secara default disimpan di tabel
+resource_versions (RESPONSE_CACHE_TAG_VERSIONS="database"), bukan di memori
+proses: invalidasi dari worker gunicorn lain, `flask ml classify-worker`, atau
+`flask ml backfill` langsung terlihat oleh semua proses web. Biayanya satu
+lookup primary key per pemeriksaan entri.
+"""
+import functools
+import json
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from flask import Response, current_app, g, request
+from sqlalchemy import select
+
+from app.extensions import db
+from .etag import bump_resource_versions
+from .models import ResourceVersion
+from .streaming import get_stream_format
+
+
+class MemoryCacheBackend:
+    """
+    Backend LRU di memori proses dengan TTL per entri.
+
+    Versi tag juga disimpan sebagai LRU (paling banyak max_tags tag). Versi tag
+    yang dibuang dinaikkan ke versi dasar bersama (`_floor`), yang dipakai untuk
+    semua tag yang tidak tercatat. Versi tag tidak pernah turun, sehingga entri
+    yang dibangun sebelum sebuah tag dibuang paling buruk ikut dianggap basi,
+    tidak pernah dianggap masih berlaku setelah diinvalidasi.
+    """
+
+    def __init__(self, max_entries=10000, max_tags=None):
+        self.max_entries = max(1, int(max_entries))
+        self.max_tags = max(1, int(max_tags or 4 * self.max_entries))
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._versions = OrderedDict()  # tag -> versi (tag yang pernah diinvalidasi)
+        self._floor = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.tag_evictions = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl_seconds):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_versions(self, tags):
+        with self._lock:
+            versions = []
+            for tag in tags:
+                version = self._versions.get(tag)
+                if version is None:
+                    version = self._floor
+                else:
+                    self._versions.move_to_end(tag)
+                versions.append(version)
+            return versions
+
+    def incr_versions(self, tags):
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, self._floor) + 1
+                self._versions.move_to_end(tag)
+            while len(self._versions) > self.max_tags:
+                _, version = self._versions.popitem(last=False)
+                self._floor = max(self._floor, version)
+                self.tag_evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": "memory",
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "evictions": self.evictions,
+                "tags": len(self._versions),
+                "max_tags": self.max_tags,
+                "tag_evictions": self.tag_evictions,
+            }
+
+
+class RedisCacheBackend:
+    """Backend di atas client kompatibel Redis (get/set/mget/incr/pipeline)."""
+
+    def __init__(self, client, key_prefix="respcache:"):
+        self.client = client
+        self.key_prefix = key_prefix
+
+    def _tag_key(self, tag):
+        return f"{self.key_prefix}tag:{tag}"
+
+    def get(self, key):
+        value = self.client.get(self.key_prefix + key)
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def set(self, key, value, ttl_seconds):
+        self.client.set(self.key_prefix + key, value, ex=max(1, int(ttl_seconds)))
+
+    def get_versions(self, tags):
+        if not tags:
+            return []
+        values = self.client.mget([self._tag_key(tag) for tag in tags])
+        return [int(value) if value is not None else 0 for value in values]
+
+    def incr_versions(self, tags):
+        pipeline = self.client.pipeline()
+        for tag in tags:
+            pipeline.incr(self._tag_key(tag))
+        pipeline.execute()
+
+    def stats(self):
+        return {"backend": "redis", "key_prefix": self.key_prefix}
+
+
+class DatabaseTagVersions:
+    """
+    Versi tag di tabel resource_versions (baris "cache:<tag>"), dipakai bersama
+    oleh semua proses yang terhubung ke database yang sama.
+    """
+
+    name_prefix = "cache:"
+
+    def _names(self, tags):
+        return [self.name_prefix + tag for tag in tags]
+
+    def get_versions(self, tags):
+        if not tags:
+            return []
+        names = self._names(tags)
+        try:
+            versions = dict(
+                db.session.execute(
+                    select(ResourceVersion.name, ResourceVersion.version).where(
+                        ResourceVersion.name.in_(names)
+                    )
+                ).all()
+            )
+        except Exception:
+            db.session.rollback()
+            raise
+        return [versions.get(name, 0) for name in names]
+
+    def incr_versions(self, tags):
+        # Dipanggil setelah commit data (lihat invalidate_cache_tags): kenaikan
+        # versi di-commit sebagai transaksi sendiri
+        try:
+            bump_resource_versions(*self._names(tags))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def stats(self):
+        return {"tag_versions": "database"}
+
+
+class _Flight:
+    """Satu pembangunan respons yang sedang berjalan untuk sebuah kunci."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.entry = None
+
+
+class ResponseCache:
+    """
+    Cache entri respons ({"s": status, "m": mimetype, "b": body, "v": versi tag})
+    di atas backend. Versi tag dibaca dan dinaikkan lewat `tag_versions`
+    (default: backend itu sendiri). Error backend tidak pernah menggagalkan
+    request: lookup dianggap miss dan penyimpanan dilewati.
+    """
+
+    def __init__(
+        self,
+        backend,
+        ttl_seconds=300,
+        wait_timeout_seconds=10,
+        logger=None,
+        tag_versions=None,
+    ):
+        self.backend = backend
+        self.tag_versions = tag_versions or backend
+        self.ttl_seconds = float(ttl_seconds)
+        self.wait_timeout_seconds = float(wait_timeout_seconds)
+        self.logger = logger
+
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.coalesced = 0
+        self.stores = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    def _count(self, name):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _backend_error(self, action, error):
+        self._count("errors")
+        if self.logger is not None:
+            self.logger.warning(f"Cache respons: gagal {action}: {error}")
+
+    def _lookup(self, key):
+        try:
+            raw = self.backend.get(key)
+            if raw is None:
+                return None
+            entry = json.loads(raw)
+            tags = list(entry["v"])
+            if self.tag_versions.get_versions(tags) != [
+                entry["v"][tag] for tag in tags
+            ]:
+                self._count("stale")
+                return None
+            return entry
+        except Exception as e:
+            self._backend_error("membaca entri", e)
+            return None
+
+    def read_tag_versions(self, tags):
+        """Versi tag saat ini sebagai dict, atau None jika backend gagal dibaca."""
+        try:
+            return dict(zip(tags, self.tag_versions.get_versions(tags)))
+        except Exception as e:
+            self._backend_error("membaca versi tag", e)
+            return None
+
+    def _store(self, key, entry, tag_versions, extra_versions):
+        try:
+            # Versi tag tambahan sudah dibaca build() sebelum data terkaitnya dimuat
+            entry["v"] = {**extra_versions, **tag_versions}
+            self.backend.set(key, json.dumps(entry), self.ttl_seconds)
+            self._count("stores")
+        except Exception as e:
+            self._backend_error("menyimpan entri", e)
+
+    def get_or_build(self, key, tags, build):
+        """
+        Kembalikan tuple (entry, response, status_cache). `build()` dipanggil
+        saat miss dan mengembalikan (response, entry atau None jika tidak boleh
+        di-cache, dict versi tag tambahan atau None jika versinya tidak bisa
+        dibaca). Versi tag tambahan harus dibaca sebelum data yang diwakilinya
+        dimuat (lihat add_cache_tags). Pada HIT/COALESCED, response bernilai None.
+        """
+        entry = self._lookup(key)
+        if entry is not None:
+            self._count("hits")
+            return entry, None, "HIT"
+
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            # Tunggu request yang sedang membangun respons yang sama
+            flight.done.wait(self.wait_timeout_seconds)
+            if flight.entry is not None:
+                self._count("coalesced")
+                return flight.entry, None, "COALESCED"
+
+        self._count("misses")
+        try:
+            # Versi tag dibaca sebelum data dimuat: invalidasi yang terjadi selama
+            # pembangunan membuat entri ini langsung basi, bukan tersimpan usang
+            tag_versions = self.read_tag_versions(tags)
+            response, entry, extra_versions = build()
+            if None not in (entry, tag_versions, extra_versions):
+                self._store(key, entry, tag_versions, extra_versions)
+            if leader:
+                flight.entry = entry
+            return entry, response, "MISS"
+        finally:
+            if leader:
+                with self._flights_lock:
+                    self._flights.pop(key, None)
+                flight.done.set()
+
+    def invalidate(self, tags):
+        tags = list(dict.fromkeys(tags))
+        if not tags:
+            return
+        try:
+            self.tag_versions.incr_versions(tags)
+            self._count("invalidations")
+        except Exception as e:
+            self._backend_error("menginvalidasi tag", e)
+
+    def stats(self):
+        with self._stats_lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                **self.backend.stats(),
+                **(
+                    self.tag_versions.stats()
+                    if self.tag_versions is not self.backend
+                    else {}
+                ),
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_rate": (
+                    round((self.hits + self.coalesced) / lookups, 4)
+                    if lookups
+                    else None
+                ),
+                "stale": self.stale,
+                "stores": self.stores,
+                "invalidations": self.invalidations,
+                "errors": self.errors,
+            }
+
+
+def _make_backend(app):
+    config = app.config
+    if config.get("RESPONSE_CACHE_BACKEND", "memory") == "redis":
+        try:
+            import redis
+
+            client = redis.Redis.from_url(config["RESPONSE_CACHE_REDIS_URL"])
+            return RedisCacheBackend(
+                client, config.get("RESPONSE_CACHE_KEY_PREFIX", "respcache:")
+            )
+        except Exception as e:
+            app.logger.error(
+                f"Cache respons Redis tidak bisa dipakai ({e}); memakai cache memori."
+            )
+    return MemoryCacheBackend(
+        config.get("RESPONSE_CACHE_MAX_ENTRIES", 10000),
+        config.get("RESPONSE_CACHE_MAX_TAGS"),
+    )
+
+
+def _make_tag_versions(app, backend):
+    # Redis sudah dipakai bersama antar proses; memory hanya jika diminta eksplisit
+    if isinstance(backend, RedisCacheBackend):
+        return backend
+    if app.config.get("RESPONSE_CACHE_TAG_VERSIONS", "database") != "database":
+        return backend
+    return DatabaseTagVersions()
+
+
+def init_response_cache(app):
+    """Buat cache respons untuk aplikasi ini (disimpan di app.extensions)."""
+    cache = None
+    if app.config.get("RESPONSE_CACHE_ENABLED", True):
+        backend = _make_backend(app)
+        cache = ResponseCache(
+            backend,
+            ttl_seconds=app.config.get("RESPONSE_CACHE_TTL_SECONDS", 300),
+            wait_timeout_seconds=app.config.get(
+                "RESPONSE_CACHE_WAIT_TIMEOUT_SECONDS", 10
+            ),
+            logger=app.logger,
+            tag_versions=_make_tag_versions(app, backend),
+        )
+    app.extensions["response_cache"] = cache
+    return cache
+
+
+def get_response_cache():
+    """Cache respons aplikasi saat ini, atau None jika dinonaktifkan."""
+    return current_app.extensions.get("response_cache")
+
+
+def invalidate_cache_tags(*tags):
+    """
+    Naikkan versi tag sehingga semua respons ber-tag tersebut basi.
+    Panggil SETELAH commit, agar request lain tidak meng-cache ulang data lama.
+    """
+    cache = get_response_cache()
+    if cache is not None:
+        cache.invalidate(tags)
+
+
+def building_cached_response():
+    """True jika view sedang dijalankan untuk membangun respons yang akan di-cache."""
+    return g.get("response_cache_tags") is not None
+
+
+def add_cache_tags(*tags):
+    """
+    Tambahkan tag ke respons yang sedang dibangun (mis. kategori sebuah konten).
+    Versi tag dibaca saat ini juga, jadi panggil SEBELUM memuat data yang
+    diwakili tag tersebut: perubahan yang di-commit setelahnya membuat entri
+    basi. Jika versinya gagal dibaca, respons tidak di-cache.
+    """
+    extra_versions = g.get("response_cache_tags")
+    if extra_versions is None:
+        return
+    new_tags = [tag for tag in dict.fromkeys(tags) if tag not in extra_versions]
+    if not new_tags:
+        return
+    versions = get_response_cache().read_tag_versions(new_tags)
+    if versions is None:
+        g.response_cache_uncacheable = True
+        return
+    extra_versions.update(versions)
+
+
+def _cache_key():
+    args = sorted(request.args.items(multi=True))
+    return f"{request.path}?{urlencode(args)}"
+
+
+def cached_response(tags=()):
+    """
+    Decorator view GET: cache respons 200 di bawah kunci path + query string.
+    `tags` berupa list tag atau callable(**view_args) yang mengembalikan list tag;
+    view bisa menambah tag yang baru diketahui saat membangun lewat add_cache_tags().
+    Header X-Cache berisi HIT, COALESCED, atau MISS.
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = get_response_cache()
+            if cache is None or get_stream_format():
+                return view(*args, **kwargs)
+            entry_tags = list(tags(**kwargs) if callable(tags) else tags)
+
+            def build():
+                g.response_cache_tags = {}
+                g.response_cache_uncacheable = False
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response, None, {}
+                entry = {
+                    "s": response.status_code,
+                    "m": response.mimetype,
+                    "b": response.get_data(as_text=True),
+                }
+                if g.response_cache_uncacheable:
+                    return response, entry, None
+                return response, entry, g.response_cache_tags
+
+            entry, response, cache_status = cache.get_or_build(
+                _cache_key(), entry_tags, build
+            )
+            if response is None:
+                response = Response(entry["b"], status=entry["s"], mimetype=entry["m"])
+            response.headers["X-Cache"] = cache_status
+            return response
+
+        return wrapper
+
+    return decorator
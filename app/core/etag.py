@@ -0,0 +1,95 @@
+# app/core/etag.py
+"""
+ETag dan conditional GET berbasis penghitung versi.
+
+Setiap sumber daya yang di-poll klien (mis. daftar kategori, daftar target
+milik satu user) punya baris di resource_versions yang dinaikkan oleh handler
+tulis di transaksi yang sama dengan perubahannya. ETag dihitung dari versi itu
+plus representasi yang diminta (path, query string, mode streaming), sehingga
+request `If-None-Match` yang masih cocok dijawab 304 hanya dengan satu lookup
+primary key, sebelum satu baris data pun dimuat.
+"""
+import functools
+import hashlib
+
+from flask import current_app, request
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.extensions import db
+from .models import ResourceVersion
+from .streaming import get_stream_format
+
+# INSERT ... ON CONFLICT DO UPDATE untuk database yang mendukungnya
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def get_resource_version(name):
+    """Versi sumber daya saat ini (0 jika belum pernah ditulis)."""
+    version = db.session.execute(
+        select(ResourceVersion.version).where(ResourceVersion.name == name)
+    ).scalar()
+    return version or 0
+
+
+def bump_resource_versions(*names):
+    """
+    Naikkan versi sumber daya. Panggil sebelum commit agar versi berubah
+    bersamaan dengan datanya. Tidak melakukan commit.
+    """
+    dialect = db.session.get_bind().dialect.name
+    for name in dict.fromkeys(names):
+        if dialect in _UPSERT_INSERTS:
+            # Satu statement atomik, juga untuk penulisan pertama sumber daya ini
+            db.session.execute(
+                _UPSERT_INSERTS[dialect](ResourceVersion)
+                .values(name=name, version=1)
+                .on_conflict_do_update(
+                    index_elements=[ResourceVersion.name],
+                    set_={"version": ResourceVersion.version + 1},
+                )
+            )
+            continue
+        updated = db.session.execute(
+            update(ResourceVersion)
+            .where(ResourceVersion.name == name)
+            .values(version=ResourceVersion.version + 1)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not updated:
+            db.session.add(ResourceVersion(name=name, version=1))
+
+
+def make_etag(version):
+    """ETag kuat untuk representasi request saat ini pada versi tertentu."""
+    args = sorted(request.args.items(multi=True))
+    variant = f"{request.path}?{args}|{get_stream_format()}"
+    digest = hashlib.sha1(variant.encode("utf-8")).hexdigest()[:16]
+    return f"v{version}-{digest}"
+
+
+def conditional_get(resource):
+    """
+    Decorator view GET: pasang ETag dari versi `resource` (nama, atau callable
+    yang mengembalikan nama, mis. per user) dan jawab 304 jika If-None-Match
+    cocok tanpa menjalankan view.
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            name = resource() if callable(resource) else resource
+            etag = make_etag(get_resource_version(name))
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+                response.set_etag(etag)
+                return response
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+            return response
+
+        return wrapper
+
+    return decorator
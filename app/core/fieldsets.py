@@ -0,0 +1,176 @@
+# app/core/fieldsets.py
+"""
+Sparse fieldset (`?fields=`) dan relasi yang bisa di-expand (`?expand=`) untuk
+endpoint baca.
+
+`?fields=id,title` memilih key respons dari skema serializer endpoint (lihat
+app.core.utils); kolom yang tidak dibutuhkan tidak ikut di-SELECT (load_only).
+`id` selalu disertakan. Tanpa `fields`, respons tetap seperti biasa.
+
+`?expand=files,progress` memuat relasi terkait untuk seluruh halaman (atau satu
+batch streaming) sekaligus: satu query per relasi lewat selectinload atau query
+`IN (...)`, bukan satu query per baris. Nama relasi juga boleh ditulis di
+`fields` (mis. `?fields=id,categories`).
+"""
+from flask import request
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+
+from app.extensions import db
+
+
+class InvalidFieldsetError(ValueError):
+    """Parameter fields atau expand dari klien tidak valid."""
+
+
+class Relation:
+    """
+    Relasi yang bisa di-expand, dimuat dengan salah satu cara:
+    - `option`: loader option ORM (mis. selectinload) untuk relasi yang sudah
+      menjadi field skema serializer (mis. "categories" pada CONTENT);
+    - `load`: callable(baris induk) -> list nilai sejajar baris induk, yang
+      memuat relasi untuk semua baris sekaligus (lihat batch_relation).
+    `requires`: atribut baris induk yang dibutuhkan loader (ikut di load_only).
+    `default=True`: tetap dimuat jika klien tidak memberi `fields`.
+    """
+
+    def __init__(self, option=None, load=None, requires=(), default=False):
+        self.option = option
+        self.load = load
+        self.requires = tuple(requires)
+        self.default = default
+
+
+def batch_relation(
+    model, key_column, serializer, parent_key="id", order_by=(), many=True
+):
+    """
+    Relation yang dimuat dengan satu query `key_column IN (nilai parent_key
+    semua baris induk)`. many=True: setiap induk mendapat list (relasi
+    one-to-many, mis. file sebuah konten); many=False: satu objek atau None
+    (relasi many-to-one, mis. konten sebuah file).
+    """
+
+    def load(parents):
+        keys = {getattr(parent, parent_key) for parent in parents}
+        keys.discard(None)
+        grouped = {}
+        if keys:
+            rows = (
+                db.session.query(model)
+                .filter(key_column.in_(keys))
+                .order_by(*order_by)
+            )
+            for row in rows:
+                grouped.setdefault(getattr(row, key_column.key), []).append(row)
+        if not many:
+            return [
+                serializer(grouped[key][0]) if key in grouped else None
+                for key in (getattr(parent, parent_key) for parent in parents)
+            ]
+        return [
+            serializer.many(grouped.get(getattr(parent, parent_key), []))
+            for parent in parents
+        ]
+
+    return Relation(load=load, requires=(parent_key,))
+
+
+def _split(raw):
+    return list(dict.fromkeys(part.strip() for part in (raw or "").split(",")))
+
+
+class Fieldset:
+    """Field dan relasi yang dipilih klien untuk satu request."""
+
+    def __init__(self, model, serializer, keys, relations, required=()):
+        self.model = model
+        self.keys = keys
+        self.serializer = serializer.only(
+            *[
+                key
+                for key in keys
+                if key not in relations or relations[key].load is None
+            ]
+        )
+        self.loaders = [
+            (key, relations[key])
+            for key in keys
+            if key in relations and relations[key].load is not None
+        ]
+        self.options = [
+            relations[key].option
+            for key in keys
+            if key in relations and relations[key].option is not None
+        ]
+
+        column_names = set(inspect(model).column_attrs.keys())
+        attributes = [
+            field_attribute.split(".")[0]
+            for _, _, field_attribute in self.serializer.fields
+        ]
+        for _, relation in self.loaders:
+            attributes.extend(relation.requires)
+        attributes.extend(required)
+        self.columns = [
+            getattr(model, name)
+            for name in dict.fromkeys(attributes)
+            if name in column_names
+        ]
+
+    def query_options(self):
+        """load_only kolom yang dibutuhkan + loader option relasi yang dipilih."""
+        return [load_only(*self.columns), *self.options]
+
+    def apply(self, query):
+        return query.options(*self.query_options())
+
+    def __call__(self, obj):
+        return self.many([obj])[0]
+
+    def many(self, objs):
+        objs = list(objs)
+        items = self.serializer.many(objs)
+        for key, relation in self.loaders:
+            for item, value in zip(items, relation.load(objs)):
+                item[key] = value
+        return items
+
+
+def parse_fieldset(model, serializer, relations=None, required=(), args=None):
+    """
+    Fieldset dari `fields` dan `expand` di query string. `relations`:
+    {nama: Relation}; `required`: nama atribut yang selalu harus dimuat
+    (mis. kolom urutan paginasi keyset). Melempar InvalidFieldsetError untuk
+    nama field atau relasi yang tidak dikenal.
+    """
+    args = request.args if args is None else args
+    relations = relations or {}
+
+    expand = [name for name in _split(args.get("expand")) if name]
+    unknown = [name for name in expand if name not in relations]
+    if unknown:
+        raise InvalidFieldsetError(
+            f"Relasi expand tidak dikenal: {', '.join(unknown)}. "
+            f"Pilihan: {', '.join(relations) or '-'}."
+        )
+
+    fields = [name for name in _split(args.get("fields")) if name]
+    available = list(dict.fromkeys(serializer.keys + list(relations)))
+    unknown = [name for name in fields if name not in available]
+    if unknown:
+        raise InvalidFieldsetError(
+            f"Field tidak dikenal: {', '.join(unknown)}. "
+            f"Pilihan: {', '.join(available)}."
+        )
+
+    if fields:
+        selected = {"id", *fields, *expand}
+    else:
+        selected = {
+            name
+            for name in available
+            if name not in relations or relations[name].default or name in expand
+        }
+    keys = [name for name in available if name in selected]
+    return Fieldset(model, serializer, keys, relations, required)
@@ -0,0 +1,18 @@
+# app/core/models.py
+from app.extensions import db
+
+
+class ResourceVersion(db.Model):
+    """
+    Penghitung versi per sumber daya (mis. "categories", "targets:user:<id>"),
+    dinaikkan di transaksi yang sama dengan setiap penulisan. Dipakai untuk ETag
+    tanpa perlu memuat atau menserialisasi datanya (lihat app.core.etag).
+    """
+
+    __tablename__ = "resource_versions"
+
+    name = db.Column(db.String(150), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ResourceVersion {self.name}={self.version}>"
@@ -0,0 +1,138 @@
+# app/core/pagination.py
+"""
+Paginasi keyset (cursor) untuk endpoint daftar.
+
+Halaman berikutnya diambil dengan `WHERE (kolom urutan) > (nilai baris terakhir)`
+alih-alih OFFSET, sehingga setiap halaman cukup membaca `limit` baris dari index
+komposit yang sesuai, berapa pun jauhnya halaman tersebut. Cursor bersifat
+opaque bagi klien (base64 dari nilai kolom urutan baris terakhir).
+
+Format respons: {"items": [...], "next_cursor": "..." | null, "limit": n}
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from flask import current_app, request
+from sqlalchemy import DateTime, tuple_
+
+
+class InvalidPaginationError(ValueError):
+    """Parameter limit atau cursor dari klien tidak valid."""
+
+
+class Page:
+    """Satu halaman hasil paginasi keyset."""
+
+    def __init__(self, items, next_cursor, limit):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.limit = limit
+
+    def to_dict(self, serialize):
+        # Serializer dari app.core.utils memproses seluruh halaman sekaligus
+        many = getattr(serialize, "many", None)
+        return {
+            "items": (
+                many(self.items)
+                if many is not None
+                else [serialize(item) for item in self.items]
+            ),
+            "next_cursor": self.next_cursor,
+            "limit": self.limit,
+        }
+
+
+def encode_cursor(values):
+    raw = json.dumps(
+        [value.isoformat() if isinstance(value, datetime) else value for value in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, columns):
+    """Nilai kolom urutan dari cursor; tipe datetime dipulihkan sesuai tipe kolom."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        return [
+            datetime.fromisoformat(value)
+            if isinstance(column.type, DateTime) and value is not None
+            else value
+            for column, value in zip(columns, values)
+        ]
+    except (ValueError, TypeError, UnicodeError, binascii.Error):
+        raise InvalidPaginationError("Cursor tidak valid.")
+
+
+def parse_limit(args=None):
+    args = request.args if args is None else args
+    config = current_app.config
+    default_limit = config.get("PAGINATION_DEFAULT_LIMIT", 50)
+    max_limit = config.get("PAGINATION_MAX_LIMIT", 200)
+    raw = args.get("limit")
+    if raw is None or raw == "":
+        return default_limit
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise InvalidPaginationError("'limit' harus berupa bilangan bulat positif.")
+    if limit < 1:
+        raise InvalidPaginationError("'limit' harus berupa bilangan bulat positif.")
+    return min(limit, max_limit)
+
+
+def parse_offset(args=None):
+    """
+    Parameter `offset` untuk hasil yang diurutkan menurut skor (mis. pencarian
+    full-text), yang tidak punya kolom urutan untuk paginasi keyset.
+    """
+    args = request.args if args is None else args
+    raw = args.get("offset")
+    if raw is None or raw == "":
+        return 0
+    try:
+        offset = int(raw)
+    except ValueError:
+        raise InvalidPaginationError("'offset' harus berupa bilangan bulat >= 0.")
+    if offset < 0:
+        raise InvalidPaginationError("'offset' harus berupa bilangan bulat >= 0.")
+    return offset
+
+
+def apply_keyset(query, columns, descending=False, cursor=None):
+    """Urutkan query menurut `columns` dan lanjutkan setelah baris `cursor` (jika ada)."""
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        key = tuple_(*columns)
+        query = query.filter(
+            key < tuple_(*values) if descending else key > tuple_(*values)
+        )
+    return query.order_by(
+        *[column.desc() if descending else column.asc() for column in columns]
+    )
+
+
+def paginate_keyset(query, columns, descending=False, args=None):
+    """
+    Ambil satu halaman dari ORM Query berurutan menurut
+    `columns` (mis. (Content.created_at, Content.id)), membaca `limit` dan
+    `cursor` dari query string. Kolom terakhir harus unik (biasanya id) agar
+    urutan stabil. Melempar InvalidPaginationError untuk parameter yang salah.
+    """
+    args = request.args if args is None else args
+    limit = parse_limit(args)
+    query = apply_keyset(query, columns, descending, args.get("cursor"))
+    # Satu baris ekstra untuk mengetahui apakah masih ada halaman berikutnya
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in columns])
+    return Page(rows, next_cursor, limit)
@@ -0,0 +1,92 @@
+# app/core/streaming.py
+"""
+Respons streaming untuk endpoint daftar (ekspor data besar).
+
+Baris dibaca dengan `yield_per` (server-side cursor di PostgreSQL), diserialisasi
+satu per satu, dan dikirim per potongan sebagai array JSON atau NDJSON (satu
+objek JSON per baris). Tidak ada list hasil maupun string JSON utuh di memori,
+sehingga memori puncak tetap konstan berapa pun jumlah barisnya.
+
+Mode dipilih dengan `?stream=json|ndjson` atau header
+`Accept: application/x-ndjson`.
+"""
+from flask import Response, current_app, request, stream_with_context
+
+from .pagination import apply_keyset
+
+NDJSON_MIMETYPES = ("application/x-ndjson", "application/ndjson")
+
+
+def get_stream_format(args=None):
+    """
+    "ndjson", "json", atau None (respons biasa berpaginasi) sesuai query param
+    `stream` dan header Accept request saat ini.
+    """
+    args = request.args if args is None else args
+    requested = (args.get("stream") or "").lower()
+    if requested in ("json", "ndjson"):
+        return requested
+    best = request.accept_mimetypes.best_match(("application/json",) + NDJSON_MIMETYPES)
+    return "ndjson" if best in NDJSON_MIMETYPES else None
+
+
+def _chunked(items, serialize, chunk_size):
+    """
+    Kelompokkan item terserialisasi (string JSON) per chunk_size item. Serializer
+    yang punya `many` (app.core.utils / app.core.fieldsets) dipanggil sekali per
+    chunk, sehingga relasi yang di-expand dimuat per batch, bukan per baris.
+    """
+    dumps = current_app.json.dumps
+    many = getattr(serialize, "many", None) or (
+        lambda rows: [serialize(row) for row in rows]
+    )
+    buffer = []
+    for item in items:
+        buffer.append(item)
+        if len(buffer) >= chunk_size:
+            yield [dumps(data) for data in many(buffer)]
+            buffer = []
+    if buffer:
+        yield [dumps(data) for data in many(buffer)]
+
+
+def stream_query(query, serialize, stream_format, chunk_size=None):
+    """
+    Response Flask yang men-stream seluruh hasil query (ORM Query) dalam format
+    "json" (satu array) atau "ndjson". Hanya chunk_size baris yang dimuat dari
+    database sekaligus.
+    """
+    chunk_size = chunk_size or current_app.config.get("STREAM_CHUNK_SIZE", 500)
+    rows = query.yield_per(chunk_size)
+
+    if stream_format == "ndjson":
+
+        def generate():
+            for chunk in _chunked(rows, serialize, chunk_size):
+                yield "\n".join(chunk) + "\n"
+
+        mimetype = NDJSON_MIMETYPES[0]
+    else:
+
+        def generate():
+            yield "["
+            first = True
+            for chunk in _chunked(rows, serialize, chunk_size):
+                yield ("" if first else ",") + ",".join(chunk)
+                first = False
+            yield "]"
+
+        mimetype = "application/json"
+
+    # stream_with_context: sesi database & konteks request tetap hidup selama streaming
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+
+def stream_keyset(query, columns, serialize, stream_format, descending=False):
+    """
+    Stream seluruh hasil dengan urutan yang sama seperti paginate_keyset.
+    Parameter `cursor` tetap dihormati (melanjutkan ekspor), `limit` diabaikan.
+    Melempar InvalidPaginationError sebelum streaming dimulai jika cursor salah.
+    """
+    query = apply_keyset(query, columns, descending, request.args.get("cursor"))
+    return stream_query(query, serialize, stream_format)
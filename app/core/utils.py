@@ -0,0 +1,272 @@
+# app/core/utils.py
+"""
+Serializer bersama untuk model (objek ORM -> dict siap-JSON) dan JSON provider
+Flask berbasis orjson.
+
+Setiap model punya satu skema (CATEGORY, CONTENT, TARGET, ...) berupa daftar
+field (key output, jenis, atribut sumber). Saat dibuat, skema dikompilasi menjadi
+fungsi Python khusus (satu dict literal, tanpa loop per field), dan
+`Serializer.many()` menjadi satu list comprehension, sehingga biaya per baris
+setara dict yang ditulis tangan. Skema turunan untuk respons yang hanya memuat
+sebagian field dibuat dengan `.only(...)`.
+"""
+import operator
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson opsional, fallback ke json stdlib
+    orjson = None
+
+# --- Jenis field ---
+RAW = "raw"  # nilai atribut apa adanya
+STR = "str"  # str(nilai)
+OPTIONAL_STR = "str?"  # str(nilai), atau None jika nilai kosong
+DATETIME = "datetime"  # ISO 8601 + "Z"
+OPTIONAL_DATETIME = "datetime?"  # ISO 8601 + "Z", atau None jika nilai kosong
+# Selain itu, jenis boleh berupa callable(nilai) (mis. skema lain `.many`)
+
+_KINDS = (RAW, STR, OPTIONAL_STR, DATETIME, OPTIONAL_DATETIME)
+
+
+def isoformat_z(value):
+    """Format tanggal yang dipakai semua respons API: ISO 8601 diakhiri "Z"."""
+    return value.isoformat() + "Z"
+
+
+def _converter(kind):
+    if callable(kind):
+        return kind
+    if kind == STR:
+        return str
+    if kind == OPTIONAL_STR:
+        return lambda value: str(value) if value else None
+    if kind == DATETIME:
+        return isoformat_z
+    if kind == OPTIONAL_DATETIME:
+        return lambda value: isoformat_z(value) if value else None
+    return None
+
+
+class Serializer:
+    """
+    Skema serialisasi satu model. Setiap field berupa tuple
+    `(key, jenis=RAW, atribut=key)`; atribut boleh bertitik ("category.name").
+
+        CATEGORY(category)       -> dict
+        CATEGORY.many(categories) -> list of dict
+
+    compiled=False memakai jalur interpretasi (loop per field) dengan hasil yang
+    sama; berguna untuk debugging dan sebagai pembanding di benchmark.
+    """
+
+    def __init__(self, *fields, compiled=True):
+        self.fields = tuple(self._normalize_field(field) for field in fields)
+        self.compiled = compiled
+        self._subsets = {}
+        if compiled:
+            self._one, self._many = self._compile()
+        else:
+            self._one, self._many = self._interpret()
+
+    @staticmethod
+    def _normalize_field(field):
+        key, kind, attribute = (tuple(field) + (RAW, None)[len(field) - 1 :])[:3]
+        attribute = attribute or key
+        if not callable(kind) and kind not in _KINDS:
+            raise ValueError(f"Jenis field tidak dikenal untuk '{key}': {kind!r}")
+        if not all(part.isidentifier() for part in attribute.split(".")):
+            raise ValueError(f"Atribut field tidak valid untuk '{key}': {attribute!r}")
+        return key, kind, attribute
+
+    @property
+    def keys(self):
+        return [key for key, _, _ in self.fields]
+
+    def only(self, *keys):
+        """
+        Skema baru yang hanya memuat field `keys` (urutan mengikuti skema ini).
+        Hasilnya disimpan per kombinasi key, sehingga `?fields=` yang sama tidak
+        dikompilasi ulang di setiap request.
+        """
+        cache_key = frozenset(keys)
+        subset = self._subsets.get(cache_key)
+        if subset is None:
+            unknown = cache_key - set(self.keys)
+            if unknown:
+                raise KeyError(f"Field tidak dikenal: {', '.join(sorted(unknown))}")
+            subset = Serializer(
+                *[field for field in self.fields if field[0] in cache_key],
+                compiled=self.compiled,
+            )
+            self._subsets[cache_key] = subset
+        return subset
+
+    def __call__(self, obj):
+        return self._one(obj)
+
+    def many(self, objs):
+        return self._many(objs)
+
+    def _compile(self):
+        namespace = {}
+        entries = []
+        for index, (key, kind, attribute) in enumerate(self.fields):
+            value = f"obj.{attribute}"
+            if kind == RAW:
+                expression = value
+            elif kind == STR:
+                expression = f"str({value})"
+            elif kind == OPTIONAL_STR:
+                expression = f"(str(v) if (v := {value}) else None)"
+            elif kind == DATETIME:
+                expression = f'{value}.isoformat() + "Z"'
+            elif kind == OPTIONAL_DATETIME:
+                expression = f'(v.isoformat() + "Z" if (v := {value}) else None)'
+            else:
+                namespace[f"_convert{index}"] = kind
+                expression = f"_convert{index}({value})"
+            entries.append(f"{key!r}: {expression}")
+        body = "{" + ", ".join(entries) + "}"
+        source = (
+            f"def serialize_one(obj):\n    return {body}\n"
+            f"def serialize_many(objs):\n    return [{body} for obj in objs]\n"
+        )
+        exec(compile(source, f"<serializer {', '.join(self.keys)}>", "exec"), namespace)
+        return namespace["serialize_one"], namespace["serialize_many"]
+
+    def _interpret(self):
+        plan = [
+            (key, operator.attrgetter(attribute), _converter(kind))
+            for key, kind, attribute in self.fields
+        ]
+
+        def serialize_one(obj):
+            result = {}
+            for key, getter, convert in plan:
+                value = getter(obj)
+                result[key] = convert(value) if convert is not None else value
+            return result
+
+        def serialize_many(objs):
+            return [serialize_one(obj) for obj in objs]
+
+        return serialize_one, serialize_many
+
+
+# --- Skema per model ---
+USER = Serializer(
+    ("id", STR),
+    ("username",),
+    ("email",),
+    ("created_at", DATETIME),
+)
+
+CATEGORY = Serializer(
+    ("id", STR),
+    ("name",),
+    ("description",),
+    ("parent_id", OPTIONAL_STR),
+    ("created_at", DATETIME),
+    ("updated_at", DATETIME),
+)
+
+# Kategori ringkas di dalam konten, dari asosiasi ContentCategory
+CONTENT_CATEGORY = Serializer(
+    ("id", STR, "category.id"),
+    ("name", RAW, "category.name"),
+)
+
+CONTENT = Serializer(
+    ("id", STR),
+    ("title",),
+    ("content_type",),
+    ("data_url",),
+    ("metadata_tags",),
+    ("user_id", STR),
+    ("created_at", DATETIME),
+    ("updated_at", DATETIME),
+    ("categories", CONTENT_CATEGORY.many, "categories_assoc"),
+)
+
+TARGET = Serializer(
+    ("id", STR),
+    ("name",),
+    ("description",),
+    ("user_id", STR),
+    ("created_at", DATETIME),
+    ("updated_at", DATETIME),
+)
+
+TARGET_PROGRESS = Serializer(
+    ("id", STR),
+    ("target_id", STR),
+    ("status",),
+    ("notes",),
+    ("content_id", OPTIONAL_STR),
+    ("achieved_at", OPTIONAL_DATETIME),
+    ("user_id", STR),
+    ("user_id_recorder", STR, "user_id"),  # User yang mencatat progress
+    ("created_at", DATETIME),
+    ("updated_at", DATETIME),
+)
+
+FILE = Serializer(
+    ("id", STR),
+    ("file_name_server", RAW, "file_name"),
+    ("original_file_name",),
+    ("file_type",),
+    ("file_size_bytes",),
+    ("uploaded_at", DATETIME),
+    ("download_url", lambda file_id: f"/files/download/{file_id}", "id"),
+    ("user_id", STR),
+    ("content_id", OPTIONAL_STR),
+    ("quality_metrics",),
+)
+
+
+# --- JSON provider ---
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider Flask yang memakai orjson (datetime, date, UUID, dataclass
+    diserialisasi langsung di C). Opsi sort_keys dan compact tetap dihormati;
+    tipe lain melewati `default` seperti provider bawaan. Jika orjson tidak
+    terpasang, objek tidak didukung orjson (mis. integer > 64 bit), atau respons
+    perlu di-indent (mode debug), provider kembali ke json stdlib.
+
+    Berbeda dengan json stdlib, karakter non-ASCII ditulis sebagai UTF-8 apa
+    adanya, bukan escape \\uXXXX (JSON-nya tetap setara).
+    """
+
+    def _orjson_options(self):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def _orjson_dumps(self, obj):
+        """bytes JSON dari orjson, atau None jika harus memakai json stdlib."""
+        if orjson is None:
+            return None
+        try:
+            return orjson.dumps(
+                obj, default=self.default, option=self._orjson_options()
+            )
+        except (TypeError, orjson.JSONEncodeError):
+            return None
+
+    def dumps(self, obj, **kwargs):
+        if not kwargs:
+            data = self._orjson_dumps(obj)
+            if data is not None:
+                return data.decode("utf-8")
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        data = self._orjson_dumps(self._prepare_response_obj(args, kwargs))
+        if data is None:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(data + b"\n", mimetype=self.mimetype)
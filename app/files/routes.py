@@ -4,11 +4,43 @@ import uuid
 from flask import Blueprint, request, jsonify, current_app, send_from_directory
 from werkzeug.utils import secure_filename
 from app.extensions import db
+from app.contents.models import Content
+from app.core.fieldsets import InvalidFieldsetError, batch_relation, parse_fieldset
+from app.core.utils import CONTENT, FILE
 from .models import File  # Impor model File
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 files_bp = Blueprint("files_bp", __name__, url_prefix="/files")
 
+_FILE_UPLOADED = FILE.only(
+    "id",
+    "file_name_server",
+    "original_file_name",
+    "file_type",
+    "file_size_bytes",
+    "uploaded_at",
+    "download_url",
+)
+_FILE_INFO = FILE.only(
+    "id",
+    "file_name_server",
+    "original_file_name",
+    "file_type",
+    "file_size_bytes",
+    "uploaded_at",
+    "user_id",
+    "content_id",
+    "quality_metrics",
+)
+# Konten tempat file melekat (?expand=content), tanpa kategori
+_FILE_CONTENT_RELATION = batch_relation(
+    Content,
+    Content.id,
+    CONTENT.only("id", "title", "content_type", "data_url"),
+    parent_key="content_id",
+    many=False,
+)
+
 
 def allowed_file(filename):
     """Memeriksa apakah ekstensi file diizinkan."""
@@ -76,7 +108,6 @@ def upload_file_route():  # Mengganti nama fungsi agar tidak bentrok dengan impo
             )
             db.session.add(new_file_entry)
             db.session.commit()
-            file_id_str = str(new_file_entry.id)
 
         except Exception as e:
             db.session.rollback()
@@ -99,15 +130,7 @@ def upload_file_route():  # Mengganti nama fungsi agar tidak bentrok dengan impo
             jsonify(
                 {
                     "msg": "File berhasil diunggah",
-                    "file_info": {
-                        "id": file_id_str,
-                        "file_name_server": new_file_entry.file_name,
-                        "original_file_name": new_file_entry.original_file_name,
-                        "file_type": new_file_entry.file_type,
-                        "file_size_bytes": new_file_entry.file_size_bytes,
-                        "uploaded_at": new_file_entry.uploaded_at.isoformat() + "Z",
-                        "download_url": f"/files/download/{file_id_str}",
-                    },
+                    "file_info": _FILE_UPLOADED(new_file_entry),
                 }
             ),
             201,
@@ -149,9 +172,19 @@ def download_file_route(file_id):  # Mengganti nama fungsi
 @files_bp.route("/<string:file_id>/info", methods=["GET"])
 @jwt_required()
 def get_file_info_route(file_id):  # Mengganti nama fungsi
+    """
+    Informasi satu file. Pilih field dengan ?fields=id,file_type dan muat konten
+    terkait dengan ?expand=content (lihat app.core.fieldsets).
+    """
     current_user_id = get_jwt_identity()
-    file_entry = File.query.filter_by(
-        id=file_id
+    try:
+        fieldset = parse_fieldset(
+            File, _FILE_INFO, {"content": _FILE_CONTENT_RELATION}
+        )
+    except InvalidFieldsetError as e:
+        return jsonify({"msg": str(e)}), 400
+    file_entry = fieldset.apply(
+        File.query.filter_by(id=file_id)
     ).first()  # Tambahkan user_id jika info hanya untuk pemilik
 
     if not file_entry:
@@ -161,21 +194,4 @@ def get_file_info_route(file_id):  # Mengganti nama fungsi
     # if str(file_entry.user_id) != current_user_id:
     #     return jsonify({"msg": "Anda tidak berhak melihat informasi file ini"}), 403
 
-    return (
-        jsonify(
-            {
-                "id": str(file_entry.id),
-                "file_name_server": file_entry.file_name,
-                "original_file_name": file_entry.original_file_name,
-                "file_type": file_entry.file_type,
-                "file_size_bytes": file_entry.file_size_bytes,
-                "uploaded_at": file_entry.uploaded_at.isoformat() + "Z",
-                "user_id": str(file_entry.user_id),
-                "content_id": (
-                    str(file_entry.content_id) if file_entry.content_id else None
-                ),
-                "quality_metrics": file_entry.quality_metrics,
-            }
-        ),
-        200,
-    )
+    return jsonify(fieldset(file_entry)), 200
@@ -0,0 +1,48 @@
+# app/health/routes.py
+from flask import Blueprint, jsonify
+from app import ml_services
+from app.core.cache import get_response_cache
+
+# Blueprint untuk endpoint health check (liveness/readiness) bagi orchestrator
+health_bp = Blueprint("health_bp", __name__, url_prefix="/health")
+
+
+@health_bp.route("/live", methods=["GET"])
+def liveness():
+    """
+    Endpoint liveness: proses hidup dan bisa melayani request HTTP.
+    """
+    return jsonify({"status": "ok"}), 200
+
+
+@health_bp.route("/ready", methods=["GET"])
+def readiness():
+    """
+    Endpoint readiness: melaporkan status pemuatan model ML dan durasinya.
+    Mengembalikan 200 jika worker siap menerima traffic ML, 503 jika belum.
+    Pada mode "lazy", model yang belum dimuat dianggap siap karena akan dimuat
+    saat request ML pertama.
+    """
+    status = ml_services.get_model_load_status()
+    ready = status["state"] == "ready" or (
+        status["loading_mode"] == "lazy" and status["state"] == "not_loaded"
+    )
+    return (
+        jsonify({"status": "ready" if ready else "not_ready", "model": status}),
+        200 if ready else 503,
+    )
+
+
+@health_bp.route("/cache", methods=["GET"])
+def response_cache_stats():
+    """
+    Statistik cache respons (hit rate, miss yang digabung, invalidasi, error
+    backend) sebagai bahan tuning RESPONSE_CACHE_TTL_SECONDS / MAX_ENTRIES.
+    """
+    cache = get_response_cache()
+    return (
+        jsonify(
+            {"enabled": cache is not None, "stats": cache.stats() if cache else None}
+        ),
+        200,
+    )
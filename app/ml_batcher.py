@@ -0,0 +1,231 @@
+# app/ml_batcher.py
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class _PendingItem:
+    """Satu input yang menunggu di antrean batcher."""
+
+    __slots__ = ("array", "future", "enqueued_at")
+
+    def __init__(self, array):
+        self.array = array
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class MicroBatcher:
+    """
+    Menggabungkan beberapa request prediksi yang datang bersamaan menjadi satu
+    panggilan `predict_fn`.
+
+    Setiap input (array dengan shape (1, ...)) dimasukkan ke antrean sesuai
+    bucket panjang sekuensnya. Sebuah bucket di-flush menjadi satu batch ketika
+    jumlah item mencapai `max_batch_size` atau item tertuanya sudah menunggu
+    `max_wait_ms` milidetik.
+    """
+
+    def __init__(
+        self,
+        predict_fn,
+        max_batch_size=32,
+        max_wait_ms=5.0,
+        length_buckets=None,
+        trim_padding=False,
+        stats_window=500,
+        logger=None,
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.length_buckets = sorted(set(length_buckets or []))
+        self.trim_padding = trim_padding
+        self.logger = logger
+
+        self._queues = {}  # bucket_key -> list[_PendingItem]
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+
+        # Statistik per batch (jendela terbatas) dan total kumulatif
+        self._batch_stats = deque(maxlen=stats_window)
+        self._total_batches = 0
+        self._total_items = 0
+
+    # --- API publik ---
+
+    def submit(self, array):
+        """Masukkan satu input ke antrean dan kembalikan Future hasil prediksinya."""
+        if not isinstance(array, np.ndarray) or array.ndim < 1 or array.shape[0] != 1:
+            raise ValueError("MicroBatcher hanya menerima array dengan shape (1, ...).")
+
+        item = _PendingItem(array)
+        key = self._bucket_key(array)
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("MicroBatcher sudah dihentikan.")
+            self._ensure_worker()
+            self._queues.setdefault(key, []).append(item)
+            self._cond.notify()
+        return item.future
+
+    def predict(self, array, timeout=None):
+        """Versi blocking dari `submit`: tunggu hingga batch berisi input ini selesai."""
+        return self.submit(array).result(timeout=timeout)
+
+    def stats(self):
+        """Ringkasan statistik ukuran dan latensi batch untuk keperluan tuning."""
+        with self._cond:
+            recent = list(self._batch_stats)
+            queued = sum(len(items) for items in self._queues.values())
+            total_batches = self._total_batches
+            total_items = self._total_items
+
+        sizes = np.array([b["size"] for b in recent], dtype=np.float64)
+        predict_ms = np.array([b["predict_ms"] for b in recent], dtype=np.float64)
+        wait_ms = np.array([b["queue_wait_ms"] for b in recent], dtype=np.float64)
+
+        def _summary(values):
+            if values.size == 0:
+                return None
+            return {
+                "avg": round(float(values.mean()), 3),
+                "p50": round(float(np.percentile(values, 50)), 3),
+                "p95": round(float(np.percentile(values, 95)), 3),
+                "max": round(float(values.max()), 3),
+            }
+
+        return {
+            "config": {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "length_buckets": self.length_buckets,
+                "trim_padding": self.trim_padding,
+            },
+            "total_batches": total_batches,
+            "total_items": total_items,
+            "queued_items": queued,
+            "window": {
+                "batches": len(recent),
+                "batch_size": _summary(sizes),
+                "predict_ms": _summary(predict_ms),
+                "queue_wait_ms": _summary(wait_ms),
+            },
+            "recent_batches": recent[-20:],
+        }
+
+    def shutdown(self, timeout=None):
+        """Hentikan worker setelah antrean yang tersisa di-flush."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout=timeout)
+
+    # --- Internal ---
+
+    def _ensure_worker(self):
+        # Dipanggil dengan self._cond sudah dipegang
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="ml-micro-batcher", daemon=True
+            )
+            self._thread.start()
+
+    def _effective_length(self, array):
+        """Panjang sekuens tanpa padding (asumsi padding 'post' dengan nilai 0)."""
+        row = array.reshape(array.shape[0], -1)[0] if array.ndim > 2 else array[0]
+        nonzero = np.flatnonzero(row)
+        return int(nonzero[-1]) + 1 if nonzero.size else 0
+
+    def _length_bucket(self, length):
+        for boundary in self.length_buckets:
+            if length <= boundary:
+                return boundary
+        return None  # Lebih panjang dari bucket terbesar
+
+    def _bucket_key(self, array):
+        # Hanya input dengan shape dan dtype yang sama yang bisa digabung jadi satu batch
+        length_bucket = None
+        if self.length_buckets and array.ndim == 2:
+            length_bucket = self._length_bucket(self._effective_length(array))
+        return (array.shape[1:], array.dtype.str, length_bucket)
+
+    def _next_ready_bucket(self, now):
+        """Pilih bucket yang harus di-flush, atau hitung berapa lama harus menunggu."""
+        oldest_key, oldest_time = None, None
+        for key, items in self._queues.items():
+            if not items:
+                continue
+            if len(items) >= self.max_batch_size:
+                return key, "size", 0.0
+            if oldest_time is None or items[0].enqueued_at < oldest_time:
+                oldest_key, oldest_time = key, items[0].enqueued_at
+
+        if oldest_key is None:
+            return None, None, None
+        remaining = (oldest_time + self.max_wait) - now
+        if remaining <= 0 or self._stopped:
+            return oldest_key, "timeout", 0.0
+        return None, None, remaining
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    key, reason, remaining = self._next_ready_bucket(time.perf_counter())
+                    if key is not None:
+                        items = self._queues[key][: self.max_batch_size]
+                        del self._queues[key][: len(items)]
+                        if not self._queues[key]:
+                            del self._queues[key]
+                        break
+                    if self._stopped and not self._queues:
+                        return
+                    self._cond.wait(timeout=remaining)
+
+            self._flush(key, items, reason)
+
+    def _flush(self, key, items, reason):
+        started = time.perf_counter()
+        queue_wait_ms = (started - items[0].enqueued_at) * 1000.0
+        try:
+            batch = np.concatenate([item.array for item in items], axis=0)
+            length_bucket = key[2]
+            if self.trim_padding and length_bucket is not None:
+                batch = batch[:, :length_bucket]
+            output = self.predict_fn(batch)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(
+                    f"Micro-batch berisi {len(items)} item gagal diprediksi: {e}",
+                    exc_info=True,
+                )
+            for item in items:
+                item.future.set_exception(e)
+            return
+
+        predict_ms = (time.perf_counter() - started) * 1000.0
+        for index, item in enumerate(items):
+            if isinstance(output, (list, tuple)):
+                item.future.set_result([o[index : index + 1] for o in output])
+            else:
+                item.future.set_result(output[index : index + 1])
+
+        with self._cond:
+            self._total_batches += 1
+            self._total_items += len(items)
+            self._batch_stats.append(
+                {
+                    "size": len(items),
+                    "length_bucket": key[2],
+                    "flushed_by": reason,
+                    "queue_wait_ms": round(queue_wait_ms, 3),
+                    "predict_ms": round(predict_ms, 3),
+                }
+            )
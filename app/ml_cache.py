@@ -0,0 +1,110 @@
+# app/ml_cache.py
+import copy
+import hashlib
+import json
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_input(input_data_raw, case_insensitive=True):
+    """
+    Normalisasi input mentah sebelum di-hash agar teks yang sama (beda spasi
+    atau kapitalisasi) menghasilkan kunci cache yang sama.
+    """
+    if isinstance(input_data_raw, str):
+        text = unicodedata.normalize("NFKC", input_data_raw)
+        text = " ".join(text.split())
+        return text.casefold() if case_insensitive else text
+    # Input non-teks (mis. list fitur numerik) diserialisasi secara deterministik
+    return json.dumps(input_data_raw, sort_keys=True, default=str)
+
+
+class PredictionCache:
+    """
+    Cache hasil prediksi dengan batas ukuran (LRU) dan masa berlaku (TTL).
+    Kunci cache adalah hash dari input ternormalisasi + versi model, sehingga
+    hasil dari model lama tidak pernah terpakai setelah model berganti.
+    """
+
+    def __init__(self, max_entries=10000, ttl_seconds=3600, case_insensitive=True):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self.case_insensitive = case_insensitive
+
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._model_version = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def make_key(self, input_data_raw, *extra):
+        normalized = normalize_input(input_data_raw, self.case_insensitive)
+        digest = hashlib.sha256()
+        digest.update(str(self._model_version).encode("utf-8"))
+        for part in extra:
+            digest.update(b"\x00" + str(part).encode("utf-8"))
+        digest.update(b"\x00" + normalized.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # Salinan agar pemanggil tidak bisa mengubah isi cache
+        return copy.deepcopy(value)
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def set_model_version(self, model_version):
+        """Kosongkan cache jika model yang dimuat berbeda dari sebelumnya."""
+        with self._lock:
+            if model_version == self._model_version:
+                return
+            self._model_version = model_version
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "model_version": self._model_version,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
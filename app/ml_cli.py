@@ -0,0 +1,329 @@
+# app/ml_cli.py
+import json
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+import click
+import numpy as np
+from flask import current_app
+from flask.cli import AppGroup
+
+from app import ml_services
+
+# Grup perintah CLI untuk operasi ML, dipanggil dengan `flask ml <perintah>`
+ml_cli = AppGroup("ml", help="Perintah utilitas untuk model machine learning.")
+
+
+@ml_cli.command("export-numpy")
+@click.option(
+    "--model",
+    "model_path",
+    default=None,
+    help="Path model Keras (.h5). Default: versi aktif di registry atau ML_MODEL_PATH.",
+)
+@click.option("--output", "output_path", default=None, help="Path bundle .npz hasil ekspor.")
+@click.option(
+    "--tolerance",
+    default=1e-4,
+    show_default=True,
+    help="Selisih absolut maksimum yang diizinkan antara output NumPy dan Keras.",
+)
+@click.option(
+    "--samples",
+    default=64,
+    show_default=True,
+    help="Jumlah input acak untuk pengecekan paritas.",
+)
+def export_numpy_command(model_path, output_path, tolerance, samples):
+    """Ekspor model Keras ke bundle NumPy dan cek paritas outputnya."""
+    from app.ml_runtime import NumpyModel, export_numpy_bundle
+
+    model_path = model_path or ml_services.resolve_model_artifact(backend="keras")[0]
+    output_path = output_path or os.path.splitext(model_path)[0] + ".npz"
+
+    keras_model = ml_services._get_keras().models.load_model(model_path)
+    try:
+        manifest = export_numpy_bundle(keras_model, output_path)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(
+        f"Bundle NumPy ({len(manifest['layers'])} layer) disimpan ke: {output_path}"
+    )
+
+    max_diff = check_parity(keras_model, NumpyModel.load(output_path), samples)
+    click.echo(f"Selisih absolut maksimum Keras vs NumPy: {max_diff:.3e}")
+    if max_diff > tolerance:
+        raise click.ClickException(
+            f"Paritas gagal: selisih {max_diff:.3e} melebihi toleransi {tolerance:.1e}"
+        )
+
+
+def check_parity(keras_model, numpy_model, samples=64, seed=0):
+    """
+    Bandingkan output kedua backend pada input acak. Untuk input integer
+    (token id) nilai diambil dari rentang kosakata layer Embedding pertama.
+    Mengembalikan selisih absolut maksimum.
+    """
+    rng = np.random.default_rng(seed)
+    spec = numpy_model.inputs[0]
+    shape = [samples] + [dim or 32 for dim in spec.shape[1:]]
+    dtype = np.dtype(spec.dtype)
+    if np.issubdtype(dtype, np.integer):
+        vocab_size = next(
+            (
+                numpy_model.weights[layer["embeddings"]].shape[0]
+                for layer in numpy_model.layers
+                if layer["type"] == "Embedding"
+            ),
+            2,
+        )
+        inputs = rng.integers(0, vocab_size, size=shape).astype(dtype)
+        # Sebagian posisi akhir dibuat nol agar jalur padding/mask ikut teruji
+        inputs[: samples // 2, shape[1] // 2 :] = 0
+    else:
+        inputs = rng.standard_normal(shape).astype(dtype)
+
+    expected = keras_model.predict(inputs, verbose=0)
+    actual = numpy_model.predict(inputs)
+    return float(np.max(np.abs(expected - actual)))
+
+
+@ml_cli.command("backfill")
+@click.option(
+    "--chunk-size",
+    type=int,
+    default=None,
+    help="Jumlah konten per chunk. Default: ML_BACKFILL_CHUNK_SIZE.",
+)
+@click.option(
+    "--checkpoint",
+    "checkpoint_path",
+    default=None,
+    help="File checkpoint progres. Default: ML_BACKFILL_CHECKPOINT_PATH.",
+)
+@click.option("--restart", is_flag=True, help="Abaikan checkpoint dan mulai dari awal.")
+@click.option(
+    "--limit", type=int, default=None, help="Berhenti setelah N konten pada run ini."
+)
+@click.option(
+    "--max-retries",
+    type=int,
+    default=None,
+    help="Batas percobaan ulang chunk saat inferensi sibuk. "
+    "Default: ML_BACKFILL_MAX_RETRIES.",
+)
+def backfill_command(chunk_size, checkpoint_path, restart, limit, max_retries):
+    """
+    Klasifikasi ulang seluruh konten dengan model aktif dan bangun ulang
+    index embedding untuk pencarian semantik.
+
+    Tabel contents dibaca per chunk berurutan id (keyset, tanpa OFFSET) dan
+    hanya kolom yang dibutuhkan, diprediksi dengan satu panggilan batch per
+    chunk, lalu hasilnya ditulis dengan bulk update. Setelah setiap chunk
+    di-commit, id terakhir dicatat di file checkpoint sehingga perintah yang
+    terhenti bisa dijalankan lagi dan melanjutkan dari chunk berikutnya.
+    Chunk yang ditolak karena inferensi sibuk dicoba lagi dengan jeda yang
+    naik eksponensial, paling banyak --max-retries kali.
+    """
+    from sqlalchemy import func, select
+
+    from app.contents.models import Content
+    from app.analytics.services import get_embedding_index, is_embedding_index_enabled
+    from app.core.cache import invalidate_cache_tags
+    from app.contents.services import (
+        CLASSIFICATION_TEXT_COLUMNS,
+        classification_texts,
+        store_classification_results,
+        update_embedding_index,
+    )
+    from app.extensions import db
+
+    config = current_app.config
+    chunk_size = max(1, chunk_size or config.get("ML_BACKFILL_CHUNK_SIZE", 500))
+    checkpoint_path = checkpoint_path or config["ML_BACKFILL_CHECKPOINT_PATH"]
+    if max_retries is None:
+        max_retries = config.get("ML_BACKFILL_MAX_RETRIES", 5)
+
+    load_error = ml_services._ensure_model_loaded()
+    if load_error:
+        raise click.ClickException(load_error["error"])
+    model_version = ml_services.get_active_model().version
+
+    checkpoint = None if restart else read_backfill_checkpoint(checkpoint_path)
+    if checkpoint and checkpoint.get("model_version") != model_version:
+        raise click.ClickException(
+            f"Checkpoint '{checkpoint_path}' dibuat untuk versi model "
+            f"{checkpoint.get('model_version')}, sedangkan versi aktif {model_version}. "
+            "Gunakan --restart untuk memulai dari awal."
+        )
+    if checkpoint:
+        click.echo(
+            f"Melanjutkan dari checkpoint: {checkpoint['processed']} konten sudah diproses."
+        )
+    else:
+        checkpoint = {
+            "model_version": model_version,
+            "last_id": None,
+            "processed": 0,
+            "failed": 0,
+            "assigned": 0,
+        }
+        if is_embedding_index_enabled():
+            # Embedding versi model lama tidak sebanding: index dibangun ulang dari nol
+            get_embedding_index().reset(model_version)
+
+    def after_last_id(query):
+        if checkpoint["last_id"] is None:
+            return query
+        return query.where(Content.id > checkpoint["last_id"])
+
+    total = db.session.scalar(after_last_id(select(func.count(Content.id))))
+    if limit is not None:
+        total = min(total, limit)
+    click.echo(
+        f"Backfill {total} konten dengan model versi {model_version} "
+        f"(chunk {chunk_size})."
+    )
+
+    top_k = config.get("ML_AUTO_CLASSIFY_TOP_K", 3)
+    done = 0
+    retries = 0
+    started = time.perf_counter()
+    while done < total:
+        # Keyset pagination: hanya satu chunk baris (kolom teks saja) di memori
+        rows = db.session.execute(
+            after_last_id(select(*CLASSIFICATION_TEXT_COLUMNS))
+            .order_by(Content.id)
+            .limit(min(chunk_size, total - done))
+        ).all()
+        if not rows:
+            break
+
+        content_ids = [row.id for row in rows]
+        try:
+            results = ml_services.classify_batch(
+                classification_texts(rows), top_k=top_k
+            )
+        except ml_services.InferenceOverloadedError as e:
+            # Server sedang sibuk (proses yang sama); coba lagi chunk yang sama
+            retries += 1
+            if retries > max_retries:
+                raise click.ClickException(
+                    f"Inferensi masih sibuk setelah {max_retries} percobaan ulang; "
+                    f"backfill dihentikan. Jalankan lagi untuk melanjutkan dari "
+                    f"checkpoint ({checkpoint['processed']} konten sudah diproses)."
+                )
+            delay = max(e.retry_after, 1) * 2 ** (retries - 1)
+            click.echo(
+                f"Inferensi sibuk ({e}); mencoba lagi chunk yang sama dalam "
+                f"{delay} detik (percobaan {retries}/{max_retries})."
+            )
+            time.sleep(delay)
+            continue
+        retries = 0
+        failed, assigned = store_classification_results(content_ids, results)
+        db.session.commit()
+        invalidate_cache_tags(*[f"content:{content_id}" for content_id in content_ids])
+        update_embedding_index(content_ids, classification_texts(rows))
+
+        done += len(rows)
+        checkpoint["last_id"] = content_ids[-1]
+        checkpoint["processed"] += len(rows)
+        checkpoint["failed"] += failed
+        checkpoint["assigned"] += assigned
+        write_backfill_checkpoint(checkpoint_path, checkpoint)
+
+        elapsed = time.perf_counter() - started
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = (total - done) / rate if rate > 0 else 0.0
+        click.echo(
+            f"{done}/{total} konten ({done / total:.1%}) | {rate:.1f} konten/detik "
+            f"| ETA {_format_duration(eta)} | gagal {checkpoint['failed']}"
+        )
+
+    elapsed = time.perf_counter() - started
+    finished = (
+        db.session.scalar(after_last_id(select(func.count(Content.id)))) == 0
+    )
+    if finished and os.path.exists(checkpoint_path):
+        os.unlink(checkpoint_path)  # Run berikutnya mulai dari awal lagi
+    click.echo(
+        f"Selesai: {done} konten dalam {_format_duration(elapsed)} "
+        f"({checkpoint['failed']} gagal, {checkpoint['assigned']} kategori otomatis)."
+        + ("" if finished else f" Checkpoint disimpan di {checkpoint_path}.")
+    )
+
+
+@ml_cli.command("classify-worker")
+def classify_worker_command():
+    """
+    Proses antrean klasifikasi otomatis konten di foreground sampai dihentikan
+    (Ctrl+C). Jalankan satu (atau beberapa) proses ini di samping server web;
+    hanya proses ini yang memuat model untuk klasifikasi background.
+    """
+    from app.contents.services import ContentClassificationWorker
+
+    if not current_app.config.get("ML_AUTO_CLASSIFY_ENABLED"):
+        raise click.ClickException(
+            "ML_AUTO_CLASSIFY_ENABLED mati: tidak ada job klasifikasi yang dicatat."
+        )
+    click.echo("Worker klasifikasi konten berjalan. Tekan Ctrl+C untuk berhenti.")
+    try:
+        ContentClassificationWorker(current_app._get_current_object()).run()
+    except KeyboardInterrupt:
+        click.echo("Worker klasifikasi konten dihentikan.")
+
+
+def read_backfill_checkpoint(path):
+    """Isi file checkpoint backfill, atau None jika belum ada."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_backfill_checkpoint(path, checkpoint):
+    """Tulis checkpoint secara atomik agar tidak pernah setengah tertulis saat proses dihentikan."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".ml_backfill.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _format_duration(seconds):
+    return str(timedelta(seconds=int(seconds)))
+
+
+@ml_cli.command("train-ivf")
+@click.option(
+    "--lists",
+    "num_lists",
+    type=int,
+    default=None,
+    help="Jumlah cluster IVF. Default: akar kuadrat jumlah vektor x 4.",
+)
+@click.option("--iterations", default=10, show_default=True, help="Iterasi k-means.")
+def train_ivf_command(num_lists, iterations):
+    """Latih index IVF (pencarian perkiraan) untuk index embedding yang besar."""
+    from app.analytics.services import get_embedding_index
+
+    index = get_embedding_index()
+    count = index.count
+    num_lists = num_lists or max(1, int(4 * np.sqrt(count)))
+    started = time.perf_counter()
+    try:
+        index.train_ivf(num_lists, iterations=iterations)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(
+        f"Index IVF dengan {num_lists} cluster untuk {count} vektor selesai dalam "
+        f"{_format_duration(time.perf_counter() - started)}."
+    )
@@ -0,0 +1,461 @@
+# app/ml_embeddings.py
+"""
+Index embedding konten untuk pencarian semantik dan "konten serupa".
+
+Vektor disimpan sebagai satu matriks float32 kontigu (sudah dinormalisasi L2)
+di file yang di-memory-map, sehingga cosine similarity terhadap seluruh index
+cukup satu perkalian matriks-vektor dan data tidak perlu dimuat penuh ke RAM.
+Id konten disimpan di file memmap kedua dengan urutan baris yang sama, dan
+peta id -> baris disimpan sebagai pasangan memmap (id terurut, baris) yang
+dicari dengan binary search, sehingga proses lain tidak perlu membangun ulang
+peta tersebut setiap kali index berubah.
+
+Untuk jutaan baris, index IVF opsional (k-means sferis atas vektor) membatasi
+pencarian ke beberapa cluster terdekat saja (hasil perkiraan).
+"""
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from .ml_postprocess import top_k
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: tanpa file lock antar proses
+    fcntl = None
+
+VECTORS_FILENAME = "vectors.f32"
+IDS_FILENAME = "ids.bin"
+SORTED_IDS_FILENAME = "ids_sorted.bin"
+SORTED_ROWS_FILENAME = "rows_sorted.i64"
+META_FILENAME = "meta.json"
+LOCK_FILENAME = ".lock"
+IVF_CENTROIDS_FILENAME = "ivf_centroids.npy"
+IVF_ASSIGNMENTS_FILENAME = "ivf_assignments.i32"
+
+ID_LENGTH = 36  # UUID sebagai string
+MIN_CAPACITY = 1024
+
+
+def normalize_rows(vectors):
+    """Normalisasi L2 per baris (baris nol dibiarkan nol)."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class EmbeddingIndex:
+    """
+    Index embedding berbasis file di `directory`.
+
+    Upsert dan hapus bersifat inkremental: baris baru ditambahkan di akhir
+    (kapasitas file digandakan bila penuh) dan baris yang dihapus diganti baris
+    terakhir, sehingga matriks tetap kontigu tanpa lubang. Penulisan antar proses
+    diserialisasi dengan file lock; proses lain memuat ulang metadata saat
+    file meta.json berubah.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.RLock()
+        self._meta_mtime = None
+        self._reset_state()
+        self._refresh()
+
+    # --- Info ---
+
+    @property
+    def count(self):
+        self._refresh()
+        return self.meta["count"]
+
+    @property
+    def dim(self):
+        return self.meta["dim"]
+
+    @property
+    def model_version(self):
+        self._refresh()
+        return self.meta["model_version"]
+
+    def stats(self):
+        self._refresh()
+        return {
+            "count": self.meta["count"],
+            "dim": self.meta["dim"],
+            "capacity": self.meta["capacity"],
+            "model_version": self.meta["model_version"],
+            "ivf_lists": self.meta["ivf_lists"],
+        }
+
+    def __contains__(self, item_id):
+        with self._lock:
+            self._refresh()
+            return self._find_rows([item_id])[0] >= 0
+
+    # --- Tulis ---
+
+    def reset(self, model_version=None):
+        """Kosongkan index (mis. sebelum dibangun ulang dengan versi model baru)."""
+        with self._write_lock():
+            for filename in (
+                VECTORS_FILENAME,
+                IDS_FILENAME,
+                SORTED_IDS_FILENAME,
+                SORTED_ROWS_FILENAME,
+                IVF_CENTROIDS_FILENAME,
+                IVF_ASSIGNMENTS_FILENAME,
+            ):
+                path = os.path.join(self.directory, filename)
+                if os.path.exists(path):
+                    os.unlink(path)
+            self._reset_state()
+            self.meta["model_version"] = model_version
+            self._write_meta()
+
+    def upsert(self, ids, vectors, model_version=None):
+        """Tambah atau perbarui vektor untuk daftar id (satu baris per id)."""
+        ids = [str(item_id) for item_id in ids]
+        if not ids:
+            return
+        vectors = normalize_rows(vectors)
+        if vectors.ndim != 2 or vectors.shape[0] != len(ids):
+            raise ValueError("Jumlah vektor harus sama dengan jumlah id.")
+
+        with self._write_lock():
+            if self.meta["dim"] is None:
+                self.meta["dim"] = int(vectors.shape[1])
+            elif vectors.shape[1] != self.meta["dim"]:
+                raise ValueError(
+                    f"Dimensi embedding {vectors.shape[1]} berbeda dengan index ({self.meta['dim']})."
+                )
+            if model_version is not None and self.meta["model_version"] is None:
+                self.meta["model_version"] = model_version
+
+            # Id yang muncul dua kali dalam satu batch: vektor terakhir yang dipakai
+            latest = {item_id: position for position, item_id in enumerate(ids)}
+            count = self.meta["count"]
+            positions = np.fromiter(latest.values(), dtype=np.int64, count=len(latest))
+            keys = np.array(list(latest), dtype=f"S{ID_LENGTH}")
+            rows = self._find_rows(keys)
+            new = rows < 0
+            num_new = int(new.sum())
+            rows[new] = count + np.arange(num_new)
+            self._ensure_capacity(count + num_new)
+
+            batch = vectors[positions]
+            self._vectors[rows] = batch
+            self._ids[rows] = keys
+            if self._centroids is not None:
+                self._assignments[rows] = np.argmax(batch @ self._centroids.T, axis=1)
+            if num_new:
+                self._insert_sorted(keys[new], rows[new])
+            self.meta["count"] = count + num_new
+            self._flush()
+
+    def remove(self, ids):
+        """Hapus vektor untuk daftar id; id yang tidak ada di index diabaikan."""
+        keys = np.array(list(dict.fromkeys(map(str, ids))), dtype=f"S{ID_LENGTH}")
+        with self._write_lock():
+            total = count = self.meta["count"]
+            if not count or not len(keys):
+                return 0
+            # Entri id yang dihapus baru dibuang dari peta terurut setelah loop
+            # (sekali geser), jadi posisi di peta tetap valid selama loop
+            sorted_ids = self._sorted_ids[:total]
+            deleted = []
+            for key in keys:
+                position = int(np.searchsorted(sorted_ids, key))
+                if position == total or sorted_ids[position] != key:
+                    continue
+                row = int(self._sorted_rows[position])
+                last = count - 1
+                if row != last:
+                    # Baris terakhir dipindah ke slot yang kosong agar matriks tetap kontigu
+                    moved_key = self._ids[last]
+                    self._vectors[row] = self._vectors[last]
+                    self._ids[row] = moved_key
+                    if self._assignments is not None:
+                        self._assignments[row] = self._assignments[last]
+                    self._sorted_rows[np.searchsorted(sorted_ids, moved_key)] = row
+                deleted.append(position)
+                count = last
+            if not deleted:
+                return 0
+            self._sorted_ids[:count] = np.delete(sorted_ids, deleted)
+            self._sorted_rows[:count] = np.delete(self._sorted_rows[:total], deleted)
+            self.meta["count"] = count
+            self._flush()
+            return len(deleted)
+
+    # --- Baca ---
+
+    def get_vector(self, item_id):
+        """Salinan vektor (ternormalisasi) untuk id, atau None jika tidak ada."""
+        with self._lock:
+            self._refresh()
+            row = self._find_rows([item_id])[0]
+            return None if row < 0 else np.array(self._vectors[row])
+
+    def search(self, query, k=10, exclude_ids=(), nprobe=None, approximate=None):
+        """
+        k id dengan cosine similarity tertinggi terhadap vektor query.
+        approximate=None: pakai IVF jika sudah dilatih. nprobe = jumlah cluster
+        terdekat yang diperiksa saat IVF dipakai.
+        Mengembalikan tuple (list (id, skor), approximate_dipakai).
+        """
+        with self._lock:
+            self._refresh()
+            count = self.meta["count"]
+            if count == 0:
+                return [], False
+            query = normalize_rows(np.asarray(query).reshape(-1))
+            if query.shape[0] != self.meta["dim"]:
+                raise ValueError(
+                    f"Dimensi query {query.shape[0]} berbeda dengan index ({self.meta['dim']})."
+                )
+            use_ivf = self._centroids is not None if approximate is None else approximate
+            use_ivf = use_ivf and self._centroids is not None
+
+            if use_ivf:
+                nprobe = max(1, min(int(nprobe or 8), len(self._centroids)))
+                probes = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+                rows = np.flatnonzero(np.isin(self._assignments[:count], probes))
+                scores = self._vectors[rows] @ query if len(rows) else np.empty(0)
+            else:
+                rows = None
+                # Satu perkalian matriks-vektor atas seluruh matriks memmap
+                scores = self._vectors[:count] @ query
+
+            excluded = self._find_rows(list(exclude_ids))
+            excluded = excluded[excluded >= 0]
+            if len(excluded) and len(scores):
+                if rows is None:
+                    scores[excluded] = -np.inf
+                else:
+                    scores[np.isin(rows, excluded)] = -np.inf
+            if not len(scores):
+                return [], use_ivf
+
+            indexes, values = top_k(scores[None, :], k)
+            indexes, values = indexes[0], values[0]
+            keep = np.isfinite(values)
+            indexes, values = indexes[keep], values[keep]
+            result_rows = indexes if rows is None else rows[indexes]
+            result_ids = [raw.decode("ascii") for raw in self._ids[result_rows]]
+            return list(zip(result_ids, values.astype(np.float64).tolist())), use_ivf
+
+    # --- Index perkiraan (IVF) ---
+
+    def train_ivf(self, num_lists, iterations=10, sample_size=100_000, seed=0):
+        """
+        Latih index IVF: k-means sferis atas sampel vektor, lalu setiap baris
+        ditandai dengan cluster terdekatnya. Baris yang ditambahkan setelahnya
+        langsung diberi cluster saat upsert.
+        """
+        with self._write_lock():
+            count = self.meta["count"]
+            num_lists = int(num_lists)
+            if count < num_lists:
+                raise ValueError(
+                    f"Index berisi {count} vektor, kurang dari jumlah cluster ({num_lists})."
+                )
+            rng = np.random.default_rng(seed)
+            sample_rows = np.sort(
+                rng.choice(count, size=min(sample_size, count), replace=False)
+            )
+            sample = np.asarray(self._vectors[sample_rows])
+            centroids = sample[rng.choice(len(sample), size=num_lists, replace=False)]
+            for _ in range(iterations):
+                labels = np.argmax(sample @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, labels, sample)
+                empty = ~sums.any(axis=1)
+                # Cluster kosong diisi ulang dengan vektor sampel acak
+                sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+                centroids = normalize_rows(sums)
+
+            self._centroids = centroids.astype(np.float32)
+            np.save(os.path.join(self.directory, IVF_CENTROIDS_FILENAME), self._centroids)
+            self._open_assignments(self.meta["capacity"])
+            chunk = 65536
+            for start in range(0, count, chunk):
+                block = self._vectors[start : start + chunk]
+                self._assignments[start : start + len(block)] = np.argmax(
+                    block @ self._centroids.T, axis=1
+                )
+            self.meta["ivf_lists"] = num_lists
+            self._flush()
+
+    # --- Internal ---
+
+    def _reset_state(self):
+        self.meta = {
+            "count": 0,
+            "dim": None,
+            "capacity": 0,
+            "model_version": None,
+            "ivf_lists": 0,
+            "sorted_ids": True,
+        }
+        self._vectors = None
+        self._ids = None
+        self._sorted_ids = None
+        self._sorted_rows = None
+        self._assignments = None
+        self._centroids = None
+
+    def _path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def _refresh(self):
+        """Muat ulang metadata dan memmap jika index diubah proses lain."""
+        meta_path = self._path(META_FILENAME)
+        try:
+            mtime = os.stat(meta_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._meta_mtime:
+            return
+        with self._lock:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            self._reset_state()
+            self.meta.update(meta)
+            # Index dari versi lama belum punya peta id terurut di disk
+            self.meta["sorted_ids"] = meta.get("sorted_ids", False)
+            if self.meta["capacity"]:
+                self._open_memmaps(self.meta["capacity"])
+                if not self.meta["sorted_ids"]:
+                    # Dibangun di memori saja; baru ditulis ke disk oleh penulis
+                    # berikutnya yang memegang file lock
+                    count = self.meta["count"]
+                    order = np.argsort(self._ids[:count], kind="stable")
+                    self._sorted_ids = np.asarray(self._ids[:count])[order]
+                    self._sorted_rows = order.astype(np.int64)
+            if self.meta["ivf_lists"]:
+                self._centroids = np.load(self._path(IVF_CENTROIDS_FILENAME))
+                self._open_assignments(self.meta["capacity"])
+            self._meta_mtime = mtime
+
+    def _open_memmaps(self, capacity):
+        dim = self.meta["dim"]
+        self._vectors = self._open_memmap(
+            VECTORS_FILENAME, np.float32, (capacity, dim)
+        )
+        self._ids = self._open_memmap(IDS_FILENAME, f"S{ID_LENGTH}", (capacity,))
+        self._sorted_ids = self._open_memmap(
+            SORTED_IDS_FILENAME, f"S{ID_LENGTH}", (capacity,)
+        )
+        self._sorted_rows = self._open_memmap(
+            SORTED_ROWS_FILENAME, np.int64, (capacity,)
+        )
+
+    def _persist_sorted_ids(self):
+        """Tulis peta id terurut yang dibangun di memori (index versi lama) ke disk."""
+        if self.meta["capacity"]:
+            sorted_ids, sorted_rows = self._sorted_ids, self._sorted_rows
+            self._open_memmaps(self.meta["capacity"])
+            count = self.meta["count"]
+            self._sorted_ids[:count] = sorted_ids
+            self._sorted_rows[:count] = sorted_rows
+        self.meta["sorted_ids"] = True
+
+    def _find_rows(self, ids):
+        """Baris untuk setiap id (-1 jika tidak ada), lewat binary search di peta id terurut."""
+        keys = np.asarray(
+            ids if isinstance(ids, np.ndarray) else [str(i) for i in ids],
+            dtype=f"S{ID_LENGTH}",
+        )
+        count = self.meta["count"]
+        if not count or not len(keys):
+            return np.full(len(keys), -1, dtype=np.int64)
+        sorted_ids = self._sorted_ids[:count]
+        positions = np.minimum(np.searchsorted(sorted_ids, keys), count - 1)
+        found = sorted_ids[positions] == keys
+        return np.where(found, self._sorted_rows[positions], -1).astype(np.int64)
+
+    def _insert_sorted(self, keys, rows):
+        """Sisipkan id baru (belum ada di index) ke peta terurut; dipanggil sebelum count diperbarui."""
+        count = self.meta["count"]
+        order = np.argsort(keys, kind="stable")
+        keys, rows = keys[order], rows[order]
+        positions = np.searchsorted(self._sorted_ids[:count], keys)
+        total = count + len(keys)
+        self._sorted_ids[:total] = np.insert(self._sorted_ids[:count], positions, keys)
+        self._sorted_rows[:total] = np.insert(
+            self._sorted_rows[:count], positions, rows
+        )
+
+    def _open_assignments(self, capacity):
+        self._assignments = self._open_memmap(
+            IVF_ASSIGNMENTS_FILENAME, np.int32, (capacity,)
+        )
+
+    def _open_memmap(self, filename, dtype, shape):
+        path = self._path(filename)
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        # File diperbesar dulu (sparse) agar memmap bisa dibuka dengan shape baru
+        with open(path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        return np.memmap(path, dtype=dtype, mode="r+", shape=shape)
+
+    def _ensure_capacity(self, required):
+        capacity = self.meta["capacity"]
+        if required <= capacity:
+            return
+        new_capacity = max(required, capacity * 2, MIN_CAPACITY)
+        self._flush_arrays()
+        self._open_memmaps(new_capacity)
+        if self._centroids is not None:
+            self._open_assignments(new_capacity)
+        self.meta["capacity"] = new_capacity
+
+    def _flush_arrays(self):
+        for array in (
+            self._vectors,
+            self._ids,
+            self._sorted_ids,
+            self._sorted_rows,
+            self._assignments,
+        ):
+            if isinstance(array, np.memmap):
+                array.flush()
+
+    def _flush(self):
+        self._flush_arrays()
+        self._write_meta()
+
+    def _write_meta(self):
+        """meta.json ditulis paling akhir secara atomik; pembaca melihat data lama atau baru, bukan campuran."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".meta.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.meta, f)
+            os.replace(tmp_path, self._path(META_FILENAME))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self._meta_mtime = os.stat(self._path(META_FILENAME)).st_mtime_ns
+
+    @contextmanager
+    def _write_lock(self):
+        with self._lock:
+            with open(self._path(LOCK_FILENAME), "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self._refresh()
+                    if not self.meta["sorted_ids"]:
+                        self._persist_sorted_ids()
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
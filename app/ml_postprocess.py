@@ -0,0 +1,92 @@
+# app/ml_postprocess.py
+"""
+Postprocessing output model klasifikasi secara vektor untuk satu batch penuh:
+hanya k label teratas per baris yang diubah menjadi JSON, bukan seluruh
+vektor probabilitas.
+"""
+import json
+
+import numpy as np
+
+
+def load_labels(path):
+    """
+    Memuat nama label kelas dari file JSON. Format yang didukung:
+    - list nama label sesuai urutan output model: ["Berita", "Olahraga", ...]
+    - dict nama -> index (mis. `class_indices` Keras): {"Berita": 0, ...}
+    Mengembalikan array NumPy berisi nama label (index = index output model).
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        labels = [None] * len(data)
+        for name, index in data.items():
+            labels[int(index)] = str(name)
+        if any(label is None for label in labels):
+            raise ValueError(f"Index label di '{path}' tidak berurutan dari 0.")
+    elif isinstance(data, list):
+        labels = [str(label) for label in data]
+    else:
+        raise ValueError(f"Format file label '{path}' tidak dikenali.")
+    return np.array(labels, dtype=object)
+
+
+def top_k(scores, k):
+    """
+    Index dan skor k kelas teratas per baris, urut dari skor tertinggi.
+    argpartition (O(n)) dipakai untuk memilih kandidat, lalu hanya k kandidat
+    itu yang diurutkan.
+    """
+    num_classes = scores.shape[1]
+    k = max(1, min(int(k), num_classes))
+    if k < num_classes:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(num_classes), scores.shape)
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind="stable")
+    indexes = np.take_along_axis(candidates, order, axis=1)
+    return indexes, np.take_along_axis(scores, indexes, axis=1)
+
+
+def format_top_k(scores, k, labels=None, include_scores=False, decimals=4):
+    """
+    Mengubah output batch (n, num_classes) menjadi list dict per baris:
+    {"predicted_category", "confidence", "top_k": [{"label", "index", "score"}]}
+    ditambah "category_scores" (seluruh vektor) hanya jika include_scores=True.
+    """
+    scores = np.asarray(scores)
+    scores = scores.reshape(scores.shape[0], -1)
+    if labels is not None and len(labels) != scores.shape[1]:
+        raise ValueError(
+            f"Jumlah label ({len(labels)}) tidak sama dengan jumlah output model ({scores.shape[1]})."
+        )
+
+    indexes, top_scores = top_k(scores, k)
+    names = labels[indexes] if labels is not None else indexes.astype(str)
+    # Satu kali konversi ke tipe Python untuk seluruh batch
+    names = names.tolist()
+    index_rows = indexes.tolist()
+    # Dibulatkan dalam float64 agar tidak muncul angka seperti 0.10029999911785126
+    score_rows = np.round(top_scores.astype(np.float64), decimals).tolist()
+
+    results = []
+    for row, (row_names, row_indexes, row_scores) in enumerate(
+        zip(names, index_rows, score_rows)
+    ):
+        result = {
+            "predicted_category": row_names[0],
+            "confidence": row_scores[0],
+            "top_k": [
+                {"label": name, "index": index, "score": score}
+                for name, index, score in zip(row_names, row_indexes, row_scores)
+            ],
+        }
+        if include_scores:
+            full_scores = np.round(scores[row].astype(np.float64), decimals).tolist()
+            if labels is not None:
+                result["category_scores"] = dict(zip(labels.tolist(), full_scores))
+            else:
+                result["category_scores"] = full_scores
+        results.append(result)
+    return results
@@ -0,0 +1,105 @@
+# app/ml_registry.py
+"""
+Registry model berversi di disk.
+
+Struktur direktori (ML_MODEL_REGISTRY_DIR):
+
+    <registry>/
+        CURRENT            <- berisi nama versi yang aktif (opsional)
+        v1/model_ml.h5
+        v2/model_ml.h5
+        v2/model_ml.npz    <- bundle runtime NumPy (opsional)
+
+Setiap versi adalah satu subdirektori yang tidak pernah diubah setelah dibuat;
+deploy model baru cukup dengan menambah subdirektori lalu mengaktifkannya.
+"""
+import os
+import re
+import tempfile
+
+CURRENT_FILENAME = "CURRENT"
+
+_VERSION_PATTERN = re.compile(r"^[A-Za-z0-9._-]+$")
+
+
+def is_valid_version(version):
+    """Nama versi hanya boleh huruf, angka, titik, garis bawah, dan tanda minus."""
+    return (
+        isinstance(version, str)
+        and bool(_VERSION_PATTERN.match(version))
+        and version not in (".", "..")
+    )
+
+
+def version_dir(registry_dir, version):
+    if not is_valid_version(version):
+        raise ValueError(f"Nama versi model tidak valid: '{version}'")
+    return os.path.join(registry_dir, version)
+
+
+def artifact_path(registry_dir, version, filename):
+    """Path file artefak (mis. model_ml.h5) di dalam direktori versi."""
+    return os.path.join(version_dir(registry_dir, version), filename)
+
+
+def list_versions(registry_dir, filename=None):
+    """
+    Daftar versi yang tersedia, urut dari yang paling lama dibuat.
+    Jika filename diberikan, hanya versi yang memiliki file tersebut yang dihitung.
+    """
+    if not registry_dir or not os.path.isdir(registry_dir):
+        return []
+    versions = []
+    for entry in os.scandir(registry_dir):
+        if not entry.is_dir() or not is_valid_version(entry.name):
+            continue
+        if filename and not os.path.exists(os.path.join(entry.path, filename)):
+            continue
+        versions.append((entry.stat().st_mtime_ns, entry.name))
+    return [name for _, name in sorted(versions)]
+
+
+def read_current(registry_dir):
+    """Versi yang tercatat di file CURRENT, atau None jika belum ada."""
+    try:
+        with open(os.path.join(registry_dir, CURRENT_FILENAME), encoding="utf-8") as f:
+            version = f.read().strip()
+    except (FileNotFoundError, TypeError):
+        return None
+    return version if is_valid_version(version) else None
+
+
+def write_current(registry_dir, version):
+    """
+    Catat versi aktif secara atomik (tulis ke file sementara lalu os.replace),
+    sehingga proses lain tidak pernah membaca file CURRENT yang setengah tertulis.
+    """
+    version_dir(registry_dir, version)  # validasi nama versi
+    fd, tmp_path = tempfile.mkstemp(dir=registry_dir, prefix=".CURRENT.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(version + "\n")
+        os.replace(tmp_path, os.path.join(registry_dir, CURRENT_FILENAME))
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def resolve_version(registry_dir, pinned=None, filename=None):
+    """
+    Tentukan versi yang harus dimuat: versi yang di-pin lewat konfigurasi,
+    lalu isi file CURRENT, lalu versi terbaru. None jika registry kosong.
+    Versi yang di-pin tetapi tidak ada di registry dianggap error.
+    """
+    versions = list_versions(registry_dir, filename)
+    if pinned:
+        if pinned not in versions:
+            raise FileNotFoundError(
+                f"Versi model '{pinned}' tidak ditemukan di registry: {registry_dir}"
+            )
+        return pinned
+    current = read_current(registry_dir)
+    if current in versions:
+        return current
+    return versions[-1] if versions else None
@@ -1,12 +1,91 @@
 # app/ml_routes.py
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import (
+    get_jwt_identity,
     jwt_required,
 )  # Sesuaikan jika endpoint ini tidak perlu login
-from app.ml_services import classify_data  # Impor fungsi utama dari ml_services
+from app.ml_services import (
+    classify_data,
+    classify_batch,
+    get_inference_stats,
+    get_model_load_status,
+    is_model_ready,
+    list_model_versions,
+    start_model_swap,
+    InferenceOverloadedError,
+    ModelSwapInProgressError,
+)  # Impor fungsi utama dari ml_services
 
 ml_bp = Blueprint("ml_bp", __name__, url_prefix="/ml")
 
+# Endpoint yang membutuhkan model sudah siap di memori
+_MODEL_ENDPOINTS = {
+    "ml_bp.handle_prediction_request_route",
+    "ml_bp.handle_batch_prediction_request_route",
+}
+
+
+def _service_unavailable(message, retry_after, **extra):
+    """Respons 503 dengan header Retry-After agar klien tahu kapan mencoba lagi."""
+    response = jsonify({"error": message, **extra})
+    response.status_code = 503  # Service Unavailable
+    response.headers["Retry-After"] = str(retry_after)
+    return response
+
+
+def _parse_postprocess_options(data):
+    """
+    Opsi postprocessing dari body JSON: "top_k" (jumlah label teratas) dan
+    "include_scores" (sertakan seluruh vektor skor).
+    Mengembalikan tuple (top_k, include_scores, error_message).
+    """
+    top_k = data.get("top_k")
+    if top_k is not None and (
+        isinstance(top_k, bool) or not isinstance(top_k, int) or top_k < 1
+    ):
+        return None, False, "'top_k' harus berupa bilangan bulat positif."
+    max_top_k = current_app.config.get("ML_TOP_K_MAX", 50)
+    if top_k is not None and top_k > max_top_k:
+        return None, False, f"'top_k' tidak boleh lebih dari {max_top_k}."
+    include_scores = data.get("include_scores", False)
+    if not isinstance(include_scores, bool):
+        return None, False, "'include_scores' harus berupa boolean."
+    return top_k, include_scores, None
+
+
+@ml_bp.before_request
+def reject_while_model_loading():
+    """
+    Tolak request prediksi dengan cepat (503 + Retry-After) selama model masih
+    dimuat, daripada menahan worker menunggu model selesai dimuat. Jika
+    pemuatan di latar belakang gagal, 503 dikembalikan tanpa Retry-After
+    beserta error-nya: model tidak akan siap sampai versi lain diaktifkan.
+    """
+    if request.endpoint not in _MODEL_ENDPOINTS or is_model_ready():
+        return None
+
+    status = get_model_load_status()
+    if status["state"] == "failed" and status["loading_mode"] == "background":
+        return (
+            jsonify(
+                {
+                    "error": "Model machine learning gagal dimuat. Aktifkan versi "
+                    "model yang valid (POST /ml/models/<version>/activate atau "
+                    "SIGHUP) lalu coba lagi.",
+                    "model_state": status["state"],
+                    "load_error": status["error"],
+                }
+            ),
+            503,
+        )
+    if status["state"] == "loading" or status["loading_mode"] == "background":
+        return _service_unavailable(
+            "Model machine learning sedang dimuat. Silakan coba lagi nanti.",
+            current_app.config.get("ML_RETRY_AFTER_SECONDS", 5),
+            model_state=status["state"],
+        )
+    return None  # Mode lazy: model dimuat saat request ini diproses
+
 
 @ml_bp.route("/predict", methods=["POST"])
 # @jwt_required() # Aktifkan jika endpoint ini memerlukan pengguna untuk login
@@ -15,6 +94,8 @@ def handle_prediction_request_route():
     Endpoint untuk menerima data dan mengembalikan prediksi dari model ML.
     Struktur input JSON harus disesuaikan dengan apa yang diharapkan oleh
     fungsi preprocess_input_for_model di ml_services.py.
+    Opsional: "top_k" (jumlah label teratas, default ML_TOP_K) dan
+    "include_scores": true untuk menyertakan seluruh vektor skor.
     """
     if not request.is_json:
         return (
@@ -48,10 +129,34 @@ def handle_prediction_request_route():
         isinstance(input_for_model, str) and not input_for_model.strip()
     ):
         return jsonify({"error": "Input untuk model tidak boleh kosong."}), 400
+    if isinstance(input_for_model, list):
+        # Endpoint ini mengembalikan satu hasil; banyak input lewat endpoint batch
+        return (
+            jsonify(
+                {
+                    "error": "'text_input' harus berupa satu teks. Untuk banyak "
+                    "input sekaligus gunakan POST /ml/predict/batch dengan field "
+                    "'text_inputs'."
+                }
+            ),
+            400,
+        )
+    if not isinstance(input_for_model, str):
+        return jsonify({"error": "'text_input' harus berupa teks (string)."}), 400
     # --- AKHIR PENENTUAN INPUT ---
 
+    top_k, include_scores, option_error = _parse_postprocess_options(data)
+    if option_error:
+        return jsonify({"error": option_error}), 400
+
     # Panggil fungsi klasifikasi/prediksi dari ml_services
-    prediction_result = classify_data(input_for_model)
+    try:
+        prediction_result = classify_data(
+            input_for_model, top_k=top_k, include_scores=include_scores
+        )
+    except InferenceOverloadedError as e:
+        current_app.logger.warning(f"Request prediksi ditolak (overload): {e}")
+        return _service_unavailable(str(e), e.retry_after)
 
     # Periksa apakah ada 'error' dalam hasil prediksi dari service
     if isinstance(prediction_result, dict) and "error" in prediction_result:
@@ -77,5 +182,159 @@ def handle_prediction_request_route():
             )
         return jsonify({"error": error_message}), 500
 
-    current_app.logger.info(f"Mengirim hasil prediksi: {prediction_result}")
+    current_app.logger.info(
+        f"Mengirim hasil prediksi: {prediction_result.get('predicted_category')} "
+        f"(confidence={prediction_result.get('confidence')}, versi model {prediction_result.get('model_version')})"
+    )
     return jsonify(prediction_result), 200
+
+
+@ml_bp.route("/predict/batch", methods=["POST"])
+# @jwt_required() # Aktifkan jika endpoint ini memerlukan pengguna untuk login
+def handle_batch_prediction_request_route():
+    """
+    Endpoint untuk prediksi banyak input sekaligus.
+    Menerima JSON {"text_inputs": [...], "top_k": 3, "include_scores": false}
+    dan mengembalikan hasil dengan urutan yang sama. Item yang gagal berisi field "error" tanpa menggagalkan item lain.
+    """
+    if not request.is_json:
+        return (
+            jsonify({"error": "Request body harus berupa JSON"}),
+            415,
+        )  # Unsupported Media Type
+
+    data = request.get_json()
+    inputs = data.get("text_inputs") if isinstance(data, dict) else None
+    if not isinstance(inputs, list) or not inputs:
+        return (
+            jsonify(
+                {"error": "Input JSON tidak valid. Harap sertakan 'text_inputs' berupa list yang tidak kosong."}
+            ),
+            400,
+        )
+
+    top_k, include_scores, option_error = _parse_postprocess_options(data)
+    if option_error:
+        return jsonify({"error": option_error}), 400
+
+    max_items = current_app.config.get("ML_BATCH_ENDPOINT_MAX_ITEMS", 1000)
+    if len(inputs) > max_items:
+        return (
+            jsonify({"error": f"Jumlah input melebihi batas maksimum ({max_items})."}),
+            413,
+        )
+
+    current_app.logger.info(
+        f"Menerima request prediksi batch ke /ml/predict/batch: {len(inputs)} item"
+    )
+
+    # Validasi per item sama seperti /ml/predict; item kosong ditandai error saja
+    results = [None] * len(inputs)
+    valid_indexes = []
+    for index, item in enumerate(inputs):
+        if item is None or (isinstance(item, str) and not item.strip()):
+            results[index] = {"error": "Input untuk model tidak boleh kosong."}
+        elif not isinstance(item, str):
+            results[index] = {"error": "Input harus berupa teks (string)."}
+        else:
+            valid_indexes.append(index)
+
+    if valid_indexes:
+        try:
+            batch_results = classify_batch(
+                [inputs[i] for i in valid_indexes],
+                top_k=top_k,
+                include_scores=include_scores,
+            )
+        except InferenceOverloadedError as e:
+            current_app.logger.warning(f"Request prediksi batch ditolak (overload): {e}")
+            return _service_unavailable(str(e), e.retry_after)
+        for index, result in zip(valid_indexes, batch_results):
+            results[index] = result
+
+    error_count = sum(1 for r in results if isinstance(r, dict) and "error" in r)
+    return (
+        jsonify(
+            {
+                "results": [{"index": i, **r} for i, r in enumerate(results)],
+                "total": len(results),
+                "succeeded": len(results) - error_count,
+                "failed": error_count,
+            }
+        ),
+        200,
+    )
+
+
+@ml_bp.route("/stats", methods=["GET"])
+# @jwt_required() # Aktifkan jika statistik hanya boleh dilihat pengguna yang login
+def get_ml_stats_route():
+    """
+    Endpoint untuk melihat statistik runtime ML, misalnya ukuran dan latensi
+    micro-batch, sebagai bahan tuning ML_BATCH_MAX_SIZE / ML_BATCH_MAX_WAIT_MS.
+    """
+    return jsonify(get_inference_stats()), 200
+
+
+@ml_bp.route("/models", methods=["GET"])
+@jwt_required()
+def list_model_versions_route():
+    """
+    Endpoint admin: daftar versi model di registry, versi yang sedang aktif,
+    dan status hot-swap terakhir.
+    """
+    return jsonify(list_model_versions()), 200
+
+
+@ml_bp.route("/models/<string:version>/activate", methods=["POST"])
+@jwt_required()
+def activate_model_version_route(version):
+    """
+    Endpoint admin: memuat versi model di background, menjalankan warm-up, lalu
+    menggantinya secara atomik. Request yang sedang berjalan tetap selesai di
+    model lama. Body opsional: {"persist": true} untuk mencatat versi ini di file
+    CURRENT registry agar tetap dipakai setelah restart (default true).
+    Hanya untuk user di ML_ADMIN_USER_IDS.
+    """
+    current_user_id = get_jwt_identity()
+    if current_user_id not in current_app.config.get("ML_ADMIN_USER_IDS", []):
+        current_app.logger.warning(
+            f"User {current_user_id} ditolak mengganti versi model ML ke {version}"
+        )
+        return jsonify({"error": "Hanya admin ML yang boleh mengganti versi model."}), 403
+
+    data = request.get_json(silent=True) or {}
+    persist = bool(data.get("persist", True))
+
+    models = list_model_versions()
+    if not models["registry_enabled"]:
+        return (
+            jsonify({"error": "Registry model belum dikonfigurasi (ML_MODEL_REGISTRY_DIR)."}),
+            400,
+        )
+    if version not in {v["version"] for v in models["versions"]}:
+        return jsonify({"error": f"Versi model '{version}' tidak ditemukan."}), 404
+    if version == models["active_version"]:
+        return (
+            jsonify({"message": f"Versi model '{version}' sudah aktif.", "model_version": version}),
+            200,
+        )
+
+    try:
+        start_model_swap(current_app._get_current_object(), version, persist=persist)
+    except ModelSwapInProgressError as e:
+        return jsonify({"error": str(e)}), 409  # Conflict
+
+    current_app.logger.info(
+        f"Hot-swap model ML ke versi {version} dimulai oleh user {current_user_id}"
+    )
+    return (
+        jsonify(
+            {
+                "message": f"Versi model '{version}' sedang dimuat. Pantau status di GET /ml/models.",
+                "target_version": version,
+                "previous_version": models["active_version"],
+            }
+        ),
+        202,  # Accepted
+    )
@@ -0,0 +1,264 @@
+# app/ml_runtime.py
+"""
+Runtime inferensi ringan berbasis NumPy (tanpa TensorFlow) untuk model Keras
+sederhana (Embedding / Dense / pooling). Model Keras diekspor sekali menjadi
+bundle .npz berisi bobot + spesifikasi layer, lalu worker web cukup memuat
+bundle tersebut tanpa perlu mengimpor TensorFlow.
+"""
+import json
+
+import numpy as np
+
+BUNDLE_FORMAT_VERSION = 1
+
+# Layer yang tidak mengubah data saat inferensi
+_IDENTITY_LAYERS = {"InputLayer", "Dropout", "SpatialDropout1D", "GaussianNoise"}
+
+
+def _softmax(x):
+    shifted = x - np.max(x, axis=-1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / np.sum(exp, axis=-1, keepdims=True)
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+_ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "sigmoid": _sigmoid,
+    "tanh": np.tanh,
+    "softmax": _softmax,
+}
+
+
+def _activation_name(layer):
+    activation = getattr(layer, "activation", None)
+    name = getattr(activation, "__name__", "linear")
+    if name not in _ACTIVATIONS:
+        raise ValueError(
+            f"Aktivasi '{name}' pada layer '{layer.name}' belum didukung runtime NumPy."
+        )
+    return name
+
+
+def _producing_layer(tensor):
+    history = getattr(tensor, "_keras_history", None)
+    # Keras 3: history.operation; Keras 2: history.layer
+    return getattr(history, "operation", None) or getattr(history, "layer", None)
+
+
+def _check_linear_chain(keras_model):
+    """
+    Runtime NumPy menjalankan `keras_model.layers` berurutan, jadi model harus
+    berupa satu rantai linear: satu input/output, dan setiap layer dipanggil
+    tepat sekali dengan satu input dari layer sebelumnya (tanpa cabang, skip
+    connection, atau layer yang dipakai bersama).
+    """
+    if type(keras_model).__name__ == "Sequential":
+        return
+    if len(keras_model.inputs) != 1 or len(keras_model.outputs) != 1:
+        raise ValueError(
+            "Runtime NumPy hanya mendukung model dengan satu input dan satu output."
+        )
+    previous = None
+    for layer in keras_model.layers:
+        nodes = getattr(layer, "_inbound_nodes", [])
+        if type(layer).__name__ == "InputLayer" and previous is None:
+            previous = layer
+            continue
+        inputs = list(getattr(nodes[0], "input_tensors", [])) if nodes else []
+        if (
+            len(nodes) != 1
+            or len(inputs) != 1
+            or _producing_layer(inputs[0]) is not previous
+        ):
+            raise ValueError(
+                f"Layer '{layer.name}' tidak tersambung linear ke layer sebelumnya; "
+                "runtime NumPy hanya mendukung model berupa satu rantai layer."
+            )
+        previous = layer
+    if _producing_layer(keras_model.outputs[0]) is not previous:
+        raise ValueError("Output model bukan layer terakhir dari rantai layer.")
+
+
+def export_numpy_bundle(keras_model, output_path):
+    """
+    Mengekspor model Keras Sequential/fungsional linear ke bundle .npz.
+    Melempar ValueError jika model bukan satu rantai layer linear atau ada
+    layer yang belum didukung runtime NumPy.
+    """
+    _check_linear_chain(keras_model)
+    layers_spec = []
+    arrays = {}
+    for index, layer in enumerate(keras_model.layers):
+        layer_type = type(layer).__name__
+        spec = {"type": layer_type, "name": layer.name}
+        weights = layer.get_weights()
+
+        if layer_type in _IDENTITY_LAYERS:
+            continue
+        elif layer_type == "Embedding":
+            arrays[f"layer{index}_embeddings"] = weights[0].astype(np.float32)
+            spec["embeddings"] = f"layer{index}_embeddings"
+            spec["mask_zero"] = bool(getattr(layer, "mask_zero", False))
+        elif layer_type == "Dense":
+            arrays[f"layer{index}_kernel"] = weights[0].astype(np.float32)
+            spec["kernel"] = f"layer{index}_kernel"
+            if len(weights) > 1:
+                arrays[f"layer{index}_bias"] = weights[1].astype(np.float32)
+                spec["bias"] = f"layer{index}_bias"
+            spec["activation"] = _activation_name(layer)
+        elif layer_type == "Activation":
+            spec["activation"] = _activation_name(layer)
+        elif layer_type in (
+            "GlobalAveragePooling1D",
+            "GlobalMaxPooling1D",
+            "Flatten",
+        ):
+            pass
+        else:
+            raise ValueError(
+                f"Layer '{layer.name}' ({layer_type}) belum didukung runtime NumPy."
+            )
+        layers_spec.append(spec)
+
+    model_input = keras_model.inputs[0]
+    manifest = {
+        "format_version": BUNDLE_FORMAT_VERSION,
+        "input_shape": list(model_input.shape[1:]),
+        "input_dtype": np.dtype(model_input.dtype).name,
+        "layers": layers_spec,
+    }
+    arrays["__manifest__"] = np.frombuffer(
+        json.dumps(manifest).encode("utf-8"), dtype=np.uint8
+    )
+    with open(output_path, "wb") as handle:
+        np.savez(handle, **arrays)
+    return manifest
+
+
+def configure_tensorflow_threads(intra_op_threads=0, inter_op_threads=0):
+    """
+    Atur ukuran thread pool intra-op dan inter-op TensorFlow (0 = default TF).
+    Harus dipanggil sebelum operasi TF pertama; setelah itu TF menolak perubahan.
+    """
+    if not intra_op_threads and not inter_op_threads:
+        return
+    import tensorflow as tf
+
+    try:
+        if intra_op_threads:
+            tf.config.threading.set_intra_op_parallelism_threads(int(intra_op_threads))
+        if inter_op_threads:
+            tf.config.threading.set_inter_op_parallelism_threads(int(inter_op_threads))
+    except RuntimeError:
+        # Runtime TF sudah terinisialisasi di proses ini; pengaturan tidak bisa diubah lagi
+        pass
+
+
+class InputSpec:
+    """Pengganti minimal `keras_model.inputs[i]` (shape dan dtype) untuk warm-up."""
+
+    def __init__(self, shape, dtype):
+        self.shape = tuple(shape)
+        self.dtype = dtype
+
+
+class NumpyModel:
+    """
+    Model hasil `export_numpy_bundle` yang dijalankan dengan NumPy saja.
+    Antarmukanya meniru subset Keras yang dipakai ml_services: `predict()`
+    dan `inputs`.
+    """
+
+    def __init__(self, manifest, arrays):
+        if manifest.get("format_version") != BUNDLE_FORMAT_VERSION:
+            raise ValueError(
+                f"Versi format bundle tidak dikenali: {manifest.get('format_version')}"
+            )
+        self.manifest = manifest
+        self.layers = manifest["layers"]
+        self.weights = arrays
+        self.inputs = [
+            InputSpec([None] + manifest["input_shape"], manifest["input_dtype"])
+        ]
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as bundle:
+            manifest = json.loads(bundle["__manifest__"].tobytes().decode("utf-8"))
+            arrays = {key: bundle[key] for key in bundle.files if key != "__manifest__"}
+        return cls(manifest, arrays)
+
+    def predict(self, x, verbose=0):
+        """Forward pass untuk satu batch (argumen verbose diabaikan, untuk kompatibilitas Keras)."""
+        return self._forward(x, self.layers)
+
+    def embed(self, x):
+        """
+        Output layer sebelum Dense terakhir (layer klasifikasi), yaitu representasi
+        embedding input yang dipakai untuk pencarian kemiripan.
+        """
+        return self._forward(x, self.layers[: _head_index(self.layers)])
+
+    def _forward(self, x, layers):
+        x = np.asarray(x)
+        mask = None
+        for spec in layers:
+            layer_type = spec["type"]
+            if layer_type == "Embedding":
+                ids = x.astype(np.int64, copy=False)
+                if spec.get("mask_zero"):
+                    mask = ids != 0
+                x = self.weights[spec["embeddings"]][ids]
+            elif layer_type == "Dense":
+                x = x @ self.weights[spec["kernel"]]
+                if "bias" in spec:
+                    x = x + self.weights[spec["bias"]]
+                x = _ACTIVATIONS[spec["activation"]](x)
+            elif layer_type == "Activation":
+                x = _ACTIVATIONS[spec["activation"]](x)
+            elif layer_type == "GlobalAveragePooling1D":
+                if mask is not None:
+                    weights = mask[..., None].astype(x.dtype)
+                    x = (x * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1.0)
+                else:
+                    x = x.mean(axis=1)
+                mask = None
+            elif layer_type == "GlobalMaxPooling1D":
+                # Sama seperti Keras, max pooling tidak memperhitungkan mask
+                x = x.max(axis=1)
+                mask = None
+            elif layer_type == "Flatten":
+                x = x.reshape(x.shape[0], -1)
+                mask = None
+        return x.astype(np.float32, copy=False)
+
+
+def _head_index(layer_types):
+    """Index Dense terakhir (layer klasifikasi) dalam list spec/tipe layer."""
+    types = [
+        spec["type"] if isinstance(spec, dict) else spec for spec in layer_types
+    ]
+    dense_indexes = [i for i, layer_type in enumerate(types) if layer_type == "Dense"]
+    if not dense_indexes:
+        raise ValueError("Model tidak memiliki layer Dense untuk diambil embedding-nya.")
+    return dense_indexes[-1]
+
+
+def make_embedder(model):
+    """
+    Fungsi batch -> embedding (output layer sebelum Dense terakhir) untuk model
+    Keras, NumpyModel, atau pool inferensi.
+    """
+    if hasattr(model, "embed"):
+        return model.embed
+    import tensorflow as tf
+
+    layers = model.layers
+    head = layers[_head_index([type(layer).__name__ for layer in layers])]
+    embedding_model = tf.keras.Model(inputs=model.inputs, outputs=head.input)
+    return lambda batch: embedding_model.predict(batch, verbose=0)
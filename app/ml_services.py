@@ -1,18 +1,23 @@
 # app/ml_services.py
+import hashlib
 import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from flask import current_app  # Untuk mengakses logger aplikasi
 
-# Pilih salah satu cara impor Keras/TensorFlow berdasarkan instalasi Anda:
-# Opsi 1: Jika menggunakan TensorFlow 2.x (umumnya ini)
-from tensorflow import keras
-
-# Opsi 2: Jika menggunakan Keras standalone versi lama (jarang sekarang)
-# from keras.models import load_model
-
 import numpy as np
 
+from . import ml_registry
+from .ml_batcher import MicroBatcher
+from .ml_cache import PredictionCache
+from .ml_postprocess import format_top_k, load_labels
+from .ml_preprocess import TextVectorizer
+from .ml_runtime import NumpyModel, configure_tensorflow_threads, make_embedder
+from .ml_worker_pool import InferenceWorkerPool
+
 # Impor library lain yang mungkin dibutuhkan untuk preprocessing, misalnya:
-# import pickle # Jika ada tokenizer yang disimpan sebagai file .pickle
 # from sklearn.preprocessing import StandardScaler # Contoh preprocessor
 # from tensorflow.keras.preprocessing.sequence import pad_sequences # jika Keras tidak diimpor dari tensorflow.keras
 
@@ -24,221 +29,1245 @@ PROJECT_ROOT = os.path.abspath(
 MODEL_FILENAME = "model_ml.h5"  # Pastikan nama ini sesuai
 MODEL_PATH = os.path.join(PROJECT_ROOT, "ml_models", MODEL_FILENAME)
 
-# Jika ada file preprocessor lain yang perlu dimuat (misalnya tokenizer, scaler)
+# Vocabulary tokenizer (vocab.json) dan label kelas (labels.json) dimuat dari
+# direktori yang sama dengan file model; lihat ML_VOCAB_* dan ML_LABELS_* di config.
+# Jika ada file preprocessor lain yang perlu dimuat (misalnya scaler)
 # Ganti dengan nama file preprocessor Anda dan pastikan ada di folder ml_models/
-# TOKENIZER_FILENAME = 'tokenizer.pickle'
-# TOKENIZER_PATH = os.path.join(PROJECT_ROOT, 'ml_models', TOKENIZER_FILENAME)
 # SCALER_FILENAME = 'scaler.joblib'
 # SCALER_PATH = os.path.join(PROJECT_ROOT, 'ml_models', SCALER_FILENAME)
 
+# TensorFlow/Keras TIDAK diimpor di level modul: impor TensorFlow memakan waktu
+# beberapa detik dan ratusan MB memori, padahal banyak proses (flask db upgrade,
+# test, worker non-ML) tidak pernah memakai model. Lihat _get_keras().
+keras = None
+_keras_import_lock = threading.Lock()
+
 # --- Variabel Global untuk Model dan Preprocessor ---
-# Kita akan memuatnya sekali saja
+# Kita akan memuatnya sekali saja. Model yang sedang melayani request disimpan
+# sebagai satu referensi LoadedModel (_active_model) sehingga hot-swap cukup
+# berupa satu assignment. ml_model dan model_version adalah alias untuk kode lama.
+_active_model = None
 ml_model = None
-# tokenizer = None # Aktifkan jika Anda menggunakan tokenizer terpisah
+# Identitas model yang sedang dimuat (dipakai sebagai bagian kunci cache prediksi)
+model_version = None
 # scaler = None    # Aktifkan jika Anda menggunakan scaler terpisah
 
+# Status pemuatan model untuk endpoint readiness (/health/ready).
+# state: "not_loaded" | "loading" | "ready" | "failed"
+_model_load_lock = threading.RLock()  # Mencegah model dimuat dua kali secara paralel
+_model_load_status = {
+    "state": "not_loaded",
+    "started_at": None,
+    "finished_at": None,
+    "duration_seconds": None,
+    "error": None,
+    "warmup": None,
+}
+
+# Status hot-swap model (endpoint admin / SIGHUP). Hanya satu swap boleh berjalan.
+# state: "idle" | "loading" | "ready" | "failed"
+_model_swap_lock = threading.Lock()
+_model_swap_status = {
+    "state": "idle",
+    "target_version": None,
+    "previous_version": None,
+    "started_at": None,
+    "finished_at": None,
+    "duration_seconds": None,
+    "error": None,
+    "warmup": None,
+}
+
+# Micro-batcher dibuat lazy per model (lihat LoadedModel.batcher)
+_batcher_lock = threading.Lock()
+
+# Pembatas jumlah inferensi bersamaan (BoundedSemaphore), dibuat lazy dari konfigurasi
+_inference_limiter = None
+_inference_limiter_lock = threading.Lock()
+_limiter_counters = {"in_flight": 0, "rejected": 0}
+
+
+class InferenceOverloadedError(Exception):
+    """Semua slot inferensi terpakai dan tidak ada yang bebas dalam batas waktu antre."""
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ModelSwapInProgressError(Exception):
+    """Hot-swap model lain masih berjalan."""
+
+
+class ModelUnavailableError(Exception):
+    """Model ML tidak dapat dimuat sehingga embedding tidak bisa dihitung."""
+
+
+class LoadedModel:
+    """
+    Satu versi model yang sudah dimuat beserta micro-batcher miliknya.
+    Request memegang referensi ke objek ini selama diproses (acquire/release),
+    sehingga saat hot-swap request yang sedang berjalan tetap selesai di model
+    lama. Model lama baru ditutup setelah request terakhirnya selesai.
+    """
+
+    def __init__(
+        self, model, version, path, backend, labels=None, vectorizer=None
+    ):
+        self.model = model
+        self.version = version
+        self.path = path
+        self.backend = backend
+        self.labels = labels  # Array nama label kelas (lihat ml_postprocess.load_labels)
+        self.vectorizer = vectorizer  # TextVectorizer dari vocabulary model ini
+        self.loaded_at = datetime.now(timezone.utc).isoformat()
+        self.batcher = None
+        self._embedder = None
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._retired = False
+        self._closed = False
+
+    def predict(self, batch):
+        """Satu panggilan predict ke model untuk seluruh batch (tanpa progress bar Keras)."""
+        return self.model.predict(batch, verbose=0)
+
+    def embed(self, batch):
+        """Embedding (output layer sebelum layer klasifikasi) untuk seluruh batch."""
+        if self._embedder is None:
+            self._embedder = make_embedder(self.model)
+        return self._embedder(batch)
+
+    def acquire(self):
+        """Tandai satu request memakai model ini. False jika model sudah dipensiunkan."""
+        with self._lock:
+            if self._retired:
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self._in_flight -= 1
+            should_close = self._retired and self._in_flight == 0
+        if should_close:
+            self.close()
+
+    def retire(self):
+        """Model tidak lagi aktif: tutup sekarang atau setelah request terakhir selesai."""
+        with self._lock:
+            self._retired = True
+            should_close = self._in_flight == 0
+        if should_close:
+            self.close()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        if self.batcher is not None:
+            self.batcher.shutdown()  # Antrean yang tersisa tetap di-flush dulu
+        if isinstance(self.model, InferenceWorkerPool):
+            self.model.shutdown()
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+
+# Cache hasil prediksi (LRU + TTL), dibuat lazy jika ML_CACHE_ENABLED aktif
+_prediction_cache = None
+_prediction_cache_lock = threading.Lock()
+
+
+def compute_model_version(model_path):
+    """
+    Versi model diturunkan dari nama, ukuran, dan waktu modifikasi file model,
+    sehingga setiap file model baru menghasilkan versi yang berbeda.
+    """
+    stat = os.stat(model_path)
+    fingerprint = f"{os.path.basename(model_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()[:12]
+
+
+def _get_keras():
+    """
+    Mengimpor Keras secara lazy saat pertama kali benar-benar dibutuhkan.
+    """
+    global keras
+    if keras is None:
+        with _keras_import_lock:
+            if keras is None:
+                # Pilih salah satu cara impor Keras/TensorFlow berdasarkan instalasi Anda:
+                # Opsi 1: Jika menggunakan TensorFlow 2.x (umumnya ini)
+                from tensorflow import keras as _keras
+
+                # Opsi 2: Jika menggunakan Keras standalone versi lama (jarang sekarang)
+                # import keras as _keras
+
+                # Ukuran thread pool TF harus diatur sebelum operasi TF pertama dijalankan
+                configure_tensorflow_threads(
+                    current_app.config.get("TF_INTRA_OP_THREADS", 0),
+                    current_app.config.get("TF_INTER_OP_THREADS", 0),
+                )
+                keras = _keras
+    return keras
+
+
+def get_model_path():
+    """Path file model: ML_MODEL_PATH dari konfigurasi jika diset, selain itu MODEL_PATH."""
+    return current_app.config.get("ML_MODEL_PATH") or MODEL_PATH
+
+
+def get_numpy_bundle_path():
+    """
+    Path bundle runtime NumPy: ML_NUMPY_BUNDLE_PATH jika diset, selain itu file
+    model dengan ekstensi .npz (hasil `flask ml export-numpy`).
+    """
+    configured = current_app.config.get("ML_NUMPY_BUNDLE_PATH")
+    if configured:
+        return configured
+    return os.path.splitext(get_model_path())[0] + ".npz"
+
+
+def get_registry_dir():
+    """Direktori registry model berversi (ML_MODEL_REGISTRY_DIR), atau None."""
+    return current_app.config.get("ML_MODEL_REGISTRY_DIR") or None
+
+
+def _artifact_filename(backend):
+    if backend == "numpy":
+        return os.path.splitext(MODEL_FILENAME)[0] + ".npz"
+    return MODEL_FILENAME
+
+
+def resolve_model_artifact(version=None, backend=None):
+    """
+    Menentukan file model yang harus dimuat beserta versinya.
+    Dengan registry: versi yang diminta, atau ML_MODEL_VERSION / CURRENT / versi
+    terbaru. Tanpa registry (atau registry kosong): ML_MODEL_PATH seperti biasa,
+    dengan versi berupa sidik jari file.
+    Mengembalikan tuple (model_path, version).
+    """
+    config = current_app.config
+    backend = backend or config.get("ML_RUNTIME_BACKEND", "keras")
+    registry_dir = get_registry_dir()
+    filename = _artifact_filename(backend)
+
+    if version is not None:
+        if not registry_dir or version not in ml_registry.list_versions(
+            registry_dir, filename
+        ):
+            raise FileNotFoundError(
+                f"Versi model '{version}' tidak ditemukan di registry model."
+            )
+        return ml_registry.artifact_path(registry_dir, version, filename), version
+
+    if registry_dir:
+        resolved = ml_registry.resolve_version(
+            registry_dir, config.get("ML_MODEL_VERSION"), filename
+        )
+        if resolved is not None:
+            return ml_registry.artifact_path(registry_dir, resolved, filename), resolved
+
+    model_path = get_numpy_bundle_path() if backend == "numpy" else get_model_path()
+    legacy_version = (
+        compute_model_version(model_path) if os.path.exists(model_path) else None
+    )
+    return model_path, legacy_version
+
 
 def load_model_and_preprocessors():
     """
     Memuat model Keras/TensorFlow dari file .h5 dan preprocessor terkait (jika ada).
     Fungsi ini idealnya dipanggil sekali saat aplikasi Flask dimulai.
+    Untuk mengganti model yang sudah aktif, gunakan swap_model().
+    """
+    with _model_load_lock:
+        if _active_model is not None:  # Hanya muat jika belum dimuat
+            return
+        started = time.perf_counter()
+        _set_model_load_status(
+            state="loading",
+            started_at=datetime.now(timezone.utc).isoformat(),
+            finished_at=None,
+            duration_seconds=None,
+            error=None,
+            warmup=None,
+        )
+        try:
+            loaded, warmup = _load_and_warm_up(*resolve_model_artifact())
+            _set_model_load_status(warmup=warmup)
+        except Exception as e:
+            _set_model_load_status(
+                state="failed",
+                finished_at=datetime.now(timezone.utc).isoformat(),
+                duration_seconds=round(time.perf_counter() - started, 3),
+                error=str(e),
+            )
+            raise
+        _activate_model(loaded)
+        _set_model_load_status(
+            state="ready",
+            finished_at=datetime.now(timezone.utc).isoformat(),
+            duration_seconds=round(time.perf_counter() - started, 3),
+        )
+
+
+def _load_and_warm_up(model_path, version):
+    """Memuat satu versi model dan menjalankan warm-up, tanpa mengubah model aktif."""
+    loaded = _load_model_and_preprocessors(model_path, version)
+    if not current_app.config.get("ML_WARMUP_ENABLED", True):
+        return loaded, None
+    try:
+        return loaded, warm_up_model(loaded.model)
+    except Exception:
+        loaded.close()
+        raise
+
+
+def _activate_model(loaded):
+    """
+    Menjadikan `loaded` model aktif. Pergantian referensi adalah satu assignment
+    (atomik di CPython); request baru langsung memakai model baru sementara
+    model lama ditutup setelah request yang masih memakainya selesai.
     """
-    global ml_model  # , tokenizer, scaler # Aktifkan tokenizer, scaler jika digunakan
+    global _active_model, ml_model, model_version
+    with _model_load_lock:
+        previous = _active_model
+        _active_model = loaded
+        ml_model = loaded.model
+        model_version = loaded.version
 
-    if ml_model is None:  # Hanya muat jika belum dimuat
-        if not os.path.exists(MODEL_PATH):
-            current_app.logger.error(
-                f"File model tidak ditemukan di path: {MODEL_PATH}"
+    # Hasil prediksi yang di-cache dari model sebelumnya tidak berlaku lagi
+    cache = get_prediction_cache()
+    if cache is not None:
+        cache.set_model_version(loaded.version)
+
+    if previous is not None and previous is not loaded:
+        current_app.logger.info(
+            f"Model ML versi {loaded.version} aktif menggantikan versi {previous.version} "
+            f"({previous.in_flight} request masih memakai model lama)"
+        )
+        previous.retire()
+
+
+def swap_model(version=None, persist=False):
+    """
+    Memuat versi model (default: versi yang di-resolve dari registry), warm-up,
+    lalu mengganti model aktif secara atomik. Blocking; dipakai thread swap.
+    Jika persist=True, versi dicatat di file CURRENT registry agar dipakai lagi
+    setelah restart. Mengembalikan LoadedModel yang aktif setelah swap.
+    """
+    started = time.perf_counter()
+    previous_version = model_version
+    _set_model_swap_status(
+        state="loading",
+        target_version=version,
+        previous_version=previous_version,
+        started_at=datetime.now(timezone.utc).isoformat(),
+        finished_at=None,
+        duration_seconds=None,
+        error=None,
+        warmup=None,
+    )
+    try:
+        model_path, resolved_version = resolve_model_artifact(version)
+        _set_model_swap_status(target_version=resolved_version)
+        if _active_model is not None and resolved_version == previous_version:
+            current_app.logger.info(
+                f"Model ML versi {resolved_version} sudah aktif, swap dilewati."
             )
-            raise FileNotFoundError(f"File model tidak ditemukan di path: {MODEL_PATH}")
+            loaded = _active_model
+        else:
+            loaded, warmup = _load_and_warm_up(model_path, resolved_version)
+            _set_model_swap_status(warmup=warmup)
+            _activate_model(loaded)
+        registry_dir = get_registry_dir()
+        if persist and registry_dir and resolved_version:
+            ml_registry.write_current(registry_dir, resolved_version)
+    except Exception as e:
+        current_app.logger.error(
+            f"Hot-swap model ML ke versi {version or '(otomatis)'} gagal: {e}",
+            exc_info=True,
+        )
+        _set_model_swap_status(
+            state="failed",
+            finished_at=datetime.now(timezone.utc).isoformat(),
+            duration_seconds=round(time.perf_counter() - started, 3),
+            error=str(e),
+        )
+        raise
+
+    _set_model_swap_status(
+        state="ready",
+        finished_at=datetime.now(timezone.utc).isoformat(),
+        duration_seconds=round(time.perf_counter() - started, 3),
+    )
+    if _model_load_status["state"] != "ready":
+        # Misalnya pemuatan awal gagal lalu versi yang benar diaktifkan lewat swap
+        _set_model_load_status(
+            state="ready", finished_at=datetime.now(timezone.utc).isoformat(), error=None
+        )
+    return loaded
+
+
+def start_model_swap(app, version=None, persist=False):
+    """
+    Menjalankan swap_model di thread latar belakang. Request tetap dilayani
+    model lama selama versi baru dimuat dan di-warm-up.
+    Melempar ModelSwapInProgressError jika swap lain masih berjalan.
+    """
+    if not _model_swap_lock.acquire(blocking=False):
+        raise ModelSwapInProgressError("Hot-swap model lain masih berjalan.")
+    _set_model_swap_status(state="loading", target_version=version, error=None)
+
+    def _swap_in_background():
+        try:
+            with app.app_context():
+                try:
+                    swap_model(version, persist=persist)
+                except Exception:
+                    pass  # Sudah dicatat di log dan status swap
+        finally:
+            _model_swap_lock.release()
+
+    thread = threading.Thread(
+        target=_swap_in_background, name="ml-model-swap", daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def install_reload_signal_handler(app):
+    """
+    Pasang handler SIGHUP yang memuat ulang versi model dari registry (mis.
+    setelah file CURRENT diubah) tanpa me-restart proses.
+    """
+    import signal
+
+    def _handle_sighup(signum, frame):
         try:
+            start_model_swap(app)
+        except ModelSwapInProgressError:
+            app.logger.warning("SIGHUP diabaikan: hot-swap model lain masih berjalan.")
+
+    try:
+        signal.signal(signal.SIGHUP, _handle_sighup)
+    except (AttributeError, ValueError) as e:
+        # SIGHUP tidak ada di Windows; signal hanya bisa dipasang dari main thread
+        app.logger.warning(f"Handler SIGHUP untuk reload model ML tidak dipasang: {e}")
+
+
+def get_active_model():
+    """LoadedModel yang sedang aktif, atau None jika belum ada model yang dimuat."""
+    return _active_model
+
+
+@contextmanager
+def active_model():
+    """
+    Memegang model aktif selama blok berjalan, sehingga hot-swap di tengah
+    request tidak menutup model yang sedang dipakai. Menghasilkan None jika
+    belum ada model yang dimuat.
+    """
+    while True:
+        loaded = _active_model
+        # acquire() gagal hanya jika model baru saja diganti: ambil ulang referensinya
+        if loaded is None or loaded.acquire():
+            break
+    try:
+        yield loaded
+    finally:
+        if loaded is not None:
+            loaded.release()
+
+
+def list_model_versions():
+    """Daftar versi di registry beserta versi aktif dan status hot-swap terakhir."""
+    registry_dir = get_registry_dir()
+    backend = current_app.config.get("ML_RUNTIME_BACKEND", "keras")
+    current = ml_registry.read_current(registry_dir) if registry_dir else None
+    versions = (
+        ml_registry.list_versions(registry_dir, _artifact_filename(backend))
+        if registry_dir
+        else []
+    )
+    return {
+        "active_version": model_version,
+        "current_version": current,
+        "registry_enabled": bool(registry_dir),
+        "versions": [
+            {
+                "version": version,
+                "active": version == model_version,
+                "current": version == current,
+            }
+            for version in versions
+        ],
+        "swap": get_model_swap_status(),
+    }
+
+
+def _synthetic_inputs(model, batch_size, sequence_length):
+    """
+    Membuat input nol sesuai shape & dtype input model. Dimensi batch diisi
+    batch_size dan dimensi lain yang tidak tetap (None) diisi sequence_length.
+    """
+    arrays = []
+    for model_input in model.inputs:
+        shape = [batch_size] + [
+            dim if dim is not None else sequence_length for dim in model_input.shape[1:]
+        ]
+        arrays.append(np.zeros(shape, dtype=np.dtype(model_input.dtype)))
+    return arrays[0] if len(arrays) == 1 else arrays
+
+
+def get_warmup_batch_sizes():
+    """
+    Ukuran batch yang di-warm-up: ML_WARMUP_BATCH_SIZES jika diset, selain itu
+    semua ukuran batch yang memang dipakai (1, micro-batch, dan chunk endpoint batch).
+    """
+    config = current_app.config
+    batch_sizes = config.get("ML_WARMUP_BATCH_SIZES")
+    if not batch_sizes:
+        batch_sizes = [1]
+        if config.get("ML_BATCHING_ENABLED", False):
+            batch_sizes.append(config.get("ML_BATCH_MAX_SIZE", 32))
+        batch_sizes.append(config.get("ML_BATCH_ENDPOINT_CHUNK_SIZE", 64))
+    return sorted(set(int(size) for size in batch_sizes if int(size) > 0))
+
+
+def warm_up_model(model):
+    """
+    Menjalankan inferensi sintetis setelah model dimuat agar biaya tracing graph
+    dan alokasi memori tidak dibebankan ke request pengguna pertama.
+    Mengembalikan catatan waktu per ukuran batch (run pertama vs run terakhir).
+    """
+    config = current_app.config
+    runs = max(1, int(config.get("ML_WARMUP_RUNS", 2)))
+
+    # Panjang sekuens hanya relevan jika model menerima panjang dinamis (dimensi None)
+    dynamic_length = any(dim is None for i in model.inputs for dim in i.shape[1:])
+    if dynamic_length and config.get("ML_BATCH_TRIM_PADDING", False):
+        sequence_lengths = config.get("ML_BATCH_LENGTH_BUCKETS") or [1]
+    else:
+        sequence_lengths = [config.get("ML_MAX_SEQUENCE_LENGTH") or 1]
+
+    started = time.perf_counter()
+    timings = []
+    for batch_size in get_warmup_batch_sizes():
+        for sequence_length in sequence_lengths:
+            synthetic = _synthetic_inputs(model, batch_size, sequence_length)
+            run_ms = []
+            for _ in range(runs):
+                run_started = time.perf_counter()
+                model.predict(synthetic, verbose=0)
+                run_ms.append((time.perf_counter() - run_started) * 1000.0)
+            timings.append(
+                {
+                    "batch_size": batch_size,
+                    "sequence_length": sequence_length if dynamic_length else None,
+                    "first_ms": round(run_ms[0], 3),
+                    "last_ms": round(run_ms[-1], 3),
+                }
+            )
+
+    total_seconds = round(time.perf_counter() - started, 3)
+    current_app.logger.info(
+        f"Warm-up model ML selesai dalam {total_seconds} detik ({len(timings)} konfigurasi batch)"
+    )
+    return {"runs_per_shape": runs, "total_seconds": total_seconds, "timings": timings}
+
+
+def _set_model_load_status(**changes):
+    _model_load_status.update(changes)
+
+
+def _set_model_swap_status(**changes):
+    _model_swap_status.update(changes)
+
+
+def get_model_load_status():
+    """Salinan status pemuatan model (state, waktu mulai/selesai, durasi, error)."""
+    status = dict(_model_load_status)
+    status["model_version"] = model_version
+    status["loading_mode"] = current_app.config.get("ML_MODEL_LOADING", "lazy")
+    return status
+
+
+def get_model_swap_status():
+    """Salinan status hot-swap model terakhir."""
+    return dict(_model_swap_status)
+
+
+def is_model_ready():
+    """Model sudah dimuat dan warm-up selesai."""
+    return _active_model is not None and _model_load_status["state"] == "ready"
+
+
+def start_background_model_load(app):
+    """
+    Memuat model di thread latar belakang agar create_app() tidak terblokir.
+    Route non-ML langsung bisa melayani request; /ml/predict mengembalikan 503
+    sampai model siap.
+    """
+
+    def _load_in_background():
+        with app.app_context():
+            try:
+                load_model_and_preprocessors()
+            except Exception as e:
+                app.logger.error(
+                    f"KRUSIAL: Gagal memuat model ML di background: {e}", exc_info=True
+                )
+
+    _set_model_load_status(state="loading", started_at=None, error=None)
+    thread = threading.Thread(
+        target=_load_in_background, name="ml-model-loader", daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def get_labels_path(model_path):
+    """Path file label: ML_LABELS_PATH jika diset, selain itu di direktori file model."""
+    configured = current_app.config.get("ML_LABELS_PATH")
+    if configured:
+        return configured
+    return os.path.join(
+        os.path.dirname(model_path),
+        current_app.config.get("ML_LABELS_FILENAME", "labels.json"),
+    )
+
+
+def _load_labels_for_model(model_path):
+    labels_path = get_labels_path(model_path)
+    if not os.path.exists(labels_path):
+        current_app.logger.warning(
+            f"File label tidak ditemukan di: {labels_path}. Prediksi hanya berisi index kelas."
+        )
+        return None
+    labels = load_labels(labels_path)
+    current_app.logger.info(f"{len(labels)} label kelas dimuat dari: {labels_path}")
+    return labels
+
+
+def get_vocabulary_path(model_path):
+    """Path file vocabulary: ML_VOCAB_PATH jika diset, selain itu di direktori file model."""
+    configured = current_app.config.get("ML_VOCAB_PATH")
+    if configured:
+        return configured
+    return os.path.join(
+        os.path.dirname(model_path),
+        current_app.config.get("ML_VOCAB_FILENAME", "vocab.json"),
+    )
+
+
+def get_max_sequence_length(model):
+    """
+    Panjang sekuens input: dimensi tetap dari input model jika ada, selain itu
+    ML_MAX_SEQUENCE_LENGTH (model dengan panjang input dinamis).
+    """
+    shape = model.inputs[0].shape if getattr(model, "inputs", None) else ()
+    if len(shape) == 2 and shape[1]:
+        return int(shape[1])
+    return current_app.config.get("ML_MAX_SEQUENCE_LENGTH", 128)
+
+
+def _load_vectorizer_for_model(model_path, model):
+    config = current_app.config
+    vocabulary_path = get_vocabulary_path(model_path)
+    if not os.path.exists(vocabulary_path):
+        current_app.logger.warning(
+            f"File vocabulary tidak ditemukan di: {vocabulary_path}. Preprocessing teks tidak tersedia."
+        )
+        return None
+    vectorizer = TextVectorizer.from_file(
+        vocabulary_path,
+        get_max_sequence_length(model),
+        oov_index=config.get("ML_OOV_INDEX", 1),
+        lowercase=config.get("ML_TEXT_LOWERCASE", True),
+        num_words=config.get("ML_VOCAB_NUM_WORDS"),
+    )
+    current_app.logger.info(
+        f"Vocabulary ({len(vectorizer)} token, panjang sekuens {vectorizer.max_length}) dimuat dari: {vocabulary_path}"
+    )
+    return vectorizer
+
+
+def _load_model_and_preprocessors(model_path, version):
+    """
+    Memuat model dari model_path dan mengembalikannya sebagai LoadedModel.
+    Tidak mengubah model aktif; lihat _activate_model().
+    """
+    # global scaler # Aktifkan scaler jika digunakan
+    config = current_app.config
+    backend = config.get("ML_RUNTIME_BACKEND", "keras")
+    if not os.path.exists(model_path):
+        current_app.logger.error(
+            f"File model tidak ditemukan di path: {model_path}"
+        )
+        raise FileNotFoundError(f"File model tidak ditemukan di path: {model_path}")
+    try:
+        if config.get("ML_INFERENCE_MODE", "inprocess") == "pool":
+            # Model dimuat di proses inferensi terpisah; model adalah pool
+            # dengan antarmuka predict() yang sama seperti model Keras
+            model = InferenceWorkerPool(
+                model_path,
+                backend=backend,
+                num_workers=config.get("ML_POOL_WORKERS") or os.cpu_count() or 1,
+                shm_bytes=config.get("ML_POOL_SHM_BYTES", 16 * 1024 * 1024),
+                timeout_seconds=config.get("ML_POOL_TIMEOUT_SECONDS", 30),
+                tf_threads=(
+                    config.get("TF_INTRA_OP_THREADS", 0),
+                    config.get("TF_INTER_OP_THREADS", 0),
+                ),
+                warmup_batch_sizes=(
+                    get_warmup_batch_sizes()
+                    if config.get("ML_WARMUP_ENABLED", True)
+                    else []
+                ),
+                logger=current_app.logger,
+            ).start()
+        elif backend == "numpy":
+            # Runtime NumPy: tidak perlu mengimpor TensorFlow sama sekali
+            model = NumpyModel.load(model_path)
+        else:
             # Opsi 1 (TensorFlow 2.x):
-            ml_model = keras.models.load_model(MODEL_PATH)
+            model = _get_keras().models.load_model(model_path)
             # Opsi 2 (Keras standalone lama):
-            # ml_model = load_model(MODEL_PATH)
-            current_app.logger.info(
-                f"Model ML '{MODEL_FILENAME}' berhasil dimuat dari: {MODEL_PATH}"
-            )
+            # model = load_model(model_path)
+        version = version or compute_model_version(model_path)
+        current_app.logger.info(
+            f"Model ML '{os.path.basename(model_path)}' (versi {version}) berhasil dimuat dari: {model_path}"
+        )
 
-            # --- CONTOH MEMUAT PREPROCESSOR (HARUS DISESUAIKAN!) ---
-            # Jika Anda memiliki tokenizer yang disimpan:
-            # if os.path.exists(TOKENIZER_PATH):
-            #     with open(TOKENIZER_PATH, 'rb') as handle:
-            #         tokenizer = pickle.load(handle)
-            #     current_app.logger.info(f"Tokenizer '{TOKENIZER_FILENAME}' berhasil dimuat dari: {TOKENIZER_PATH}")
-            # else:
-            #     current_app.logger.warning(f"File tokenizer '{TOKENIZER_FILENAME}' tidak ditemukan di: {TOKENIZER_PATH}")
-
-            # Jika Anda memiliki scaler yang disimpan:
-            # if os.path.exists(SCALER_PATH):
-            #     from joblib import load # Perlu install joblib: pip install joblib
-            #     scaler = load(SCALER_PATH)
-            #     current_app.logger.info(f"Scaler '{SCALER_FILENAME}' berhasil dimuat dari: {SCALER_PATH}")
-            # else:
-            #     current_app.logger.warning(f"File scaler '{SCALER_FILENAME}' tidak ditemukan di: {SCALER_PATH}")
-            # --- AKHIR CONTOH MEMUAT PREPROCESSOR ---
+        labels = _load_labels_for_model(model_path)
+        vectorizer = _load_vectorizer_for_model(model_path, model)
 
-        except Exception as e:
-            current_app.logger.error(
-                f"GAGAL memuat model ML ('{MODEL_FILENAME}') atau preprocessor: {e}"
-            )
-            ml_model = None  # Pastikan tetap None jika gagal
-            raise e  # Re-raise exception agar bisa ditangkap saat startup jika perlu
+        # --- CONTOH MEMUAT PREPROCESSOR LAIN (HARUS DISESUAIKAN!) ---
+        # Jika Anda memiliki scaler yang disimpan:
+        # if os.path.exists(SCALER_PATH):
+        #     from joblib import load # Perlu install joblib: pip install joblib
+        #     scaler = load(SCALER_PATH)
+        #     current_app.logger.info(f"Scaler '{SCALER_FILENAME}' berhasil dimuat dari: {SCALER_PATH}")
+        # else:
+        #     current_app.logger.warning(f"File scaler '{SCALER_FILENAME}' tidak ditemukan di: {SCALER_PATH}")
+        # --- AKHIR CONTOH MEMUAT PREPROCESSOR ---
+
+    except Exception as e:
+        current_app.logger.error(
+            f"GAGAL memuat model ML ('{os.path.basename(model_path)}') atau preprocessor: {e}"
+        )
+        raise e  # Re-raise exception agar bisa ditangkap saat startup jika perlu
+
+    return LoadedModel(model, version, model_path, backend, labels, vectorizer)
 
 
-def preprocess_input_for_model(input_data_raw):
+def preprocess_input_for_model(input_data_raw, loaded=None):
     """
     Melakukan preprocessing pada input data mentah agar sesuai dengan format yang diharapkan model.
-    >>> FUNGSI INI WAJIB ANDA ISI DENGAN LOGIKA PREPROCESSING DARI TEMAN ANDA <<<
-
-    Ini adalah contoh placeholder. Anda HARUS menggantinya.
-    Misalnya, jika model Anda menerima teks dan perlu tokenisasi & padding:
-    """
-    global tokenizer  # Jika Anda menggunakan tokenizer global
-    current_app.logger.info(f"Preprocessing input mentah: {input_data_raw}")
-
-    # ----- MULAI BAGIAN YANG PERLU DIGANTI SESUAI MODEL ANDA -----
-    # Contoh jika model adalah klasifikasi teks dan Anda punya tokenizer:
-    # if not tokenizer:
-    #     raise ValueError("Tokenizer belum dimuat atau tidak ada.")
-    # MAX_SEQUENCE_LENGTH = 200 # Ganti dengan maxlen yang benar untuk model Anda
-    # if isinstance(input_data_raw, str):
-    #     text_sequence = tokenizer.texts_to_sequences([input_data_raw])
-    #     padded_sequence = keras.preprocessing.sequence.pad_sequences(text_sequence, maxlen=MAX_SEQUENCE_LENGTH, padding='post', truncating='post')
-    #     current_app.logger.debug(f"Input diproses menjadi: {padded_sequence.shape}")
-    #     return padded_sequence
-    # else:
-    #     raise TypeError("Input untuk model teks harus berupa string.")
-
-    # Contoh jika model menerima array fitur numerik sederhana:
-    # if isinstance(input_data_raw, list):
-    #     input_array = np.array([input_data_raw]) # Pastikan shape-nya (1, num_features)
-    #     # Jika ada scaler:
-    #     # if not scaler:
-    #     #     raise ValueError("Scaler belum dimuat atau tidak ada.")
-    #     # input_array_scaled = scaler.transform(input_array)
-    #     # return input_array_scaled
-    #     return input_array # Jika tidak ada scaling
-    # else:
-    #     raise TypeError("Input untuk model numerik harus berupa list angka.")
-    # ----- AKHIR BAGIAN YANG PERLU DIGANTI SESUAI MODEL ANDA -----
-
-    current_app.logger.error(
-        "KRUSIAL: Fungsi 'preprocess_input_for_model' belum diimplementasikan dengan benar!"
+    Menerima satu teks atau list teks; hasilnya array int32 dengan satu baris per
+    input (shape (n, panjang_sekuens)), padding & truncating "post".
+    Seluruh list ditokenisasi dalam satu panggilan (lihat ml_preprocess.TextVectorizer)
+    memakai vocabulary milik model `loaded` (default: model aktif).
+    """
+    loaded = loaded or _active_model
+    vectorizer = loaded.vectorizer if loaded is not None else None
+    if vectorizer is None:
+        current_app.logger.error(
+            "KRUSIAL: Vocabulary untuk preprocessing teks belum dimuat!"
+        )
+        raise NotImplementedError(
+            "Vocabulary belum dimuat. Letakkan vocab.json di samping file model atau set ML_VOCAB_PATH."
+        )
+
+    texts = input_data_raw if isinstance(input_data_raw, list) else [input_data_raw]
+    processed = vectorizer.transform(texts)
+    current_app.logger.debug(f"Input diproses menjadi: {processed.shape}")
+    return processed
+
+
+def postprocess_model_output(
+    prediction_raw, labels=None, top_k=None, include_scores=False
+):
+    """
+    Mengubah output mentah model (satu batch, shape (n, num_classes)) menjadi
+    list hasil per baris berisi k label teratas beserta skornya.
+    Seluruh vektor skor hanya disertakan jika include_scores=True, agar respons
+    tetap kecil untuk model dengan banyak label.
+    """
+    if isinstance(prediction_raw, (list, tuple)):
+        # Model dengan beberapa output: yang dipakai untuk klasifikasi adalah output pertama
+        prediction_raw = prediction_raw[0]
+    if not isinstance(prediction_raw, np.ndarray) or prediction_raw.ndim < 1:
+        raise ValueError(
+            f"Format output model tidak dikenali: {type(prediction_raw)}, shape: {getattr(prediction_raw, 'shape', 'N/A')}"
+        )
+    if top_k is None:
+        top_k = current_app.config.get("ML_TOP_K", 3)
+    current_app.logger.debug(
+        f"Postprocessing output model dengan shape {prediction_raw.shape} (top_k={top_k})"
     )
-    raise NotImplementedError(
-        "Implementasikan fungsi preprocess_input_for_model sesuai kebutuhan model Anda."
+    return format_top_k(
+        prediction_raw, top_k, labels=labels, include_scores=include_scores
     )
 
 
-def postprocess_model_output(prediction_raw):
-    """
-    Mengubah output mentah dari model menjadi format yang lebih mudah dipahami/digunakan.
-    >>> FUNGSI INI WAJIB ANDA ISI DENGAN LOGIKA POSTPROCESSING DARI TEMAN ANDA <<<
-
-    Ini adalah contoh placeholder. Anda HARUS menggantinya.
-    Misalnya, jika model Anda klasifikasi kategori:
-    """
-    current_app.logger.info(f"Postprocessing output mentah: {prediction_raw}")
-
-    # ----- MULAI BAGIAN YANG PERLU DIGANTI SESUAI MODEL ANDA -----
-    # Contoh jika output adalah probabilitas untuk beberapa kelas:
-    # CLASS_LABELS = ['Berita', 'Olahraga', 'Teknologi', 'Hiburan'] # GANTI DENGAN LABEL KELAS ANDA
-    # if isinstance(prediction_raw, np.ndarray) and prediction_raw.ndim > 1 and prediction_raw.shape[0] == 1:
-    #     probabilities = prediction_raw[0]
-    # elif isinstance(prediction_raw, np.ndarray) and prediction_raw.ndim == 1:
-    #      probabilities = prediction_raw
-    # else:
-    #     current_app.logger.error(f"Format output model tidak dikenali: {type(prediction_raw)}, shape: {getattr(prediction_raw, 'shape', 'N/A')}")
-    #     return {"error_postprocessing": "Format output model tidak dikenali", "raw_output": str(prediction_raw)}
-
-    # try:
-    #     predicted_class_index = np.argmax(probabilities)
-    #     predicted_label = CLASS_LABELS[predicted_class_index]
-    #     confidence_score = float(probabilities[predicted_class_index])
-
-    #     all_scores = {label: float(prob) for label, prob in zip(CLASS_LABELS, probabilities) if len(CLASS_LABELS) == len(probabilities)}
-
-    #     return {
-    #         "predicted_category": predicted_label,
-    #         "confidence": round(confidence_score, 4),
-    #         "category_scores": all_scores
-    #     }
-    # except IndexError:
-    #     current_app.logger.error(f"Index error saat postprocessing. Mungkin CLASS_LABELS tidak cocok dengan output model. Output: {probabilities}")
-    #     return {"error_postprocessing": "Gagal memetakan prediksi ke label kelas.", "raw_output": probabilities.tolist()}
-    # except Exception as e:
-    #     current_app.logger.error(f"Error umum saat postprocessing: {e}")
-    #     return {"error_postprocessing": str(e), "raw_output": probabilities.tolist() if 'probabilities' in locals() else str(prediction_raw)}
-    # ----- AKHIR BAGIAN YANG PERLU DIGANTI SESUAI MODEL ANDA -----
-
-    current_app.logger.error(
-        "KRUSIAL: Fungsi 'postprocess_model_output' belum diimplementasikan dengan benar!"
+def _predict_batch(batch, loaded=None):
+    """Satu panggilan predict ke model (default: model aktif) untuk seluruh batch."""
+    return (loaded or _active_model).predict(batch)
+
+
+def get_batcher(loaded=None):
+    """
+    Mengembalikan MicroBatcher milik model (default: model aktif), dibuat dari
+    konfigurasi aplikasi saat pertama kali dibutuhkan. Setiap versi model punya
+    batcher sendiri agar batch tidak pernah mencampur dua versi model.
+    Mengembalikan None jika batching dinonaktifkan atau belum ada model.
+    """
+    config = current_app.config
+    loaded = loaded or _active_model
+    if loaded is None or not config.get("ML_BATCHING_ENABLED", False):
+        return None
+    if loaded.batcher is None:
+        with _batcher_lock:
+            if loaded.batcher is None:
+                loaded.batcher = MicroBatcher(
+                    # Slot inferensi dipegang per batch saat flush, bukan per
+                    # request yang menunggu di antrean batcher
+                    _with_inference_slot(loaded.predict),
+                    max_batch_size=config.get("ML_BATCH_MAX_SIZE", 32),
+                    max_wait_ms=config.get("ML_BATCH_MAX_WAIT_MS", 5),
+                    length_buckets=config.get("ML_BATCH_LENGTH_BUCKETS"),
+                    trim_padding=config.get("ML_BATCH_TRIM_PADDING", False),
+                    stats_window=config.get("ML_BATCH_STATS_WINDOW", 500),
+                    logger=current_app.logger,
+                )
+                current_app.logger.info(
+                    f"Micro-batcher ML aktif untuk model versi {loaded.version} "
+                    f"(max_batch_size={loaded.batcher.max_batch_size}, "
+                    f"max_wait_ms={config.get('ML_BATCH_MAX_WAIT_MS', 5)})"
+                )
+    return loaded.batcher
+
+
+def get_prediction_cache():
+    """
+    Mengembalikan instance PredictionCache global (dibuat dari konfigurasi saat
+    pertama kali dibutuhkan), atau None jika cache prediksi dinonaktifkan.
+    """
+    global _prediction_cache
+    config = current_app.config
+    if not config.get("ML_CACHE_ENABLED", False):
+        return None
+    if _prediction_cache is None:
+        with _prediction_cache_lock:
+            if _prediction_cache is None:
+                cache = PredictionCache(
+                    max_entries=config.get("ML_CACHE_MAX_ENTRIES", 10000),
+                    ttl_seconds=config.get("ML_CACHE_TTL_SECONDS", 3600),
+                    case_insensitive=config.get("ML_CACHE_CASE_INSENSITIVE", True),
+                )
+                cache.set_model_version(model_version)
+                _prediction_cache = cache
+    return _prediction_cache
+
+
+def get_inference_limiter():
+    """
+    Semaphore pembatas inferensi bersamaan (ML_MAX_CONCURRENT_INFERENCES),
+    atau None jika tidak dibatasi.
+    """
+    global _inference_limiter
+    max_concurrent = current_app.config.get("ML_MAX_CONCURRENT_INFERENCES", 0)
+    if not max_concurrent:
+        return None
+    if _inference_limiter is None:
+        with _inference_limiter_lock:
+            if _inference_limiter is None:
+                _inference_limiter = threading.BoundedSemaphore(max_concurrent)
+    return _inference_limiter
+
+
+def _inference_slot_settings():
+    """(limiter, timeout detik, retry_after) dari konfigurasi aplikasi saat ini."""
+    config = current_app.config
+    return (
+        get_inference_limiter(),
+        config.get("ML_INFERENCE_QUEUE_TIMEOUT_MS", 1000) / 1000.0,
+        config.get("ML_RETRY_AFTER_SECONDS", 5),
     )
-    # Kembalikan output mentah jika belum diimplementasikan
-    if isinstance(prediction_raw, np.ndarray):
-        return {"raw_prediction": prediction_raw.tolist()}
-    return {"raw_prediction": str(prediction_raw)}  # Sebagai string jika bukan ndarray
 
 
-def classify_data(input_data_raw):
+@contextmanager
+def inference_slot(settings=None):
     """
-    Fungsi utama untuk melakukan klasifikasi/prediksi.
+    Ambil satu slot inferensi. Pemanggil mengantre paling lama
+    ML_INFERENCE_QUEUE_TIMEOUT_MS; jika tetap penuh, InferenceOverloadedError
+    dilempar agar route bisa membalas 503 daripada menumpuk beban CPU.
+    `settings` (lihat _inference_slot_settings) untuk thread tanpa app context.
+    """
+    limiter, timeout, retry_after = settings or _inference_slot_settings()
+    if limiter is None:
+        yield
+        return
+
+    if not limiter.acquire(timeout=timeout):
+        with _inference_limiter_lock:
+            _limiter_counters["rejected"] += 1
+        raise InferenceOverloadedError(
+            "Server sedang sibuk memproses prediksi lain. Silakan coba lagi nanti.",
+            retry_after=retry_after,
+        )
+    with _inference_limiter_lock:
+        _limiter_counters["in_flight"] += 1
+    try:
+        yield
+    finally:
+        with _inference_limiter_lock:
+            _limiter_counters["in_flight"] -= 1
+        limiter.release()
+
+
+def _with_inference_slot(predict_fn):
+    """
+    predict_fn yang memegang satu slot inferensi selama satu panggilan. Dipakai
+    thread micro-batcher (tanpa app context): satu batch = satu slot, sehingga
+    batas ML_MAX_CONCURRENT_INFERENCES tidak membatasi ukuran batch. Jika slot
+    tidak didapat, semua request di batch itu menerima InferenceOverloadedError.
+    """
+    settings = _inference_slot_settings()
+    if settings[0] is None:
+        return predict_fn
+
+    def predict(batch):
+        with inference_slot(settings):
+            return predict_fn(batch)
+
+    return predict
+
+
+def run_inference(processed_input, loaded=None):
+    """
+    Menjalankan model (default: model aktif) pada input yang sudah dipreprocess.
+    Input tunggal (shape (1, ...)) dilewatkan ke micro-batcher agar digabung
+    dengan request lain yang datang bersamaan (slot inferensi diambil per
+    batch); input lain langsung ke model dengan slotnya sendiri.
+    """
+    loaded = loaded or _active_model
+    batcher = get_batcher(loaded)
+    if (
+        batcher is not None
+        and isinstance(processed_input, np.ndarray)
+        and processed_input.ndim >= 1
+        and processed_input.shape[0] == 1
+    ):
+        return batcher.predict(processed_input)
+    with inference_slot():
+        return _predict_batch(processed_input, loaded)
+
+
+def get_inference_stats():
+    """Statistik runtime inferensi (ukuran/latensi batch) untuk endpoint /ml/stats."""
+    loaded = _active_model
+    return {
+        "model_version": model_version,
+        "runtime_backend": current_app.config.get("ML_RUNTIME_BACKEND", "keras"),
+        "batching": (
+            loaded.batcher.stats()
+            if loaded is not None and loaded.batcher is not None
+            else None
+        ),
+        "cache": _prediction_cache.stats() if _prediction_cache is not None else None,
+        "limiter": {
+            "max_concurrent": current_app.config.get("ML_MAX_CONCURRENT_INFERENCES", 0),
+            "queue_timeout_ms": current_app.config.get(
+                "ML_INFERENCE_QUEUE_TIMEOUT_MS", 1000
+            ),
+            **_limiter_counters,
+        },
+        "worker_pool": (
+            loaded.model.stats()
+            if loaded is not None and isinstance(loaded.model, InferenceWorkerPool)
+            else None
+        ),
+        "swap": get_model_swap_status(),
+    }
+
+
+def _ensure_model_loaded():
     """
-    global ml_model
-    if ml_model is None:
+    Memastikan model sudah dimuat sebelum prediksi.
+    Mengembalikan dict error jika model tidak tersedia, atau None jika siap.
+    """
+    if _active_model is None:
         current_app.logger.warning("Model ML belum dimuat. Mencoba memuat sekarang...")
         try:
             load_model_and_preprocessors()
-            if ml_model is None:  # Jika masih None setelah mencoba muat
+            if _active_model is None:  # Jika masih None setelah mencoba muat
                 current_app.logger.error("Model ML tidak dapat dimuat untuk prediksi.")
                 return {"error": "Model machine learning tidak tersedia saat ini."}
         except Exception as e:
             current_app.logger.error(f"Gagal memuat model ML saat akan prediksi: {e}")
             return {"error": f"Gagal memuat model machine learning: {str(e)}"}
+    return None
+
 
+def embed_texts(texts):
+    """
+    Embedding untuk list teks dengan model aktif, dalam satu panggilan batch.
+    Mengembalikan tuple (array float32 (n, dim), versi model). Melempar
+    ModelUnavailableError jika model tidak bisa dimuat dan
+    InferenceOverloadedError jika slot inferensi penuh.
+    """
+    load_error = _ensure_model_loaded()
+    if load_error:
+        raise ModelUnavailableError(load_error["error"])
+    with active_model() as loaded:
+        batch = preprocess_input_for_model(list(texts), loaded)
+        with inference_slot():
+            vectors = loaded.embed(batch)
+        return np.asarray(vectors, dtype=np.float32), loaded.version
+
+
+def _preprocess_with_errors(input_data_raw, loaded=None):
+    """
+    Menjalankan preprocess_input_for_model dan memetakan exception ke dict error.
+    Mengembalikan tuple (processed_input, error_dict).
+    """
     try:
-        processed_input = preprocess_input_for_model(input_data_raw)
+        return preprocess_input_for_model(input_data_raw, loaded), None
     except NotImplementedError as e:
-        return {"error": f"Preprocessing Error: {str(e)}"}
-    except ValueError as e:
-        return {"error": f"Input Error atau Preprocessing Error: {str(e)}"}
+        return None, {"error": f"Preprocessing Error: {str(e)}"}
+    except (ValueError, TypeError) as e:
+        return None, {"error": f"Input Error atau Preprocessing Error: {str(e)}"}
     except Exception as e:
         current_app.logger.error(
             f"Error tak terduga saat preprocessing input: {e}", exc_info=True
         )
-        return {"error": "Terjadi kesalahan internal saat memproses input."}
+        return None, {"error": "Terjadi kesalahan internal saat memproses input."}
+
+
+def _raw_rows_for_debug(prediction_raw, num_rows):
+    if isinstance(prediction_raw, np.ndarray) and prediction_raw.ndim >= 1:
+        return [prediction_raw[i : i + 1].tolist() for i in range(num_rows)]
+    return [str(prediction_raw)] * num_rows
+
 
+def _postprocess_with_errors(
+    prediction_raw, num_rows, labels=None, top_k=None, include_scores=False
+):
+    """
+    Menjalankan postprocess_model_output untuk seluruh batch prediksi sekaligus
+    dan memetakan exception ke dict error yang sama dengan classify_data.
+    Mengembalikan list hasil dengan panjang num_rows.
+    """
     try:
-        prediction_raw = ml_model.predict(processed_input)
+        return postprocess_model_output(
+            prediction_raw, labels=labels, top_k=top_k, include_scores=include_scores
+        )
+    except NotImplementedError as e:
+        return [
+            {"error": f"Postprocessing Error: {str(e)}", "raw_prediction_for_debug": raw}
+            for raw in _raw_rows_for_debug(prediction_raw, num_rows)
+        ]
+    except Exception as e:
+        current_app.logger.error(
+            f"Error tak terduga saat postprocessing output: {e}", exc_info=True
+        )
+        return [
+            {
+                "error": "Terjadi kesalahan internal saat memproses hasil prediksi.",
+                "raw_prediction_for_debug": raw,
+            }
+            for raw in _raw_rows_for_debug(prediction_raw, num_rows)
+        ]
+
+
+def resolve_top_k(top_k=None):
+    """top_k dari request, dibatasi ML_TOP_K_MAX; default ML_TOP_K."""
+    config = current_app.config
+    if top_k is None:
+        top_k = config.get("ML_TOP_K", 3)
+    return max(1, min(int(top_k), config.get("ML_TOP_K_MAX", 50)))
+
+
+def classify_data(input_data_raw, top_k=None, include_scores=False):
+    """
+    Fungsi utama untuk melakukan klasifikasi/prediksi.
+    Hasil berisi top_k label teratas (default ML_TOP_K); seluruh vektor skor hanya
+    jika include_scores=True. Hasil yang sukses menyertakan "model_version" dari
+    model yang memprosesnya.
+    Melempar InferenceOverloadedError jika slot inferensi penuh.
+    """
+    if isinstance(input_data_raw, list):
+        # Hasilnya satu dict: list input akan kehilangan n-1 prediksi (classify_batch)
+        return {"error": "classify_data menerima satu input; gunakan classify_batch."}
+
+    load_error = _ensure_model_loaded()
+    if load_error:
+        return load_error
+
+    top_k = resolve_top_k(top_k)
+    with active_model() as loaded:
+        return _classify_with_model(loaded, input_data_raw, top_k, include_scores)
+
+
+def _classify_with_model(loaded, input_data_raw, top_k, include_scores):
+    cache = get_prediction_cache()
+    cache_key = None
+    if cache is not None:
+        # Versi model ikut di kunci: request yang masih memakai model lama saat
+        # hot-swap tidak bisa mengisi cache untuk model baru. Opsi postprocessing
+        # juga, karena bentuk hasilnya berbeda.
+        cache_key = cache.make_key(
+            input_data_raw, loaded.version, top_k, bool(include_scores)
+        )
+        cached_result = cache.get(cache_key)
+        if cached_result is not None:
+            return cached_result
+
+    processed_input, preprocess_error = _preprocess_with_errors(input_data_raw, loaded)
+    if preprocess_error:
+        return preprocess_error
+
+    try:
+        prediction_raw = run_inference(processed_input, loaded)
+    except InferenceOverloadedError:
+        raise  # Ditangani route sebagai 503
     except Exception as e:
         current_app.logger.error(
             f"Error saat melakukan prediksi dengan model: {e}", exc_info=True
         )
         return {"error": "Terjadi kesalahan internal saat melakukan prediksi."}
 
+    final_result = _postprocess_with_errors(
+        prediction_raw, 1, loaded.labels, top_k, include_scores
+    )[0]
+    if "error" not in final_result:
+        final_result["model_version"] = loaded.version
+        if cache_key is not None:
+            cache.set(cache_key, final_result)
+    return final_result
+
+
+def _preprocess_chunk(chunk_inputs, loaded=None):
+    """
+    Preprocessing satu chunk secara vektor (satu panggilan untuk seluruh list).
+    Jika panggilan vektor gagal, setiap input diproses ulang satu per satu agar
+    error hanya ditandai pada item yang bermasalah.
+    Mengembalikan tuple (processed_rows, errors) dengan panjang sama seperti chunk;
+    processed_rows[i] berisi array (1, ...) atau None jika item ke-i error.
+    """
     try:
-        final_result = postprocess_model_output(prediction_raw)
+        processed = preprocess_input_for_model(list(chunk_inputs), loaded)
+        if isinstance(processed, np.ndarray) and processed.shape[0] == len(chunk_inputs):
+            return [processed[i : i + 1] for i in range(len(chunk_inputs))], [
+                None
+            ] * len(chunk_inputs)
     except NotImplementedError as e:
-        return {
-            "error": f"Postprocessing Error: {str(e)}",
-            "raw_prediction_for_debug": (
-                prediction_raw.tolist()
-                if isinstance(prediction_raw, np.ndarray)
-                else str(prediction_raw)
-            ),
-        }
+        error = {"error": f"Preprocessing Error: {str(e)}"}
+        return [None] * len(chunk_inputs), [error] * len(chunk_inputs)
     except Exception as e:
-        current_app.logger.error(
-            f"Error tak terduga saat postprocessing output: {e}", exc_info=True
+        current_app.logger.warning(
+            f"Preprocessing batch gagal, mencoba per item untuk mengisolasi error: {e}"
         )
-        return {
-            "error": "Terjadi kesalahan internal saat memproses hasil prediksi.",
-            "raw_prediction_for_debug": (
-                prediction_raw.tolist()
-                if isinstance(prediction_raw, np.ndarray)
-                else str(prediction_raw)
-            ),
-        }
 
-    return final_result
+    rows, errors = [], []
+    for item in chunk_inputs:
+        processed_item, error = _preprocess_with_errors(item, loaded)
+        rows.append(processed_item)
+        errors.append(error)
+    return rows, errors
+
+
+def classify_batch(inputs_raw, chunk_size=None, top_k=None, include_scores=False):
+    """
+    Klasifikasi banyak input sekaligus.
+    Preprocessing dijalankan per chunk secara vektor, model dipanggil sekali per
+    chunk, dan postprocessing (top-k) dijalankan sekali per chunk dengan kontrak
+    yang sama dengan classify_data.
+    Mengembalikan list hasil dengan urutan sama seperti input; item yang gagal
+    berisi dict {"error": ...} tanpa menggagalkan item lain.
+    Melempar InferenceOverloadedError jika slot inferensi penuh.
+    """
+    load_error = _ensure_model_loaded()
+    if load_error:
+        return [dict(load_error) for _ in inputs_raw]
+
+    top_k = resolve_top_k(top_k)
+    # Seluruh batch diproses oleh satu versi model, meskipun terjadi hot-swap
+    with active_model() as loaded:
+        return _classify_batch_with_model(
+            loaded, inputs_raw, chunk_size, top_k, include_scores
+        )
+
+
+def _classify_batch_with_model(loaded, inputs_raw, chunk_size, top_k, include_scores):
+    if chunk_size is None:
+        chunk_size = current_app.config.get("ML_BATCH_ENDPOINT_CHUNK_SIZE", 64)
+    chunk_size = max(1, int(chunk_size))
+
+    results = [None] * len(inputs_raw)
+
+    # Ambil dulu hasil yang sudah ada di cache; hanya sisanya yang dikirim ke model
+    cache = get_prediction_cache()
+    cache_keys = [None] * len(inputs_raw)
+    pending_positions = list(range(len(inputs_raw)))
+    if cache is not None:
+        pending_positions = []
+        for position, item in enumerate(inputs_raw):
+            cache_keys[position] = cache.make_key(
+                item, loaded.version, top_k, bool(include_scores)
+            )
+            cached_result = cache.get(cache_keys[position])
+            if cached_result is not None:
+                results[position] = cached_result
+            else:
+                pending_positions.append(position)
+
+    for start in range(0, len(pending_positions), chunk_size):
+        chunk_positions = pending_positions[start : start + chunk_size]
+        chunk = [inputs_raw[position] for position in chunk_positions]
+        rows, errors = _preprocess_chunk(chunk, loaded)
+
+        valid_positions = [i for i, row in enumerate(rows) if row is not None]
+        for i, error in enumerate(errors):
+            if error:
+                results[chunk_positions[i]] = error
+        if not valid_positions:
+            continue
+
+        try:
+            batch_input = np.concatenate([rows[i] for i in valid_positions], axis=0)
+            with inference_slot():
+                prediction_raw = _predict_batch(batch_input, loaded)
+        except InferenceOverloadedError:
+            raise  # Kapasitas penuh: seluruh batch ditolak dengan 503
+        except Exception as e:
+            current_app.logger.error(
+                f"Error saat melakukan prediksi batch dengan model: {e}", exc_info=True
+            )
+            for i in valid_positions:
+                results[chunk_positions[i]] = {
+                    "error": "Terjadi kesalahan internal saat melakukan prediksi."
+                }
+            continue
+
+        # Postprocessing (top-k) sekali untuk seluruh chunk
+        chunk_results = _postprocess_with_errors(
+            prediction_raw, len(valid_positions), loaded.labels, top_k, include_scores
+        )
+        for i, result in zip(valid_positions, chunk_results):
+            position = chunk_positions[i]
+            results[position] = result
+            if "error" not in result:
+                result["model_version"] = loaded.version
+                if cache is not None:
+                    cache.set(cache_keys[position], result)
+
+    return results
@@ -0,0 +1,353 @@
+# app/ml_worker_pool.py
+"""
+Pool proses inferensi terpisah dari worker web.
+
+Setiap proses memuat model satu kali. Tensor input/output dipindahkan lewat
+shared memory (bukan pickle); pipe hanya membawa pesan kecil berisi shape dan
+dtype. Dengan begitu jumlah salinan model mengikuti jumlah core inferensi,
+bukan jumlah worker web.
+"""
+import atexit
+import multiprocessing
+import queue
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .ml_runtime import InputSpec, configure_tensorflow_threads, make_embedder
+
+
+def _attach_shared_memory(name):
+    # Proses "spawn" memakai resource tracker yang sama dengan proses induk,
+    # sehingga segmen tetap dimiliki (dan di-unlink oleh) proses induk.
+    return shared_memory.SharedMemory(name=name)
+
+
+def _load_model(model_path, backend, tf_threads=(0, 0)):
+    if backend == "numpy":
+        from .ml_runtime import NumpyModel
+
+        return NumpyModel.load(model_path)
+    from tensorflow import keras
+
+    configure_tensorflow_threads(*tf_threads)
+
+    return keras.models.load_model(model_path)
+
+
+def _output_row_specs(model, embedder, input_spec):
+    """
+    Shape per baris dan dtype output `predict`/`embed`, diukur dengan satu baris
+    dummy. Dimensi input None diisi 1, sama seperti warm-up.
+    """
+    shape, dtype = input_spec
+    dummy = np.zeros([1] + [dim or 1 for dim in shape[1:]], dtype=np.dtype(dtype))
+    specs = {"predict": model.predict(dummy, verbose=0)}
+    if embedder is not None:
+        specs["embed"] = embedder(dummy)
+    return {
+        kind: (tuple(np.shape(output)[1:]), np.asarray(output).dtype.str)
+        for kind, output in specs.items()
+    }
+
+
+def _worker_main(
+    model_path, backend, input_name, output_name, conn, warmup_batch_sizes, tf_threads
+):
+    """Loop utama proses inferensi (berjalan di proses anak)."""
+    input_shm = _attach_shared_memory(input_name)
+    output_shm = _attach_shared_memory(output_name)
+    try:
+        model = _load_model(model_path, backend, tf_threads)
+        input_specs = [
+            (tuple(model_input.shape), np.dtype(model_input.dtype).str)
+            for model_input in model.inputs
+        ]
+        # Warm-up di setiap proses agar tidak ada worker yang "dingin"
+        for batch_size in warmup_batch_sizes:
+            shape, dtype = input_specs[0]
+            dummy = np.zeros(
+                [batch_size] + [dim or 1 for dim in shape[1:]], dtype=np.dtype(dtype)
+            )
+            model.predict(dummy, verbose=0)
+        try:
+            embedder = make_embedder(model)
+        except Exception:
+            embedder = None  # model tanpa layer klasifikasi; error muncul saat embed
+        output_specs = _output_row_specs(model, embedder, input_specs[0])
+        conn.send(("ready", {"inputs": input_specs, "outputs": output_specs}))
+    except Exception as e:
+        conn.send(("error", f"Gagal memuat model di proses inferensi: {e}"))
+        return
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message[0] == "stop":
+            break
+        kind, shape, dtype = message
+        try:
+            batch = np.ndarray(shape, dtype=np.dtype(dtype), buffer=input_shm.buf)
+            if kind == "embed":
+                embedder = embedder or make_embedder(model)
+                output = np.ascontiguousarray(embedder(batch))
+            else:
+                output = np.ascontiguousarray(model.predict(batch, verbose=0))
+            if output.nbytes > output_shm.size:
+                raise ValueError(
+                    f"Output ({output.nbytes} byte) melebihi ukuran shared memory ({output_shm.size} byte)."
+                )
+            np.ndarray(output.shape, dtype=output.dtype, buffer=output_shm.buf)[...] = output
+            conn.send(("ok", output.shape, output.dtype.str))
+        except Exception as e:
+            conn.send(("error", str(e)))
+
+    input_shm.close()
+    output_shm.close()
+
+
+class _WorkerHandle:
+    """Proses inferensi beserta pipe dan segmen shared memory miliknya."""
+
+    def __init__(self, index, process, conn, input_shm, output_shm):
+        self.index = index
+        self.process = process
+        self.conn = conn
+        self.input_shm = input_shm
+        self.output_shm = output_shm
+
+
+class InferenceWorkerPool:
+    """
+    Pool proses inferensi dengan antarmuka mirip model Keras (`predict`, `inputs`)
+    sehingga bisa dipakai ml_services, micro-batcher, dan warm-up tanpa perubahan.
+    """
+
+    def __init__(
+        self,
+        model_path,
+        backend="keras",
+        num_workers=1,
+        shm_bytes=16 * 1024 * 1024,
+        timeout_seconds=30.0,
+        warmup_batch_sizes=(1,),
+        tf_threads=(0, 0),
+        logger=None,
+    ):
+        self.model_path = model_path
+        self.backend = backend
+        self.num_workers = max(1, int(num_workers))
+        self.shm_bytes = int(shm_bytes)
+        self.timeout_seconds = float(timeout_seconds)
+        self.warmup_batch_sizes = list(warmup_batch_sizes)
+        self.tf_threads = tuple(tf_threads)
+        self.logger = logger
+        self.inputs = []
+        # Ukuran satu baris output per jenis panggilan, dari pesan "ready" worker
+        self._output_row_bytes = {}
+
+        self._context = multiprocessing.get_context("spawn")
+        self._free = queue.Queue()
+        self._handles = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def start(self):
+        """Jalankan semua proses dan tunggu sampai masing-masing selesai memuat model."""
+        handles = []
+        try:
+            for index in range(self.num_workers):
+                handles.append(self._spawn(index))
+            for handle in handles:
+                self._await_ready(handle)
+                self._handles.append(handle)
+                self._free.put(handle)
+        except BaseException:
+            # Pool tidak jadi dipakai: hentikan semua proses dan lepas shared memory
+            # (termasuk proses yang belum sempat diperiksa), lalu teruskan error-nya
+            for handle in handles:
+                self._stop(handle)
+            self._handles = []
+            self._free = queue.Queue()
+            raise
+        atexit.register(self.shutdown)
+        if self.logger:
+            self.logger.info(
+                f"Pool inferensi ML aktif: {self.num_workers} proses, shared memory {self.shm_bytes} byte/arah"
+            )
+        return self
+
+    def predict(self, batch, verbose=0):
+        """Jalankan predict di salah satu proses inferensi yang sedang bebas."""
+        return self._call("predict", batch)
+
+    def embed(self, batch):
+        """Embedding (output sebelum layer klasifikasi) dihitung di proses inferensi."""
+        return self._call("embed", batch)
+
+    def _call(self, kind, batch):
+        batch = np.ascontiguousarray(batch)
+        max_rows = self._max_rows_per_call(kind, batch)
+        if batch.shape[0] > max_rows:
+            # Batch terlalu besar untuk satu segmen shared memory: pecah per baris
+            return np.concatenate(
+                [
+                    self._call(kind, batch[start : start + max_rows])
+                    for start in range(0, batch.shape[0], max_rows)
+                ],
+                axis=0,
+            )
+
+        try:
+            handle = self._free.get(timeout=self.timeout_seconds)
+        except queue.Empty:
+            raise TimeoutError("Tidak ada proses inferensi yang bebas.")
+        try:
+            np.ndarray(batch.shape, dtype=batch.dtype, buffer=handle.input_shm.buf)[
+                ...
+            ] = batch
+            handle.conn.send((kind, batch.shape, batch.dtype.str))
+            if not handle.conn.poll(self.timeout_seconds):
+                raise TimeoutError("Proses inferensi tidak merespons.")
+            message = handle.conn.recv()
+            if message[0] != "ok":
+                raise RuntimeError(message[1])
+            _, shape, dtype = message
+            # Salin keluar dari shared memory sebelum worker dipakai request lain
+            return np.ndarray(shape, dtype=np.dtype(dtype), buffer=handle.output_shm.buf).copy()
+        except (EOFError, OSError, TimeoutError):
+            # Request ini langsung gagal; proses diganti di thread terpisah dan
+            # baru masuk antrean bebas setelah selesai memuat model
+            self._restart_in_background(handle)
+            handle = None
+            raise
+        finally:
+            if handle is not None:
+                self._free.put(handle)
+
+    def shutdown(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            handles, self._handles = self._handles, []
+        for handle in handles:
+            self._stop(handle)
+
+    def stats(self):
+        return {
+            "workers": self.num_workers,
+            "idle_workers": self._free.qsize(),
+            "alive_workers": sum(1 for h in self._handles if h.process.is_alive()),
+            "shm_bytes": self.shm_bytes,
+            "backend": self.backend,
+        }
+
+    # --- Internal ---
+
+    def _max_rows_per_call(self, kind, batch):
+        # Input dan output memakai segmen berukuran sama: potongan batch harus muat
+        # di keduanya (output bisa lebih besar dari input, mis. embedding float32
+        # dari token int8)
+        input_row_bytes = batch.nbytes // max(1, batch.shape[0])
+        row_bytes = max(1, input_row_bytes, self._output_row_bytes.get(kind, 0))
+        if row_bytes > self.shm_bytes:
+            raise ValueError(
+                f"Satu baris input/output ({row_bytes} byte) melebihi ML_POOL_SHM_BYTES ({self.shm_bytes} byte)."
+            )
+        return max(1, self.shm_bytes // row_bytes)
+
+    def _spawn(self, index):
+        input_shm = shared_memory.SharedMemory(create=True, size=self.shm_bytes)
+        output_shm = shared_memory.SharedMemory(create=True, size=self.shm_bytes)
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(
+                self.model_path,
+                self.backend,
+                input_shm.name,
+                output_shm.name,
+                child_conn,
+                self.warmup_batch_sizes,
+                self.tf_threads,
+            ),
+            name=f"ml-inference-{index}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        return _WorkerHandle(index, process, parent_conn, input_shm, output_shm)
+
+    def _await_ready(self, handle, timeout=600):
+        if not handle.conn.poll(timeout):
+            self._stop(handle)
+            raise TimeoutError("Proses inferensi tidak selesai memuat model.")
+        status, payload = handle.conn.recv()
+        if status != "ready":
+            self._stop(handle)
+            raise RuntimeError(payload)
+        self.inputs = [InputSpec(shape, dtype) for shape, dtype in payload["inputs"]]
+        self._output_row_bytes = {
+            kind: int(np.prod(shape, dtype=np.int64)) * np.dtype(dtype).itemsize
+            for kind, (shape, dtype) in payload["outputs"].items()
+        }
+
+    def _restart_in_background(self, handle):
+        thread = threading.Thread(
+            target=self._restart,
+            args=(handle,),
+            name=f"ml-inference-restart-{handle.index}",
+            daemon=True,
+        )
+        thread.start()
+        return thread
+
+    def _restart(self, handle):
+        """
+        Ganti proses yang rusak/hang dengan proses baru dan masukkan ke antrean
+        bebas; None jika gagal atau pool sudah ditutup.
+        """
+        if self.logger:
+            self.logger.error(
+                f"Proses inferensi #{handle.index} bermasalah, menjalankan ulang..."
+            )
+        self._stop(handle)
+        try:
+            new_handle = self._spawn(handle.index)
+            self._await_ready(new_handle)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Gagal menjalankan ulang proses inferensi: {e}")
+            with self._lock:
+                self._handles = [h for h in self._handles if h is not handle]
+            return None
+        with self._lock:
+            if not self._closed:
+                self._handles = [
+                    new_handle if h is handle else h for h in self._handles
+                ]
+                self._free.put(new_handle)
+                return new_handle
+        self._stop(new_handle)
+        return None
+
+    def _stop(self, handle):
+        try:
+            handle.conn.send(("stop",))
+        except (OSError, EOFError):
+            pass
+        handle.process.join(timeout=5)
+        if handle.process.is_alive():
+            handle.process.terminate()
+            handle.process.join(timeout=5)
+        handle.conn.close()
+        for segment in (handle.input_shm, handle.output_shm):
+            try:
+                segment.close()
+                segment.unlink()
+            except FileNotFoundError:
+                pass
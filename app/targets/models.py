@@ -34,6 +34,11 @@ class Target(db.Model):
         "TargetProgress", backref="target", lazy="dynamic", cascade="all, delete-orphan"
     )
 
+    # Index untuk paginasi keyset GET /targets (per user, urutan created_at, id)
+    __table_args__ = (
+        db.Index("ix_targets_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
+
     def __repr__(self):
         return f"<Target {self.name}>"
 
@@ -77,5 +82,15 @@ class TargetProgress(db.Model):
         "Content", backref=db.backref("related_progress_entries", lazy="dynamic")
     )
 
+    # Index untuk paginasi keyset GET /targets/<id>/progress (urutan created_at, id)
+    __table_args__ = (
+        db.Index(
+            "ix_target_progress_target_id_created_at_id",
+            "target_id",
+            "created_at",
+            "id",
+        ),
+    )
+
     def __repr__(self):
         return f"<TargetProgress {self.id} for Target {self.target_id}>"
@@ -5,6 +5,11 @@ from app.extensions import db
 from app.auth.models import (
     User,
 )  # Mungkin diperlukan untuk info 'creator' atau 'recorder'
+from app.core.etag import bump_resource_versions, conditional_get
+from app.core.fieldsets import InvalidFieldsetError, batch_relation, parse_fieldset
+from app.core.pagination import InvalidPaginationError, paginate_keyset
+from app.core.streaming import get_stream_format, stream_keyset
+from app.core.utils import TARGET, TARGET_PROGRESS
 from .models import Target, TargetProgress
 from flask_jwt_extended import jwt_required, get_jwt_identity
 import uuid
@@ -12,9 +17,54 @@ import uuid
 # Buat Blueprint untuk modul targets
 targets_bp = Blueprint("targets_bp", __name__, url_prefix="/targets")
 
+_TARGET_UPDATED = TARGET.only("id", "name", "description", "updated_at")
+_PROGRESS_CREATED = TARGET_PROGRESS.only(
+    "id",
+    "target_id",
+    "status",
+    "notes",
+    "content_id",
+    "achieved_at",
+    "user_id",
+    "created_at",
+)
+_PROGRESS_ENTRY = TARGET_PROGRESS.only(
+    "id",
+    "status",
+    "notes",
+    "content_id",
+    "achieved_at",
+    "user_id_recorder",
+    "created_at",
+    "updated_at",
+)
+
+
+def _target_fieldset(required=()):
+    """Fieldset ?fields= / ?expand=progress (entri progress, terbaru lebih dulu)."""
+    return parse_fieldset(
+        Target,
+        TARGET,
+        {
+            "progress": batch_relation(
+                TargetProgress,
+                TargetProgress.target_id,
+                _PROGRESS_ENTRY,
+                order_by=(TargetProgress.created_at.desc(), TargetProgress.id.desc()),
+            )
+        },
+        required=required,
+    )
+
+
 # --- Endpoint untuk Target ---
 
 
+def _targets_version_key():
+    """Nama versi ETag daftar target milik pengguna yang sedang login."""
+    return f"targets:user:{get_jwt_identity()}"
+
+
 @targets_bp.route("", methods=["POST"])
 @jwt_required()
 def create_target():
@@ -46,8 +96,8 @@ def create_target():
 
     try:
         db.session.add(new_target)
+        bump_resource_versions(_targets_version_key())
         db.session.commit()
-        target_id_str = str(new_target.id)
     except Exception as e:
         db.session.rollback()
         return jsonify({"msg": "Gagal membuat target", "error": str(e)}), 500
@@ -56,14 +106,7 @@ def create_target():
         jsonify(
             {
                 "msg": "Target berhasil dibuat",
-                "target": {
-                    "id": target_id_str,
-                    "name": new_target.name,
-                    "description": new_target.description,
-                    "user_id": new_target.user_id,
-                    "created_at": new_target.created_at.isoformat() + "Z",
-                    "updated_at": new_target.updated_at.isoformat() + "Z",
-                },
+                "target": TARGET(new_target),
             }
         ),
         201,
@@ -72,30 +115,32 @@ def create_target():
 
 @targets_bp.route("", methods=["GET"])
 @jwt_required()
+@conditional_get(_targets_version_key)
 def get_all_targets_for_user():
     """
-    Endpoint untuk mendapatkan daftar semua target milik pengguna yang sedang login.
+    Endpoint untuk mendapatkan daftar target milik pengguna yang sedang login,
+    terbaru lebih dulu. Paginasi cursor: ?limit=50&cursor=<next_cursor>.
+    Ekspor seluruh data: ?stream=ndjson|json (lihat app.core.streaming).
+    Mendukung If-None-Match: 304 tanpa memuat data jika target user tidak berubah.
+    Pilih field dengan ?fields=id,name dan muat progress dengan ?expand=progress
+    (lihat app.core.fieldsets).
     """
     current_user_id = get_jwt_identity()
-    targets = (
-        Target.query.filter_by(user_id=current_user_id)
-        .order_by(Target.created_at.desc())
-        .all()
-    )
-
-    output = []
-    for target_item in targets:
-        target_data = {
-            "id": str(target_item.id),
-            "name": target_item.name,
-            "description": target_item.description,
-            "user_id": str(target_item.user_id),
-            "created_at": target_item.created_at.isoformat() + "Z",
-            "updated_at": target_item.updated_at.isoformat() + "Z",
-        }
-        output.append(target_data)
+    columns = (Target.created_at, Target.id)
+    try:
+        fieldset = _target_fieldset(required=[column.key for column in columns])
+        # Urutan (created_at, id) per user: index ix_targets_user_id_created_at_id
+        query = fieldset.apply(Target.query.filter_by(user_id=current_user_id))
+        stream_format = get_stream_format()
+        if stream_format:
+            return stream_keyset(
+                query, columns, fieldset, stream_format, descending=True
+            )
+        page = paginate_keyset(query, columns, descending=True)
+    except (InvalidPaginationError, InvalidFieldsetError) as e:
+        return jsonify({"msg": str(e)}), 400
 
-    return jsonify(output), 200
+    return jsonify(page.to_dict(fieldset)), 200
 
 
 @targets_bp.route("/<string:target_id>", methods=["GET"])
@@ -104,9 +149,16 @@ def get_target_by_id(target_id):
     """
     Endpoint untuk mendapatkan detail satu target berdasarkan ID.
     Hanya bisa diakses oleh pemilik target.
+    Mendukung ?fields= dan ?expand=progress seperti GET /targets.
     """
     current_user_id = get_jwt_identity()
-    target_item = Target.query.filter_by(id=target_id, user_id=current_user_id).first()
+    try:
+        fieldset = _target_fieldset()
+    except InvalidFieldsetError as e:
+        return jsonify({"msg": str(e)}), 400
+    target_item = fieldset.apply(
+        Target.query.filter_by(id=target_id, user_id=current_user_id)
+    ).first()
 
     if not target_item:
         # Cek apakah target ada tapi bukan milik user, atau memang tidak ada
@@ -118,19 +170,7 @@ def get_target_by_id(target_id):
             )  # Forbidden
         return jsonify({"msg": "Target tidak ditemukan"}), 404  # Not Found
 
-    return (
-        jsonify(
-            {
-                "id": str(target_item.id),
-                "name": target_item.name,
-                "description": target_item.description,
-                "user_id": str(target_item.user_id),
-                "created_at": target_item.created_at.isoformat() + "Z",
-                "updated_at": target_item.updated_at.isoformat() + "Z",
-            }
-        ),
-        200,
-    )
+    return jsonify(fieldset(target_item)), 200
 
 
 @targets_bp.route("/<string:target_id>", methods=["PUT"])
@@ -178,6 +218,7 @@ def update_target(target_id):
         return jsonify({"msg": "Tidak ada data yang diubah"}), 200
 
     try:
+        bump_resource_versions(_targets_version_key())
         db.session.commit()
     except Exception as e:
         db.session.rollback()
@@ -187,12 +228,7 @@ def update_target(target_id):
         jsonify(
             {
                 "msg": "Target berhasil diperbarui",
-                "target": {
-                    "id": str(target_item.id),
-                    "name": target_item.name,
-                    "description": target_item.description,
-                    "updated_at": target_item.updated_at.isoformat() + "Z",
-                },
+                "target": _TARGET_UPDATED(target_item),
             }
         ),
         200,
@@ -219,6 +255,7 @@ def delete_target(target_id):
     try:
         # Entri TargetProgress akan terhapus otomatis karena cascade pada model Target.progress_entries
         db.session.delete(target_item)
+        bump_resource_versions(_targets_version_key())
         db.session.commit()
     except Exception as e:
         db.session.rollback()
@@ -291,8 +328,9 @@ def add_target_progress(target_id):
 
     try:
         db.session.add(new_progress)
+        # Daftar target dengan ?expand=progress ikut berubah (ETag)
+        bump_resource_versions(_targets_version_key())
         db.session.commit()
-        progress_id_str = str(new_progress.id)
     except Exception as e:
         db.session.rollback()
         return jsonify({"msg": "Gagal menambahkan progress", "error": str(e)}), 500
@@ -301,20 +339,7 @@ def add_target_progress(target_id):
         jsonify(
             {
                 "msg": "Progress berhasil ditambahkan",
-                "progress": {
-                    "id": progress_id_str,
-                    "target_id": new_progress.target_id,
-                    "status": new_progress.status,
-                    "notes": new_progress.notes,
-                    "content_id": new_progress.content_id,
-                    "achieved_at": (
-                        new_progress.achieved_at.isoformat() + "Z"
-                        if new_progress.achieved_at
-                        else None
-                    ),
-                    "user_id": new_progress.user_id,
-                    "created_at": new_progress.created_at.isoformat() + "Z",
-                },
+                "progress": _PROGRESS_CREATED(new_progress),
             }
         ),
         201,
@@ -325,10 +350,18 @@ def add_target_progress(target_id):
 @jwt_required()
 def get_target_progress_entries(target_id):
     """
-    Endpoint untuk mendapatkan semua entri progress dari sebuah target.
+    Endpoint untuk mendapatkan entri progress dari sebuah target, terbaru lebih
+    dulu (paginasi cursor: ?limit=50&cursor=<next_cursor>, atau
+    ?stream=ndjson|json untuk mengekspor semuanya). Pilih field dengan ?fields=.
     Hanya bisa diakses oleh pemilik target.
     """
     current_user_id = get_jwt_identity()
+    try:
+        fieldset = parse_fieldset(
+            TargetProgress, _PROGRESS_ENTRY, required=("created_at", "id")
+        )
+    except InvalidFieldsetError as e:
+        return jsonify({"msg": str(e)}), 400
     target_item = Target.query.filter_by(id=target_id, user_id=current_user_id).first()
 
     if not target_item:
@@ -339,29 +372,20 @@ def get_target_progress_entries(target_id):
             404,
         )
 
-    progress_entries = (
-        TargetProgress.query.filter_by(target_id=target_id)
-        .order_by(TargetProgress.created_at.desc())
-        .all()
-    )
-
-    output = []
-    for entry in progress_entries:
-        progress_data = {
-            "id": str(entry.id),
-            "status": entry.status,
-            "notes": entry.notes,
-            "content_id": str(entry.content_id) if entry.content_id else None,
-            "achieved_at": (
-                entry.achieved_at.isoformat() + "Z" if entry.achieved_at else None
-            ),
-            "user_id_recorder": str(entry.user_id),  # User yang mencatat progress
-            "created_at": entry.created_at.isoformat() + "Z",
-            "updated_at": entry.updated_at.isoformat() + "Z",
-        }
-        output.append(progress_data)
+    # Urutan (created_at, id) per target memakai index ix_target_progress_target_id_created_at_id
+    query = fieldset.apply(TargetProgress.query.filter_by(target_id=target_id))
+    columns = (TargetProgress.created_at, TargetProgress.id)
+    try:
+        stream_format = get_stream_format()
+        if stream_format:
+            return stream_keyset(
+                query, columns, fieldset, stream_format, descending=True
+            )
+        page = paginate_keyset(query, columns, descending=True)
+    except InvalidPaginationError as e:
+        return jsonify({"msg": str(e)}), 400
 
-    return jsonify(output), 200
+    return jsonify(page.to_dict(fieldset)), 200
 
 
 # Anda bisa menambahkan endpoint untuk GET/PUT/DELETE progress spesifik berdasarkan progress_id jika diperlukan
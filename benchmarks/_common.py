@@ -0,0 +1,50 @@
+# benchmarks/_common.py
+"""
+Utilitas bersama untuk skrip benchmark: membuat model Keras sintetis kecil
+(klasifikasi teks: Embedding -> pooling -> Dense) agar benchmark bisa dijalankan
+tanpa file model produksi.
+"""
+import os
+import resource
+import sys
+
+# Agar skrip di folder benchmarks/ bisa mengimpor paket `app`
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+VOCAB_SIZE = 5000
+SEQUENCE_LENGTH = 128
+NUM_CLASSES = 10
+
+
+def build_synthetic_model(path, vocab_size=VOCAB_SIZE, sequence_length=SEQUENCE_LENGTH):
+    """Simpan model sintetis ke `path` (.h5) dan kembalikan path tersebut."""
+    from tensorflow import keras
+
+    model = keras.Sequential(
+        [
+            keras.Input(shape=(sequence_length,), dtype="int32"),
+            keras.layers.Embedding(vocab_size, 64),
+            keras.layers.GlobalAveragePooling1D(),
+            keras.layers.Dense(64, activation="relu"),
+            keras.layers.Dense(NUM_CLASSES, activation="softmax"),
+        ]
+    )
+    model.save(path)
+    return path
+
+
+def max_rss_mb():
+    """
+    Peak RSS proses saat ini dalam MB. Di Linux dibaca dari VmHWM karena nilai
+    ru_maxrss ikut terbawa dari proses induk setelah fork+exec.
+    """
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
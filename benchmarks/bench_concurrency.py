@@ -0,0 +1,92 @@
+# benchmarks/bench_concurrency.py
+"""
+Benchmark throughput dan tail latency inferensi saat jumlah pemanggil bersamaan
+naik (1, 2, 4, ... --max-concurrency). Setiap pemanggil adalah thread dengan
+app context sendiri yang memanggil ml_services.run_inference, sama seperti
+thread request pada server threaded.
+
+Pengaturan limiter dan thread pool TF dibaca dari environment variable, mis.:
+    ML_MAX_CONCURRENT_INFERENCES=4 TF_INTRA_OP_THREADS=2 TF_INTER_OP_THREADS=1 \\
+        python benchmarks/bench_concurrency.py
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from _common import SEQUENCE_LENGTH, VOCAB_SIZE, build_synthetic_model
+
+
+def run_level(app, ml_services, concurrency, requests_per_thread):
+    latencies, rejected = [], [0]
+    lock = threading.Lock()
+    rng = np.random.default_rng(concurrency)
+    sample = rng.integers(1, VOCAB_SIZE, size=(1, SEQUENCE_LENGTH)).astype("int32")
+
+    def caller():
+        with app.app_context():
+            for _ in range(requests_per_thread):
+                started = time.perf_counter()
+                try:
+                    ml_services.run_inference(sample)
+                except ml_services.InferenceOverloadedError:
+                    with lock:
+                        rejected[0] += 1
+                    continue
+                with lock:
+                    latencies.append((time.perf_counter() - started) * 1000.0)
+
+    threads = [threading.Thread(target=caller) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2], 2) if latencies else None,
+        "p99_ms": (
+            round(latencies[max(0, int(len(latencies) * 0.99) - 1)], 2)
+            if latencies
+            else None
+        ),
+        "rejected_503": rejected[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-concurrency", type=int, default=32)
+    parser.add_argument("--requests-per-thread", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.environ["ML_MODEL_PATH"] = build_synthetic_model(
+            os.path.join(tmpdir, "model_ml.h5")
+        )
+        from app import create_app, ml_services
+
+        app = create_app("testing")
+        with app.app_context():
+            ml_services.load_model_and_preprocessors()
+
+        concurrency = 1
+        while concurrency <= args.max_concurrency:
+            print(
+                json.dumps(
+                    run_level(app, ml_services, concurrency, args.requests_per_thread)
+                )
+            )
+            concurrency *= 2
+
+
+if __name__ == "__main__":
+    main()
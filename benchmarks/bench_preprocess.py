@@ -0,0 +1,107 @@
+# benchmarks/bench_preprocess.py
+"""
+Benchmark throughput preprocessing teks: pola lama (texts_to_sequences +
+pad_sequences satu teks per panggilan, lalu digabung) vs TextVectorizer yang
+memproses satu batch sekaligus ke buffer int32. Diukur untuk input tunggal dan
+beberapa ukuran batch.
+
+Jalankan dari root proyek:
+    python benchmarks/bench_preprocess.py [--vocab-size 20000] [--repeat 20]
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from _common import SEQUENCE_LENGTH
+from app.ml_preprocess import FILTERS, TextVectorizer
+
+KERAS_FILTER_TABLE = str.maketrans({char: " " for char in FILTERS})
+
+BATCH_SIZES = (1, 32, 256, 1024)
+
+
+def make_corpus(vocab_size, num_texts, seed=0):
+    rng = np.random.default_rng(seed)
+    words = [f"kata{i}" for i in range(vocab_size)]
+    # Sebagian token sengaja di luar vocabulary (OOV) dan panjang teks bervariasi
+    vocabulary = {
+        word: index for index, word in enumerate(words[: vocab_size // 2], start=2)
+    }
+    texts = []
+    for _ in range(num_texts):
+        length = int(rng.integers(5, SEQUENCE_LENGTH * 2))
+        picked = rng.integers(0, vocab_size, size=length)
+        texts.append(
+            ", ".join(words[i].upper() if i % 7 == 0 else words[i] for i in picked)
+        )
+    return vocabulary, texts
+
+
+def preprocess_per_text(vectorizer, texts):
+    """
+    Baseline: pola lama `texts_to_sequences([text])` + `pad_sequences` untuk
+    setiap teks (tokenisasi ala Keras, satu array per baris, lalu digabung).
+    """
+    rows = []
+    for text in texts:
+        words = text.lower().translate(KERAS_FILTER_TABLE).split(" ")
+        sequence = [
+            vectorizer.vocabulary.get(word, vectorizer.oov_index)
+            for word in words
+            if word
+        ]
+        padded = np.full((1, vectorizer.max_length), 0, dtype=np.int32)
+        truncated = np.asarray(sequence[: vectorizer.max_length], dtype=np.int32)
+        padded[0, : len(truncated)] = truncated
+        rows.append(padded)
+    return np.concatenate(rows, axis=0)
+
+
+def measure(fn, repeat):
+    fn()  # warm-up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vocab-size", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    vocabulary, texts = make_corpus(args.vocab_size, max(BATCH_SIZES))
+    vectorizer = TextVectorizer(vocabulary, SEQUENCE_LENGTH)
+
+    # Kedua cara harus menghasilkan array yang identik
+    assert np.array_equal(
+        preprocess_per_text(vectorizer, texts), vectorizer.transform(texts)
+    )
+
+    for batch_size in BATCH_SIZES:
+        batch = texts[:batch_size]
+        per_text_s = measure(
+            lambda: preprocess_per_text(vectorizer, batch), args.repeat
+        )
+        vectorized_s = measure(lambda: vectorizer.transform(batch), args.repeat)
+        print(
+            json.dumps(
+                {
+                    "batch_size": batch_size,
+                    "per_text_ms": round(per_text_s * 1000.0, 3),
+                    "vectorized_ms": round(vectorized_s * 1000.0, 3),
+                    "per_text_texts_per_s": round(batch_size / per_text_s),
+                    "vectorized_texts_per_s": round(batch_size / vectorized_s),
+                    "speedup": round(per_text_s / vectorized_s, 2),
+                }
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
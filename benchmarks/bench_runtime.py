@@ -0,0 +1,83 @@
+# benchmarks/bench_runtime.py
+"""
+Benchmark latensi predict dan peak RSS: backend Keras (TensorFlow) vs runtime
+NumPy (bundle .npz). Setiap backend dijalankan di proses baru.
+
+Jalankan dari root proyek:
+    python benchmarks/bench_runtime.py [--iterations 200]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from _common import PROJECT_ROOT, SEQUENCE_LENGTH, build_synthetic_model
+
+CHILD_SCRIPT = """
+import json, sys, time
+import numpy as np
+from benchmarks._common import max_rss_mb, VOCAB_SIZE, SEQUENCE_LENGTH
+
+backend, path, iterations = sys.argv[1], sys.argv[2], int(sys.argv[3])
+started = time.perf_counter()
+if backend == "numpy":
+    from app.ml_runtime import NumpyModel
+    model = NumpyModel.load(path)
+else:
+    from tensorflow import keras
+    model = keras.models.load_model(path)
+load_s = time.perf_counter() - started
+
+rng = np.random.default_rng(0)
+result = {"backend": backend, "load_s": round(load_s, 3)}
+for batch_size in (1, 32):
+    batch = rng.integers(1, VOCAB_SIZE, size=(batch_size, SEQUENCE_LENGTH)).astype("int32")
+    model.predict(batch, verbose=0)  # warm-up
+    timings = []
+    for _ in range(iterations):
+        t = time.perf_counter()
+        model.predict(batch, verbose=0)
+        timings.append((time.perf_counter() - t) * 1000.0)
+    timings.sort()
+    result[f"batch{batch_size}_p50_ms"] = round(timings[len(timings) // 2], 3)
+    result[f"batch{batch_size}_p99_ms"] = round(timings[int(len(timings) * 0.99) - 1], 3)
+result["max_rss_mb"] = round(max_rss_mb(), 1)
+print(json.dumps(result))
+"""
+
+
+def run_backend(backend, path, iterations):
+    env = dict(os.environ, TF_CPP_MIN_LOG_LEVEL="3")
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, backend, path, str(iterations)],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return output.strip().splitlines()[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        model_path = build_synthetic_model(os.path.join(tmpdir, "model_ml.h5"))
+        bundle_path = os.path.join(tmpdir, "model_ml.npz")
+
+        from tensorflow import keras
+        from app.ml_runtime import export_numpy_bundle
+
+        export_numpy_bundle(keras.models.load_model(model_path), bundle_path)
+
+        print(run_backend("keras", model_path, args.iterations))
+        print(run_backend("numpy", bundle_path, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# benchmarks/bench_serializers.py
+"""
+Benchmark throughput serialisasi daftar konten (default 10k baris, masing-masing
+dengan 2 kategori): pola lama (dict ditulis tangan per baris + json stdlib
+seperti provider bawaan Flask) vs skema app.core.utils (jalur interpretasi dan
+jalur terkompilasi) dengan json stdlib maupun orjson (OrjsonProvider).
+
+Objek Content dibuat di memori (tanpa database) agar yang terukur hanya biaya
+serialisasi, termasuk akses atribut ter-instrumentasi SQLAlchemy.
+
+Jalankan dari root proyek:
+    python benchmarks/bench_serializers.py [--rows 10000] [--repeat 10]
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import _common  # noqa: F401  (menambahkan root proyek ke sys.path)
+from app.auth.models import User  # noqa: F401  (relasi Content.author)
+from app.categories.models import Category
+from app.contents.models import Content, ContentCategory
+from app.core.utils import CONTENT, Serializer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def make_contents(rows):
+    categories = [
+        Category(id=f"kategori-{i}", name=f"Kategori {i}") for i in range(20)
+    ]
+    started = datetime(2024, 1, 1)
+    contents = []
+    for i in range(rows):
+        content = Content(
+            id=f"00000000-0000-4000-8000-{i:012d}",
+            title=f"Konten nomor {i}",
+            content_type="text",
+            data_url=f"https://example.com/konten/{i}",
+            metadata_tags={"tags": ["berita", f"topik{i % 50}"], "year": 2024},
+            user_id="00000000-0000-4000-8000-000000000001",
+            created_at=started + timedelta(seconds=i),
+            updated_at=started + timedelta(seconds=i, milliseconds=500),
+        )
+        content.categories_assoc = [
+            ContentCategory(category=categories[(i + offset) % len(categories)])
+            for offset in range(2)
+        ]
+        contents.append(content)
+    return contents
+
+
+def serialize_by_hand(content_item):
+    """Baseline: dict yang dulu ditulis tangan di app/contents/routes.py."""
+    return {
+        "id": str(content_item.id),
+        "title": content_item.title,
+        "content_type": content_item.content_type,
+        "data_url": content_item.data_url,
+        "metadata_tags": content_item.metadata_tags,
+        "user_id": str(content_item.user_id),
+        "created_at": content_item.created_at.isoformat() + "Z",
+        "updated_at": content_item.updated_at.isoformat() + "Z",
+        "categories": [
+            {"id": str(assoc.category.id), "name": assoc.category.name}
+            for assoc in content_item.categories_assoc
+        ],
+    }
+
+
+def stdlib_dumps(payload):
+    # Opsi yang sama dengan DefaultJSONProvider Flask di mode non-debug
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"))
+
+
+def orjson_dumps(payload):
+    options = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+    return orjson.dumps(payload, option=options)
+
+
+def measure(fn, repeat):
+    fn()  # warm-up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    contents = make_contents(args.rows)
+    interpreted = Serializer(*CONTENT.fields, compiled=False)
+
+    # Semua varian harus menghasilkan JSON yang setara
+    expected = [serialize_by_hand(content) for content in contents]
+    assert CONTENT.many(contents) == expected
+    assert interpreted.many(contents) == expected
+
+    variants = {
+        "hand_dict+stdlib": lambda: stdlib_dumps(
+            {"items": [serialize_by_hand(content) for content in contents]}
+        ),
+        "schema_interpreted+stdlib": lambda: stdlib_dumps(
+            {"items": interpreted.many(contents)}
+        ),
+        "schema_compiled+stdlib": lambda: stdlib_dumps(
+            {"items": CONTENT.many(contents)}
+        ),
+        # Bagian objek -> dict saja, tanpa encoding JSON
+        "hand_dict_only": lambda: [serialize_by_hand(content) for content in contents],
+        "schema_compiled_only": lambda: CONTENT.many(contents),
+    }
+    if orjson is not None:
+        variants["schema_compiled+orjson"] = lambda: orjson_dumps(
+            {"items": CONTENT.many(contents)}
+        )
+
+    baseline_s = None
+    for name, fn in variants.items():
+        seconds = measure(fn, args.repeat)
+        if baseline_s is None:
+            baseline_s = seconds
+        print(
+            json.dumps(
+                {
+                    "variant": name,
+                    "rows": args.rows,
+                    "ms": round(seconds * 1000.0, 2),
+                    "rows_per_s": round(args.rows / seconds),
+                    "speedup_vs_hand_dict_stdlib": round(baseline_s / seconds, 2),
+                }
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/bench_startup.py
+"""
+Benchmark waktu import + create_app() dan peak RSS untuk mode pemuatan model
+ML_MODEL_LOADING=lazy vs eager. Setiap mode dijalankan di proses baru agar
+biaya import TensorFlow terukur apa adanya.
+
+Jalankan dari root proyek:
+    python benchmarks/bench_startup.py [--repeat 3]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from _common import PROJECT_ROOT, build_synthetic_model
+
+CHILD_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+app = create_app("testing")
+elapsed = time.perf_counter() - started
+from benchmarks._common import max_rss_mb
+print(json.dumps({
+    "startup_s": elapsed,
+    "max_rss_mb": max_rss_mb(),
+    "tensorflow_imported": "tensorflow" in sys.modules,
+}))
+"""
+
+
+def run_mode(mode, model_path, repeat):
+    env = dict(os.environ, ML_MODEL_LOADING=mode, ML_MODEL_PATH=model_path)
+    env["TF_CPP_MIN_LOG_LEVEL"] = "3"
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD_SCRIPT],
+            cwd=PROJECT_ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "mode": mode,
+        "startup_s_median": round(statistics.median(r["startup_s"] for r in runs), 3),
+        "max_rss_mb_median": round(statistics.median(r["max_rss_mb"] for r in runs), 1),
+        "tensorflow_imported": runs[0]["tensorflow_imported"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        model_path = build_synthetic_model(os.path.join(tmpdir, "model_ml.h5"))
+        for mode in ("lazy", "eager"):
+            print(json.dumps(run_mode(mode, model_path, args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Map contents to stable FTS5 rowids
+
+Revision ID: b4e8c1f7a9d3
+Revises: f1a6d3b8c2e5
+Create Date: 2026-10-18 19:12:40.218734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4e8c1f7a9d3'
+down_revision = 'f1a6d3b8c2e5'
+branch_labels = None
+depends_on = None
+
+
+# Hanya SQLite/FTS5: content_id di tabel FTS5 tidak ter-index, jadi aplikasi
+# menghapus dan menulis ulang dokumen lewat rowid yang dipetakan di tabel ini.
+# PostgreSQL sudah memakai content_id sebagai primary key index.
+
+
+def _sqlite_supports_fts5(bind):
+    return bool(
+        bind.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar()
+    )
+
+
+def _uses_fts5(bind):
+    return bind.dialect.name == 'sqlite' and _sqlite_supports_fts5(bind)
+
+
+def upgrade():
+    bind = op.get_bind()
+    if not _uses_fts5(bind):
+        return
+    op.execute(
+        "CREATE TABLE content_search_index_docs ("
+        "doc_id INTEGER PRIMARY KEY, content_id VARCHAR(36) NOT NULL UNIQUE)"
+    )
+    # Dokumen yang sudah ada tetap di rowid-nya sekarang
+    op.execute(
+        "INSERT INTO content_search_index_docs (doc_id, content_id) "
+        "SELECT rowid, content_id FROM content_search_index"
+    )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if _uses_fts5(bind):
+        op.execute("DROP TABLE IF EXISTS content_search_index_docs")
@@ -0,0 +1,74 @@
+"""Add full-text search index for contents
+
+Revision ID: d5e9a3c7f1b2
+Revises: c3d8f1a2b6e4
+Create Date: 2026-10-18 14:20:51.377102
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5e9a3c7f1b2'
+down_revision = 'c3d8f1a2b6e4'
+branch_labels = None
+depends_on = None
+
+
+# Isi awal index dibangun dengan SQL: body = data_url konten "text" yang bukan URL,
+# tags = JSON mentah metadata_tags. Dokumen persis (hanya nilai tag berupa teks)
+# ditulis ulang oleh aplikasi setiap kali konten diubah.
+BODY_SQL = (
+    "CASE WHEN content_type = 'text' AND data_url NOT LIKE 'http://%' "
+    "AND data_url NOT LIKE 'https://%' AND data_url NOT LIKE '/%' "
+    "THEN data_url ELSE '' END"
+)
+
+
+def _sqlite_supports_fts5(bind):
+    return bool(
+        bind.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar()
+    )
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute(
+            "CREATE TABLE content_search_index ("
+            "content_id VARCHAR(36) PRIMARY KEY "
+            "REFERENCES contents (id) ON DELETE CASCADE, "
+            "document TSVECTOR NOT NULL)"
+        )
+        op.execute(
+            "CREATE INDEX ix_content_search_index_document "
+            "ON content_search_index USING GIN (document)"
+        )
+        op.execute(
+            "INSERT INTO content_search_index (content_id, document) "
+            "SELECT id, "
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(metadata_tags::text, '')), 'B') || "
+            f"setweight(to_tsvector('simple', coalesce({BODY_SQL}, '')), 'C') "
+            "FROM contents"
+        )
+    elif bind.dialect.name == 'sqlite' and _sqlite_supports_fts5(bind):
+        op.execute(
+            "CREATE VIRTUAL TABLE content_search_index USING fts5("
+            "content_id UNINDEXED, title, body, tags, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "INSERT INTO content_search_index (content_id, title, body, tags) "
+            f"SELECT id, coalesce(title, ''), coalesce({BODY_SQL}, ''), "
+            "coalesce(metadata_tags, '') FROM contents"
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql' or (
+        bind.dialect.name == 'sqlite' and _sqlite_supports_fts5(bind)
+    ):
+        op.execute("DROP TABLE IF EXISTS content_search_index")
@@ -0,0 +1,79 @@
+# tests/conftest.py
+from contextlib import contextmanager
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from app import create_app
+from app.auth.models import User
+from app.extensions import db as _db
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    with app.app_context():
+        _db.create_all()
+        yield app
+        _db.session.remove()
+        _db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def user(app):
+    user = User(username="tester", email="tester@example.com", password_hash="x")
+    _db.session.add(user)
+    _db.session.commit()
+    return user
+
+
+@pytest.fixture
+def auth_headers(user):
+    return {"Authorization": f"Bearer {create_access_token(identity=user.id)}"}
+
+
+class QueryCounter:
+    """Daftar statement SQL yang dieksekusi selama blok `with count_queries()`."""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def __repr__(self):
+        return f"<QueryCounter {self.count} query>\n" + "\n".join(self.statements)
+
+
+@pytest.fixture
+def count_queries(app):
+    """
+    Hitung statement SQL per request agar regresi N+1 gagal di CI:
+
+        with count_queries() as queries:
+            client.get("/contents")
+        assert queries.count <= 2, queries
+    """
+
+    @contextmanager
+    def _count():
+        counter = QueryCounter()
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            counter.statements.append(statement)
+
+        engine = _db.engine
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield counter
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    return _count
@@ -0,0 +1,78 @@
+# tests/integration/test_analytics_routes.py
+import numpy as np
+import pytest
+
+from app import ml_services
+from app.analytics import services as analytics_services
+from app.contents.models import Content
+from app.extensions import db
+from app.ml_embeddings import EmbeddingIndex
+
+
+@pytest.fixture
+def embedded_contents(app, user, tmp_path, monkeypatch):
+    """Tiga konten di index embedding sementara (versi model v1)."""
+    contents = [
+        Content(title=title, content_type="text", user_id=user.id)
+        for title in ("Resep nasi goreng", "Resep mie goreng", "Jadwal kereta")
+    ]
+    db.session.add_all(contents)
+    db.session.commit()
+    vectors = np.array([[1.0, 0.1, 0.0], [0.9, 0.2, 0.0], [0.0, 0.0, 1.0]])
+    index = EmbeddingIndex(str(tmp_path / "embeddings"))
+    index.upsert([content.id for content in contents], vectors, model_version="v1")
+
+    app.config["ML_EMBEDDING_INDEX_ENABLED"] = True
+    monkeypatch.setattr(analytics_services, "_embedding_index", index)
+    return contents
+
+
+def _fake_embed(model_version):
+    return lambda texts: (np.array([[1.0, 0.0, 0.0]] * len(texts)), model_version)
+
+
+def test_analytics_routes_return_404_when_index_disabled(client):
+    assert client.get("/analytics/search?q=resep").status_code == 404
+    assert client.get("/analytics/contents/abc/similar").status_code == 404
+
+
+def test_search_ranks_contents_by_similarity(client, embedded_contents, monkeypatch):
+    monkeypatch.setattr(ml_services, "embed_texts", _fake_embed("v1"))
+
+    response = client.get("/analytics/search?q=resep&k=2")
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [r["content_id"] for r in body["results"]] == [
+        embedded_contents[0].id,
+        embedded_contents[1].id,
+    ]
+    assert body["results"][0]["title"] == "Resep nasi goreng"
+
+
+def test_search_rejects_index_built_with_other_model_version(
+    client, embedded_contents, monkeypatch
+):
+    monkeypatch.setattr(ml_services, "embed_texts", _fake_embed("v2"))
+
+    response = client.get("/analytics/search?q=resep")
+
+    assert response.status_code == 409
+    assert "v1" in response.get_json()["error"]
+
+
+def test_similar_contents_excludes_the_content_itself(client, embedded_contents):
+    content_id = embedded_contents[0].id
+
+    response = client.get(f"/analytics/contents/{content_id}/similar?k=5")
+
+    assert response.status_code == 200
+    result_ids = [r["content_id"] for r in response.get_json()["results"]]
+    assert content_id not in result_ids
+    assert result_ids == [embedded_contents[1].id, embedded_contents[2].id]
+
+
+def test_similar_contents_returns_404_for_unindexed_content(client, embedded_contents):
+    response = client.get("/analytics/contents/tidak-ada/similar")
+
+    assert response.status_code == 404
@@ -0,0 +1,49 @@
+# tests/integration/test_conditional_get.py
+from flask_jwt_extended import create_access_token
+
+from app.auth.models import User
+from app.extensions import db
+
+
+def test_categories_etag_short_circuits_until_a_write(
+    client, auth_headers, count_queries
+):
+    client.post("/categories", json={"name": "Musik"}, headers=auth_headers)
+    first = client.get("/categories")
+    etag = first.headers["ETag"]
+
+    with count_queries() as queries:
+        response = client.get("/categories", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    # Hanya lookup versi; tidak ada baris kategori yang dimuat
+    assert queries.count == 1, queries
+
+    # Representasi lain (query string berbeda) punya ETag berbeda
+    assert client.get("/categories?limit=1").headers["ETag"] != etag
+
+    client.post("/categories", json={"name": "Film"}, headers=auth_headers)
+    response = client.get("/categories", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert len(response.get_json()["items"]) == 2
+
+
+def test_targets_etag_is_per_user(client, auth_headers):
+    other = User(username="lain", email="lain@example.com", password_hash="x")
+    db.session.add(other)
+    db.session.commit()
+    other_token = create_access_token(identity=other.id)
+    other_headers = {"Authorization": f"Bearer {other_token}"}
+
+    etag = client.get("/targets", headers=auth_headers).headers["ETag"]
+    client.post("/targets", json={"name": "Target lain"}, headers=other_headers)
+
+    # Penulisan user lain tidak mengubah ETag daftar target user ini
+    response = client.get("/targets", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+    client.post("/targets", json={"name": "Target saya"}, headers=auth_headers)
+    response = client.get("/targets", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert [item["name"] for item in response.get_json()["items"]] == ["Target saya"]
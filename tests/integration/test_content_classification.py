@@ -0,0 +1,125 @@
+# tests/integration/test_content_classification.py
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.categories.models import Category
+from app.contents.models import Content, ContentCategory, ContentClassification
+from app.contents.services import (
+    _claim_jobs,
+    _reset_stale_jobs,
+    enqueue_content_classification,
+    store_classification_results,
+)
+from app.extensions import db
+
+
+def _result(label):
+    return {
+        "model_version": "v1",
+        "predicted_category": label,
+        "confidence": 0.9,
+        "top_k": [{"label": label, "score": 0.9}],
+    }
+
+
+@pytest.fixture
+def queued_contents(app, user):
+    app.config["ML_AUTO_CLASSIFY_ENABLED"] = True
+    db.session.add(Category(name="Kuliner"))
+    contents = [
+        Content(title=f"Resep {i}", content_type="text", user_id=user.id)
+        for i in range(2)
+    ]
+    for content in contents:
+        enqueue_content_classification(content)
+    db.session.add_all(contents)
+    db.session.commit()
+    return [content.id for content in contents]
+
+
+def _job(content_id):
+    db.session.expire_all()
+    return db.session.get(ContentClassification, content_id)
+
+
+def _auto_category_count(content_id):
+    return ContentCategory.query.filter_by(content_id=content_id, source="auto").count()
+
+
+def test_results_for_requeued_job_are_discarded(queued_contents):
+    edited_id, other_id = queued_contents
+    assert sorted(_claim_jobs(10, "worker-a")) == sorted(queued_contents)
+    # Job yang sedang diproses tidak bisa diambil worker lain
+    assert _claim_jobs(10, "worker-b") == []
+
+    # Konten diubah saat worker A masih memprediksi: job diantrekan ulang
+    enqueue_content_classification(db.session.get(Content, edited_id))
+    db.session.commit()
+
+    store_classification_results(
+        [edited_id, other_id], [_result("kuliner"), _result("kuliner")], "worker-a"
+    )
+    db.session.commit()
+
+    edited = _job(edited_id)
+    assert (edited.status, edited.predicted_category) == ("pending", None)
+    assert _auto_category_count(edited_id) == 0
+    other = _job(other_id)
+    assert (other.status, other.predicted_category, other.claim_token) == (
+        "done",
+        "kuliner",
+        None,
+    )
+    assert _auto_category_count(other_id) == 1
+
+    assert _claim_jobs(10, "worker-b") == [edited_id]
+
+
+def test_stale_claim_cannot_overwrite_reclaimed_job(app, queued_contents):
+    assert len(_claim_jobs(10, "worker-a")) == 2
+    # Worker A dianggap mati: job dikembalikan ke antrean dan diambil worker B
+    now = datetime.now(timezone.utc)
+    stale_seconds = app.config["ML_AUTO_CLASSIFY_STALE_SECONDS"]
+    _reset_stale_jobs(now + timedelta(seconds=stale_seconds + 1))
+    db.session.commit()
+    assert len(_claim_jobs(10, "worker-b")) == 2
+
+    store_classification_results(
+        queued_contents, [_result("kuliner"), _result("kuliner")], "worker-a"
+    )
+    db.session.commit()
+    for content_id in queued_contents:
+        job = _job(content_id)
+        assert (job.status, job.claim_token, job.attempts) == (
+            "processing",
+            "worker-b",
+            2,
+        )
+        assert _auto_category_count(content_id) == 0
+
+    store_classification_results(
+        queued_contents, [_result("kuliner"), {"error": "gagal"}], "worker-b"
+    )
+    db.session.commit()
+    assert [_job(content_id).status for content_id in queued_contents] == [
+        "done",
+        "failed",
+    ]
+
+
+def test_stale_jobs_fail_after_max_attempts(app, queued_contents):
+    app.config["ML_AUTO_CLASSIFY_MAX_ATTEMPTS"] = 2
+    stale_after = timedelta(seconds=app.config["ML_AUTO_CLASSIFY_STALE_SECONDS"] + 1)
+
+    for attempt in (1, 2):
+        # Worker mati di tengah setiap percobaan
+        assert len(_claim_jobs(10, f"worker-{attempt}")) == 2
+        _reset_stale_jobs(datetime.now(timezone.utc) + stale_after)
+        db.session.commit()
+
+    for content_id in queued_contents:
+        job = _job(content_id)
+        assert (job.status, job.attempts, job.claim_token) == ("failed", 2, None)
+        assert "2 kali" in job.error
+    assert _claim_jobs(10, "worker-3") == []
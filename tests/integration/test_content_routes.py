@@ -0,0 +1,385 @@
+# tests/integration/test_content_routes.py
+import json
+
+import pytest
+from sqlalchemy import text
+
+from app.categories.models import Category
+from app.contents.models import (
+    CONTENT_SEARCH_DOCS_TABLE,
+    CONTENT_SEARCH_TABLE,
+    Content,
+    ContentCategory,
+)
+from app.contents.search import search_backend
+from app.extensions import db
+
+
+@pytest.fixture
+def categories(app):
+    items = [Category(name=f"Kategori {i}") for i in range(3)]
+    db.session.add_all(items)
+    db.session.commit()
+    return items
+
+
+def _create_contents(user, categories, count):
+    contents = []
+    for i in range(count):
+        content = Content(title=f"Konten {i}", content_type="text", user_id=user.id)
+        content.categories_assoc = [
+            ContentCategory(category=category) for category in categories[:2]
+        ]
+        contents.append(content)
+    db.session.add_all(contents)
+    db.session.commit()
+    return [content.id for content in contents]
+
+
+@pytest.mark.parametrize("num_contents", [1, 5, 20])
+def test_list_contents_uses_fixed_number_of_queries(
+    client, user, categories, count_queries, num_contents
+):
+    _create_contents(user, categories, num_contents)
+
+    with count_queries() as queries:
+        response = client.get("/contents")
+
+    assert response.status_code == 200
+    items = response.get_json()["items"]
+    assert len(items) == num_contents
+    assert all(len(item["categories"]) == 2 for item in items)
+    # Konten + (asosiasi JOIN kategori), berapa pun jumlah kontennya
+    assert queries.count == 2, queries
+
+
+def test_list_contents_filtered_by_category(client, user, categories, count_queries):
+    _create_contents(user, categories, 5)
+    url = f"/contents?category_id={categories[0].id}"
+
+    with count_queries() as queries:
+        response = client.get(url)
+
+    assert response.status_code == 200
+    assert len(response.get_json()["items"]) == 5
+    assert queries.count == 2, queries
+
+
+def test_get_content_loads_categories_in_one_query(
+    app, client, user, categories, count_queries
+):
+    content_id = _create_contents(user, categories, 1)[0]
+    # Hanya query pemuatan data yang dihitung, tanpa lookup versi cache respons
+    app.extensions["response_cache"] = None
+
+    with count_queries() as queries:
+        response = client.get(f"/contents/{content_id}")
+
+    assert response.status_code == 200
+    assert {c["name"] for c in response.get_json()["categories"]} == {
+        "Kategori 0",
+        "Kategori 1",
+    }
+    assert queries.count == 1, queries
+
+
+def test_update_content_categories_without_per_category_queries(
+    client, user, categories, auth_headers, count_queries
+):
+    content_id = _create_contents(user, categories, 1)[0]
+    new_ids = [category.id for category in categories]
+
+    with count_queries() as queries:
+        response = client.put(
+            f"/contents/{content_id}/metadata",
+            json={"category_ids": new_ids},
+            headers=auth_headers,
+        )
+
+    assert response.status_code == 200
+    assert sorted(c["id"] for c in response.get_json()["content"]["categories"]) == sorted(
+        new_ids
+    )
+    # Muat konten (JOIN kategori), validasi kategori (IN), INSERT asosiasi baru
+    # (executemany), lalu muat ulang untuk respons; tidak bergantung jumlah kategori
+    assert queries.count <= 5, queries
+
+
+def test_update_content_rejects_unknown_category(
+    client, user, categories, auth_headers
+):
+    content_id = _create_contents(user, categories, 1)[0]
+
+    response = client.put(
+        f"/contents/{content_id}/metadata",
+        json={"category_ids": [categories[0].id, "tidak-ada"]},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 404
+    assert db.session.query(ContentCategory).filter_by(content_id=content_id).count() == 2
+
+
+def test_list_contents_cursor_pagination_walks_every_row_once(
+    client, user, categories
+):
+    content_ids = _create_contents(user, categories, 7)
+    # Beberapa konten dengan created_at sama: id memutus seri agar urutan stabil
+    same_time = db.session.get(Content, content_ids[0]).created_at
+    for content_id in content_ids[:4]:
+        db.session.get(Content, content_id).created_at = same_time
+    db.session.commit()
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        url = "/contents?limit=3" + (f"&cursor={cursor}" if cursor else "")
+        body = client.get(url).get_json()
+        assert body["limit"] == 3
+        seen.extend(item["id"] for item in body["items"])
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert sorted(seen) == sorted(content_ids)
+
+
+def test_list_contents_rejects_invalid_pagination(client):
+    assert client.get("/contents?cursor=bukan-cursor").status_code == 400
+    assert client.get("/contents?limit=0").status_code == 400
+
+
+def test_list_contents_streams_ndjson(app, client, user, categories, count_queries):
+    app.config["STREAM_CHUNK_SIZE"] = 4
+    content_ids = _create_contents(user, categories, 10)
+
+    with count_queries() as queries:
+        response = client.get(
+            "/contents", headers={"Accept": "application/x-ndjson"}
+        )
+        lines = response.get_data(as_text=True).splitlines()
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    items = [json.loads(line) for line in lines]
+    assert sorted(item["id"] for item in items) == sorted(content_ids)
+    assert all(len(item["categories"]) == 2 for item in items)
+    # Satu query konten + satu selectinload kategori per batch yield_per (3 batch)
+    assert queries.count <= 4, queries
+
+
+def test_list_contents_streams_json_array_matching_pages(client, user, categories):
+    _create_contents(user, categories, 5)
+
+    streamed = client.get("/contents?stream=json&limit=2")
+    paged = client.get("/contents?limit=5").get_json()
+
+    assert streamed.mimetype == "application/json"
+    assert streamed.get_json() == paged["items"]
+    assert client.get("/contents?stream=json&cursor=x").status_code == 400
+
+
+def test_bulk_create_contents_reports_per_item_errors(
+    client, auth_headers, categories, count_queries
+):
+    payload = {
+        "contents": [
+            {
+                "title": f"Impor {i}",
+                "content_type": "text",
+                "category_ids": [categories[i % 3].id],
+            }
+            for i in range(50)
+        ]
+        + [
+            {"title": "Tanpa tipe"},
+            {"title": "Kategori salah", "content_type": "text", "category_ids": ["x"]},
+            {"title": {"a": 1}, "content_type": "text"},
+            {"title": "x" * 256, "content_type": "text"},
+            {"title": "URL angka", "content_type": "text", "data_url": 5},
+            {"title": "ID objek", "content_type": "text", "category_ids": [{"a": 1}]},
+        ]
+    }
+
+    with count_queries() as queries:
+        response = client.post("/contents/bulk", json=payload, headers=auth_headers)
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert len(body["created"]) == 50
+    errors = {error["index"]: error["msg"] for error in body["errors"]}
+    assert sorted(errors) == [50, 51, 52, 53, 54, 55]
+    assert errors[52] == "title harus berupa teks"
+    assert errors[53] == "title maksimal 255 karakter"
+    assert errors[55] == "Setiap category_id harus berupa teks"
+    assert db.session.query(Content).count() == 50
+    assert db.session.query(ContentCategory).count() == 50
+    # Validasi kategori (IN) + insert konten, asosiasi, dan index pencarian,
+    # berapa pun jumlahnya
+    assert queries.count <= 5, queries
+
+
+def test_bulk_create_contents_rejects_empty_payload(client, auth_headers):
+    response = client.post("/contents/bulk", json={"contents": []}, headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_search_contents_ranks_matches_and_follows_writes(client, auth_headers):
+    def create(title, **fields):
+        response = client.post(
+            "/contents",
+            json={"title": title, "content_type": "text", **fields},
+            headers=auth_headers,
+        )
+        return response.get_json()["content"]["id"]
+
+    title_match = create("Resep rendang padang")
+    tag_match = create("Masakan minggu ini", metadata_tags={"tags": ["rendang"]})
+    other = create("Jadwal kereta")
+
+    items = client.get("/contents/search?q=rendang").get_json()["items"]
+    assert {item["id"] for item in items} == {title_match, tag_match}
+    if items[0]["score"] is not None:
+        # Index full-text: kecocokan di judul lebih relevan daripada di tag
+        assert items[0]["id"] == title_match
+
+    client.put(
+        f"/contents/{other}/metadata", json={"title": "Rendang kereta"}, headers=auth_headers
+    )
+    client.delete(f"/contents/{title_match}", headers=auth_headers)
+    items = client.get("/contents/search?q=rendang").get_json()["items"]
+    assert {item["id"] for item in items} == {tag_match, other}
+
+    assert client.get("/contents/search?q=").status_code == 400
+
+
+def test_search_index_rewrites_documents_by_rowid(client, auth_headers):
+    if search_backend() != "fts5":
+        pytest.skip("Index FTS5 SQLite tidak tersedia")
+
+    content_id = client.post(
+        "/contents",
+        json={"title": "Soto betawi", "content_type": "text"},
+        headers=auth_headers,
+    ).get_json()["content"]["id"]
+
+    def rowid():
+        return db.session.execute(
+            text(f"SELECT rowid FROM {CONTENT_SEARCH_TABLE} WHERE content_id = :id"),
+            {"id": content_id},
+        ).scalar_one()
+
+    first = rowid()
+    client.put(
+        f"/contents/{content_id}/metadata", json={"title": "Soto ayam"}, headers=auth_headers
+    )
+    assert rowid() == first
+
+    # Hapus dokumen: lookup rowid dari tabel pemetaan, bukan pemindaian FTS5
+    plan = " ".join(
+        row[-1]
+        for row in db.session.execute(
+            text(
+                f"EXPLAIN QUERY PLAN DELETE FROM {CONTENT_SEARCH_TABLE} WHERE rowid IN "
+                f"(SELECT doc_id FROM {CONTENT_SEARCH_DOCS_TABLE} "
+                "WHERE content_id IN ('a', 'b'))"
+            )
+        )
+    )
+    assert "VIRTUAL TABLE INDEX 0:=" in plan, plan
+    assert f"SEARCH {CONTENT_SEARCH_DOCS_TABLE}" in plan, plan
+
+    client.delete(f"/contents/{content_id}", headers=auth_headers)
+    assert not db.session.execute(
+        text(f"SELECT count(*) FROM {CONTENT_SEARCH_DOCS_TABLE}")
+    ).scalar()
+
+
+def test_list_contents_filters_by_tags(client, auth_headers):
+    def create(title, metadata_tags):
+        response = client.post(
+            "/contents",
+            json={"title": title, "content_type": "text", "metadata_tags": metadata_tags},
+            headers=auth_headers,
+        )
+        return response.get_json()["content"]["id"]
+
+    drama = create("A", {"genre": ["Drama", "Aksi"], "year": 2024})
+    action = create("B", {"genre": "aksi", "year": 2023})
+    untagged = create("C", ["komedi"])
+
+    def ids(query_string):
+        response = client.get(f"/contents?{query_string}")
+        assert response.status_code == 200
+        return {item["id"] for item in response.get_json()["items"]}
+
+    assert ids("tags_any=drama,komedi") == {drama, untagged}
+    assert ids("tags_all=aksi,drama") == {drama}
+    assert ids("tag=year:2023") == {action}
+    assert ids("tags_any=aksi&tag=year:2024") == {drama}
+
+    client.put(
+        f"/contents/{action}/metadata",
+        json={"metadata_tags": {"genre": "drama"}},
+        headers=auth_headers,
+    )
+    assert ids("tags_any=drama") == {drama, action}
+    assert ids("tag=year:2023") == set()
+    assert client.get("/contents?tag=tanpa-key").status_code == 400
+
+
+def test_content_detail_cache_invalidated_by_writes(
+    client, auth_headers, user, categories, count_queries
+):
+    content_id = _create_contents(user, categories, 1)[0]
+    url = f"/contents/{content_id}"
+
+    assert client.get(url).headers["X-Cache"] == "MISS"
+    with count_queries() as queries:
+        response = client.get(url)
+    assert response.headers["X-Cache"] == "HIT"
+    # Hanya lookup versi tag (dibagi antar proses lewat resource_versions)
+    assert queries.count == 1, queries
+    assert "resource_versions" in queries.statements[0]
+
+    # Mengganti nama kategori membuat detail konten yang memuatnya basi
+    client.put(
+        f"/categories/{categories[0].id}",
+        json={"name": "Nama Baru"},
+        headers=auth_headers,
+    )
+    response = client.get(url)
+    assert response.headers["X-Cache"] == "MISS"
+    names = {category["name"] for category in response.get_json()["categories"]}
+    assert "Nama Baru" in names
+
+    client.put(
+        f"/contents/{content_id}/metadata", json={"title": "Judul"}, headers=auth_headers
+    )
+    assert client.get(url).get_json()["title"] == "Judul"
+
+    client.delete(url, headers=auth_headers)
+    assert client.get(url).status_code == 404
+
+
+def test_delete_content_succeeds_when_embedding_index_fails(
+    app, client, auth_headers, monkeypatch
+):
+    from app.analytics import services as analytics_services
+
+    def broken_index():
+        raise OSError("index embedding terkunci")
+
+    app.config["ML_EMBEDDING_INDEX_ENABLED"] = True
+    monkeypatch.setattr(analytics_services, "get_embedding_index", broken_index)
+    content_id = client.post(
+        "/contents",
+        json={"title": "Akan dihapus", "content_type": "text"},
+        headers=auth_headers,
+    ).get_json()["content"]["id"]
+
+    response = client.delete(f"/contents/{content_id}", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert db.session.get(Content, content_id) is None
@@ -0,0 +1,158 @@
+# tests/integration/test_fieldsets.py
+import json
+
+from app.categories.models import Category
+from app.contents.models import Content, ContentCategory
+from app.extensions import db
+from app.files.models import File
+
+
+def _create_contents(user, count, category=None):
+    contents = []
+    for i in range(count):
+        content = Content(
+            title=f"Konten {i}",
+            content_type="text",
+            data_url=f"https://example.com/{i}",
+            user_id=user.id,
+        )
+        if category is not None:
+            content.categories_assoc = [ContentCategory(category=category)]
+        contents.append(content)
+    db.session.add_all(contents)
+    db.session.commit()
+    return contents
+
+
+def _attach_file(content, user, name):
+    db.session.add(
+        File(
+            file_name=name,
+            original_file_name=name,
+            file_type="image/png",
+            file_size_bytes=10,
+            storage_path=f"/tmp/{name}",
+            user_id=user.id,
+            content_id=content.id,
+        )
+    )
+
+
+def test_list_contents_fields_selects_only_requested_columns(
+    client, user, count_queries
+):
+    _create_contents(user, 3, Category(name="Berita"))
+
+    with count_queries() as queries:
+        response = client.get("/contents?fields=title")
+
+    assert response.status_code == 200
+    items = response.get_json()["items"]
+    assert all(set(item) == {"id", "title"} for item in items)
+    # Kategori tidak diminta: tidak ada selectinload, kolom besar tidak di-SELECT
+    assert queries.count == 1, queries
+    assert "data_url" not in queries.statements[0]
+    assert "metadata_tags" not in queries.statements[0]
+
+
+def test_expand_files_loads_all_contents_in_one_query(
+    client, user, auth_headers, count_queries
+):
+    contents = _create_contents(user, 5)
+    _attach_file(contents[0], user, "a.png")
+    _attach_file(contents[0], user, "b.png")
+    _attach_file(contents[3], user, "c.png")
+    db.session.commit()
+
+    with count_queries() as queries:
+        response = client.get("/contents?expand=files")
+
+    items = {item["id"]: item for item in response.get_json()["items"]}
+    assert len(items[contents[0].id]["files"]) == 2
+    assert [f["original_file_name"] for f in items[contents[3].id]["files"]] == [
+        "c.png"
+    ]
+    assert items[contents[1].id]["files"] == []
+    assert "categories" in items[contents[1].id]
+    # Konten + kategori (selectinload) + file (satu query IN), berapa pun jumlahnya
+    assert queries.count == 3, queries
+
+    detail = client.get(f"/contents/{contents[0].id}?fields=id&expand=files")
+    assert set(detail.get_json()) == {"id", "files"}
+
+    streamed = client.get("/contents?stream=ndjson&fields=title&expand=files")
+    lines = [json.loads(line) for line in streamed.get_data(as_text=True).splitlines()]
+    assert all(set(line) == {"id", "title", "files"} for line in lines)
+
+    file_id = items[contents[3].id]["files"][0]["id"]
+    info = client.get(
+        f"/files/{file_id}/info?fields=file_type&expand=content", headers=auth_headers
+    ).get_json()
+    assert info["file_type"] == "image/png"
+    assert info["content"]["title"] == contents[3].title
+    assert set(info) == {"id", "file_type", "content"}
+
+
+def test_unknown_fields_or_relations_are_rejected(client, auth_headers):
+    assert client.get("/contents?fields=password").status_code == 400
+    assert client.get("/contents?expand=author").status_code == 400
+    assert client.get("/categories?expand=files").status_code == 400
+    assert client.get("/targets?fields=x", headers=auth_headers).status_code == 400
+
+
+def test_category_expand_children(client, auth_headers):
+    parent = client.post(
+        "/categories", json={"name": "Olahraga"}, headers=auth_headers
+    ).get_json()["category"]
+    for name in ("Tenis", "Bola"):
+        client.post(
+            "/categories",
+            json={"name": name, "parent_id": parent["id"]},
+            headers=auth_headers,
+        )
+
+    detail = client.get(f"/categories/{parent['id']}?expand=children").get_json()
+    assert [child["name"] for child in detail["children"]] == ["Bola", "Tenis"]
+
+    client.post(
+        "/categories",
+        json={"name": "Renang", "parent_id": parent["id"]},
+        headers=auth_headers,
+    )
+    # Detail yang di-cache ikut basi saat subkategori baru dibuat
+    detail = client.get(f"/categories/{parent['id']}?expand=children").get_json()
+    assert len(detail["children"]) == 3
+
+    items = client.get("/categories?fields=name&expand=children").get_json()["items"]
+    by_name = {item["name"]: item for item in items}
+    assert len(by_name["Olahraga"]["children"]) == 3
+    assert by_name["Tenis"]["children"] == []
+
+
+def test_target_expand_progress_updates_etag(client, auth_headers):
+    target = client.post(
+        "/targets", json={"name": "Baca buku"}, headers=auth_headers
+    ).get_json()["target"]
+    url = "/targets?fields=name&expand=progress"
+
+    first = client.get(url, headers=auth_headers)
+    assert first.get_json()["items"] == [
+        {"id": target["id"], "name": "Baca buku", "progress": []}
+    ]
+
+    client.post(
+        f"/targets/{target['id']}/progress",
+        json={"status": "mulai"},
+        headers=auth_headers,
+    )
+    response = client.get(
+        url, headers={**auth_headers, "If-None-Match": first.headers["ETag"]}
+    )
+    assert response.status_code == 200
+    progress = response.get_json()["items"][0]["progress"]
+    assert [entry["status"] for entry in progress] == ["mulai"]
+
+    entries = client.get(
+        f"/targets/{target['id']}/progress?fields=status", headers=auth_headers
+    ).get_json()["items"]
+    assert entries == [{"id": progress[0]["id"], "status": "mulai"}]
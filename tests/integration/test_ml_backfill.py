@@ -0,0 +1,110 @@
+# tests/integration/test_ml_backfill.py
+import json
+import types
+
+from app import ml_services
+from app.contents.models import Content, ContentClassification
+from app.extensions import db
+
+
+class _FlakyClassifier:
+    """classify_batch palsu yang gagal pada panggilan ke-fail_on (1-based)."""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.calls = []
+
+    def __call__(self, texts, top_k=None):
+        self.calls.append(list(texts))
+        if len(self.calls) == self.fail_on:
+            raise RuntimeError("Proses backfill terhenti")
+        return [
+            {
+                "model_version": "v1",
+                "predicted_category": "umum",
+                "confidence": 0.9,
+                "top_k": [{"label": "umum", "score": 0.9}],
+            }
+            for _ in texts
+        ]
+
+
+def _classified_ids():
+    db.session.expire_all()
+    return sorted(
+        db.session.scalars(
+            db.select(ContentClassification.content_id).where(
+                ContentClassification.status == "done"
+            )
+        )
+    )
+
+
+def test_backfill_resumes_from_checkpoint_after_interruption(
+    app, user, tmp_path, monkeypatch
+):
+    contents = [
+        Content(title=f"Konten {i}", content_type="text", user_id=user.id)
+        for i in range(7)
+    ]
+    db.session.add_all(contents)
+    db.session.commit()
+    content_ids = sorted(content.id for content in contents)
+
+    monkeypatch.setattr(ml_services, "_ensure_model_loaded", lambda: None)
+    monkeypatch.setattr(
+        ml_services, "get_active_model", lambda: types.SimpleNamespace(version="v1")
+    )
+    checkpoint_path = tmp_path / "backfill.json"
+    args = ["ml", "backfill", "--chunk-size", "2", "--checkpoint", str(checkpoint_path)]
+    runner = app.test_cli_runner()
+
+    # Run pertama terhenti di chunk ketiga: dua chunk pertama sudah di-commit
+    interrupted = _FlakyClassifier(fail_on=3)
+    monkeypatch.setattr(ml_services, "classify_batch", interrupted)
+    result = runner.invoke(args=args)
+    assert isinstance(result.exception, RuntimeError)
+    checkpoint = json.loads(checkpoint_path.read_text(encoding="utf-8"))
+    assert checkpoint["last_id"] == content_ids[3]
+    assert checkpoint["processed"] == 4
+    assert _classified_ids() == content_ids[:4]
+
+    # Run kedua melanjutkan setelah last_id tanpa mengulang chunk yang selesai
+    resumed = _FlakyClassifier()
+    monkeypatch.setattr(ml_services, "classify_batch", resumed)
+    result = runner.invoke(args=args)
+    assert result.exit_code == 0, result.output
+    assert "Melanjutkan dari checkpoint: 4 konten" in result.output
+    assert [len(texts) for texts in resumed.calls] == [2, 1]
+    assert _classified_ids() == content_ids
+    # Backfill selesai: checkpoint dihapus agar run berikutnya mulai dari awal
+    assert not checkpoint_path.exists()
+
+
+def test_backfill_gives_up_after_max_retries_while_overloaded(
+    app, user, tmp_path, monkeypatch
+):
+    from app import ml_cli
+
+    db.session.add(Content(title="Konten", content_type="text", user_id=user.id))
+    db.session.commit()
+    monkeypatch.setattr(ml_services, "_ensure_model_loaded", lambda: None)
+    monkeypatch.setattr(
+        ml_services, "get_active_model", lambda: types.SimpleNamespace(version="v1")
+    )
+
+    def overloaded(texts, top_k=None):
+        raise ml_services.InferenceOverloadedError("Slot penuh", retry_after=2)
+
+    sleeps = []
+    monkeypatch.setattr(ml_services, "classify_batch", overloaded)
+    monkeypatch.setattr(ml_cli.time, "sleep", sleeps.append)
+    checkpoint_path = tmp_path / "backfill.json"
+    args = ["ml", "backfill", "--checkpoint", str(checkpoint_path)]
+
+    result = app.test_cli_runner().invoke(args=args + ["--max-retries", "3"])
+
+    assert result.exit_code == 1
+    assert sleeps == [2, 4, 8]
+    assert result.output.count("mencoba lagi chunk yang sama") == 3
+    assert "setelah 3 percobaan ulang" in result.output
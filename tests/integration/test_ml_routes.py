@@ -0,0 +1,58 @@
+# tests/integration/test_ml_routes.py
+
+
+def test_predict_rejects_list_input_and_points_to_batch(client):
+    response = client.post("/ml/predict", json={"text_input": ["satu", "dua"]})
+
+    assert response.status_code == 400
+    assert "/ml/predict/batch" in response.get_json()["error"]
+
+
+def test_predict_rejects_non_string_input(client):
+    for text_input in (42, {"teks": "halo"}, True):
+        response = client.post("/ml/predict", json={"text_input": text_input})
+
+        assert response.status_code == 400
+        assert "string" in response.get_json()["error"]
+
+    response = client.post("/ml/predict/batch", json={"text_inputs": [7, ["a"]]})
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body["failed"] == 2
+    assert all("string" in result["error"] for result in body["results"])
+
+
+def test_activate_model_version_requires_ml_admin(app, client, user, auth_headers):
+    url = "/ml/models/v2/activate"
+
+    response = client.post(url, headers=auth_headers)
+    assert response.status_code == 403
+
+    app.config["ML_ADMIN_USER_IDS"] = [user.id]
+    response = client.post(url, headers=auth_headers)
+    # Lolos pemeriksaan admin; registry belum dikonfigurasi di pengujian
+    assert response.status_code == 400
+    assert "ML_MODEL_REGISTRY_DIR" in response.get_json()["error"]
+
+
+def test_predict_reports_failed_background_load_without_retry_after(
+    app, client, monkeypatch
+):
+    from app import ml_services
+
+    app.config["ML_MODEL_LOADING"] = "background"
+    monkeypatch.setitem(ml_services._model_load_status, "state", "failed")
+    monkeypatch.setitem(
+        ml_services._model_load_status, "error", "File model tidak ditemukan"
+    )
+
+    response = client.post("/ml/predict", json={"text_input": "halo"})
+
+    assert response.status_code == 503
+    assert "Retry-After" not in response.headers
+    assert response.get_json()["load_error"] == "File model tidak ditemukan"
+
+    monkeypatch.setitem(ml_services._model_load_status, "state", "loading")
+    response = client.post("/ml/predict", json={"text_input": "halo"})
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
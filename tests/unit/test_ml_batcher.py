@@ -0,0 +1,52 @@
+# tests/unit/test_ml_batcher.py
+import threading
+
+import numpy as np
+
+from app.ml_batcher import MicroBatcher
+
+
+class _RecordingModel:
+    def __init__(self):
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def __call__(self, batch):
+        with self.lock:
+            self.batches.append(batch.copy())
+        return batch * 2
+
+
+def test_flushes_as_soon_as_batch_is_full():
+    model = _RecordingModel()
+    # Batas tunggu sangat panjang: batch hanya bisa keluar karena penuh
+    batcher = MicroBatcher(model, max_batch_size=4, max_wait_ms=60_000)
+    try:
+        futures = [batcher.submit(np.array([[i, i + 1]])) for i in range(4)]
+        results = [future.result(timeout=5) for future in futures]
+    finally:
+        batcher.shutdown(timeout=5)
+
+    assert [batch.shape for batch in model.batches] == [(4, 2)]
+    for i, result in enumerate(results):
+        assert result.tolist() == [[2 * i, 2 * i + 2]]
+    stats = batcher.stats()
+    assert stats["recent_batches"][0]["flushed_by"] == "size"
+    assert stats["total_items"] == 4
+
+
+def test_flushes_partial_batch_after_max_wait():
+    model = _RecordingModel()
+    batcher = MicroBatcher(model, max_batch_size=32, max_wait_ms=50)
+    try:
+        futures = [batcher.submit(np.array([[i]])) for i in range(3)]
+        results = [future.result(timeout=5) for future in futures]
+    finally:
+        batcher.shutdown(timeout=5)
+
+    assert [batch.shape for batch in model.batches] == [(3, 1)]
+    assert [result.tolist() for result in results] == [[[0]], [[2]], [[4]]]
+    flushed = batcher.stats()["recent_batches"][0]
+    assert flushed["flushed_by"] == "timeout"
+    # Item tertua menunggu sampai batas max_wait_ms (toleransi resolusi timer)
+    assert flushed["queue_wait_ms"] >= 45
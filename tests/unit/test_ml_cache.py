@@ -0,0 +1,50 @@
+# tests/unit/test_ml_cache.py
+import types
+
+import pytest
+
+from app import ml_cache
+from app.ml_cache import PredictionCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(
+        ml_cache, "time", types.SimpleNamespace(monotonic=lambda: now[0])
+    )
+    return now
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = PredictionCache(ttl_seconds=60)
+    cache.set_model_version("v1")
+    key = cache.make_key("Resep Rendang")
+    cache.set(key, {"label": "kuliner"})
+
+    clock[0] += 59
+    # Spasi dan kapitalisasi berbeda tetap memakai entri yang sama
+    assert cache.get(cache.make_key("  resep   rendang")) == {"label": "kuliner"}
+
+    clock[0] += 1
+    assert cache.get(key) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expirations"]) == (1, 1, 1)
+    assert stats["size"] == 0
+
+
+def test_model_version_change_invalidates_entries(clock):
+    cache = PredictionCache()
+    cache.set_model_version("v1")
+    old_key = cache.make_key("resep rendang")
+    cache.set(old_key, {"label": "kuliner"})
+
+    cache.set_model_version("v1")  # versi sama: cache tetap
+    assert cache.get(old_key) == {"label": "kuliner"}
+
+    cache.set_model_version("v2")
+    assert cache.stats()["size"] == 0
+    assert cache.get(old_key) is None
+    # Kunci ikut versi model, jadi hasil v1 tidak bisa terbaca di bawah v2
+    assert cache.make_key("resep rendang") != old_key
+    assert cache.stats()["invalidations"] == 2
@@ -0,0 +1,96 @@
+# tests/unit/test_ml_embeddings.py
+import json
+
+import numpy as np
+
+from app.ml_embeddings import EmbeddingIndex, normalize_rows
+
+
+def _random_index(tmp_path, count=500, dim=16):
+    rng = np.random.default_rng(0)
+    ids = [f"content-{i}" for i in range(count)]
+    vectors = rng.standard_normal((count, dim)).astype(np.float32)
+    index = EmbeddingIndex(str(tmp_path))
+    index.upsert(ids, vectors, model_version="v1")
+    return index, ids, vectors
+
+
+def test_search_matches_brute_force_cosine(tmp_path):
+    index, ids, vectors = _random_index(tmp_path)
+    query = np.random.default_rng(1).standard_normal(vectors.shape[1])
+
+    results, approximate = index.search(query, k=5)
+
+    expected = np.argsort(-(normalize_rows(vectors) @ normalize_rows(query)))[:5]
+    assert not approximate
+    assert [item_id for item_id, _ in results] == [ids[i] for i in expected]
+
+
+def test_remove_and_reopen_keep_rows_consistent(tmp_path):
+    index, ids, vectors = _random_index(tmp_path)
+
+    assert index.remove(ids[:10] + ["unknown"]) == 10
+    reopened = EmbeddingIndex(str(tmp_path))
+
+    assert reopened.count == len(ids) - 10
+    assert ids[0] not in reopened
+    assert np.allclose(reopened.get_vector(ids[-1]), normalize_rows(vectors[-1]))
+    results, _ = reopened.search(vectors[-1], k=1, exclude_ids=[ids[-2]])
+    assert results[0][0] == ids[-1]
+
+
+def test_other_process_sees_writes_through_sorted_id_map(tmp_path):
+    index, ids, vectors = _random_index(tmp_path, count=50, dim=8)
+    reader = EmbeddingIndex(str(tmp_path))
+    rng = np.random.default_rng(2)
+
+    index.remove(ids[5:20:3] + ids[:2])
+    new_ids = ["a-new", "zz-new", "content-1"]
+    new_vectors = rng.standard_normal((3, 8)).astype(np.float32)
+    index.upsert(new_ids, new_vectors)
+
+    expected = dict(zip(ids, vectors))
+    for item_id in ids[5:20:3] + ids[:2]:
+        del expected[item_id]
+    expected.update(zip(new_ids, new_vectors))
+    assert reader.count == len(expected)
+    for item_id, vector in expected.items():
+        assert np.allclose(reader.get_vector(item_id), normalize_rows(vector))
+    assert ids[0] not in reader
+    assert reader.get_vector("missing") is None
+
+
+def test_index_without_sorted_id_map_is_upgraded_on_write(tmp_path):
+    index, ids, vectors = _random_index(tmp_path, count=50, dim=8)
+    meta_path = tmp_path / "meta.json"
+    meta = json.loads(meta_path.read_text())
+    del meta["sorted_ids"]
+    meta_path.write_text(json.dumps(meta))
+    for filename in ("ids_sorted.bin", "rows_sorted.i64"):
+        (tmp_path / filename).unlink()
+
+    legacy = EmbeddingIndex(str(tmp_path))
+    assert np.allclose(legacy.get_vector(ids[7]), normalize_rows(vectors[7]))
+
+    assert legacy.remove([ids[3]]) == 1
+    reopened = EmbeddingIndex(str(tmp_path))
+    assert reopened.meta["sorted_ids"]
+    assert ids[3] not in reopened
+    assert np.allclose(reopened.get_vector(ids[-1]), normalize_rows(vectors[-1]))
+
+
+def test_ivf_search_probing_every_list_matches_exact_search(tmp_path):
+    index, ids, vectors = _random_index(tmp_path)
+    index.train_ivf(num_lists=8, iterations=5)
+    query = np.random.default_rng(3).standard_normal(vectors.shape[1])
+
+    exact, exact_approximate = index.search(query, k=10, approximate=False)
+    ivf, ivf_approximate = index.search(query, k=10, nprobe=8, approximate=True)
+
+    assert not exact_approximate and ivf_approximate
+    assert [item_id for item_id, _ in ivf] == [item_id for item_id, _ in exact]
+    assert np.allclose([score for _, score in ivf], [score for _, score in exact])
+    # Baris yang ditambahkan setelah pelatihan langsung mendapat cluster
+    index.upsert(["baru"], [query])
+    ivf, _ = index.search(query, k=1, nprobe=8, approximate=True)
+    assert ivf[0][0] == "baru"
@@ -0,0 +1,52 @@
+# tests/unit/test_ml_inference_limiter.py
+import threading
+
+import numpy as np
+import pytest
+
+from app import ml_services
+from app.ml_services import LoadedModel, run_inference
+
+
+class _RecordingModel:
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict(self, batch, verbose=0):
+        self.batch_sizes.append(batch.shape[0])
+        return np.ones((batch.shape[0], 2))
+
+
+@pytest.fixture
+def limited_app(app, monkeypatch):
+    app.config.update(
+        ML_BATCHING_ENABLED=True,
+        ML_BATCH_MAX_SIZE=32,
+        ML_BATCH_MAX_WAIT_MS=200,
+        ML_MAX_CONCURRENT_INFERENCES=1,
+    )
+    monkeypatch.setattr(ml_services, "_inference_limiter", None)
+    return app
+
+
+def test_concurrency_limit_does_not_cap_micro_batch_size(limited_app):
+    model = _RecordingModel()
+    loaded = LoadedModel(model, "v1", "/models/v1", "keras")
+    results = []
+
+    def request():
+        with limited_app.app_context():
+            results.append(run_inference(np.zeros((1, 3)), loaded))
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+    finally:
+        loaded.close()
+
+    assert len(results) == 8
+    # Satu slot inferensi untuk satu batch berisi semua request yang menunggu
+    assert model.batch_sizes == [8]
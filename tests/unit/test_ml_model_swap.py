@@ -0,0 +1,63 @@
+# tests/unit/test_ml_model_swap.py
+import numpy as np
+import pytest
+
+from app import ml_services
+from app.ml_batcher import MicroBatcher
+from app.ml_services import LoadedModel, active_model
+
+
+class _ConstantModel:
+    def __init__(self, value):
+        self.value = value
+
+    def predict(self, batch, verbose=0):
+        return np.full((batch.shape[0], 1), self.value)
+
+
+def _loaded(version, value):
+    loaded = LoadedModel(_ConstantModel(value), version, f"/models/{version}", "keras")
+    loaded.batcher = MicroBatcher(loaded.predict, max_wait_ms=1)
+    return loaded
+
+
+@pytest.fixture
+def no_active_model(app, monkeypatch):
+    for name in ("_active_model", "ml_model", "model_version", "_prediction_cache"):
+        monkeypatch.setattr(ml_services, name, None)
+
+
+def test_retired_model_closes_only_after_in_flight_requests_finish(no_active_model):
+    old, new = _loaded("v1", 1.0), _loaded("v2", 2.0)
+    ml_services._activate_model(old)
+    batch = np.zeros((1, 3))
+
+    with active_model() as held:
+        with active_model() as held_too:
+            assert held is held_too is old
+            ml_services._activate_model(new)
+
+            # Request baru langsung memakai model baru
+            with active_model() as current:
+                assert current is new
+            assert not old.acquire()
+
+            # Request lama tetap selesai di model lama, yang belum ditutup
+            assert old.in_flight == 2
+            assert held.batcher.predict(batch, timeout=5).tolist() == [[1.0]]
+        assert not old._closed
+        assert held.batcher.predict(batch, timeout=5).tolist() == [[1.0]]
+
+    assert old.in_flight == 0
+    assert old._closed
+    with pytest.raises(RuntimeError):
+        old.batcher.submit(batch)
+    assert not new._closed
+    new.close()
+
+
+def test_retire_without_in_flight_requests_closes_immediately():
+    loaded = _loaded("v1", 1.0)
+    loaded.retire()
+    assert loaded._closed
+    assert not loaded.acquire()
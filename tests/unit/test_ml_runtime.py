@@ -0,0 +1,83 @@
+# tests/unit/test_ml_runtime.py
+import numpy as np
+import pytest
+
+keras = pytest.importorskip("tensorflow").keras
+
+from app.ml_cli import check_parity
+from app.ml_runtime import NumpyModel, export_numpy_bundle, make_embedder
+
+
+@pytest.mark.parametrize("mask_zero", [False, True])
+@pytest.mark.parametrize("pooling", ["GlobalAveragePooling1D", "GlobalMaxPooling1D"])
+def test_numpy_runtime_matches_keras(tmp_path, mask_zero, pooling):
+    model = keras.Sequential(
+        [
+            keras.Input(shape=(20,), dtype="int32"),
+            keras.layers.Embedding(100, 8, mask_zero=mask_zero),
+            getattr(keras.layers, pooling)(),
+            keras.layers.Dense(16, activation="relu"),
+            keras.layers.Dropout(0.5),
+            keras.layers.Dense(4, activation="softmax"),
+        ]
+    )
+    bundle_path = tmp_path / "model.npz"
+    export_numpy_bundle(model, bundle_path)
+
+    assert check_parity(model, NumpyModel.load(bundle_path), samples=32) < 1e-5
+
+
+def test_export_rejects_unsupported_layer(tmp_path):
+    model = keras.Sequential(
+        [
+            keras.Input(shape=(10, 4)),
+            keras.layers.LSTM(4),
+            keras.layers.Dense(2),
+        ]
+    )
+    with pytest.raises(ValueError):
+        export_numpy_bundle(model, tmp_path / "model.npz")
+
+
+def test_export_rejects_non_linear_models(tmp_path):
+    inputs = keras.Input(shape=(8,))
+    hidden = keras.layers.Dense(8, activation="relu")(inputs)
+    skip = keras.layers.Dense(8)(inputs)
+    branched = keras.Model(inputs, keras.layers.Dense(2)(hidden + skip))
+    shared = keras.layers.Dense(8)
+    reused = keras.Model(inputs, shared(shared(inputs)))
+
+    for model in (branched, reused):
+        with pytest.raises(ValueError):
+            export_numpy_bundle(model, tmp_path / "model.npz")
+
+
+def test_export_accepts_linear_functional_model(tmp_path):
+    inputs = keras.Input(shape=(8,))
+    hidden = keras.layers.Dense(16, activation="relu")(inputs)
+    model = keras.Model(inputs, keras.layers.Dense(4, activation="softmax")(hidden))
+    bundle_path = tmp_path / "model.npz"
+    export_numpy_bundle(model, bundle_path)
+
+    assert check_parity(model, NumpyModel.load(bundle_path), samples=8) < 1e-5
+
+
+def test_numpy_embedding_matches_keras_penultimate_layer(tmp_path):
+    model = keras.Sequential(
+        [
+            keras.Input(shape=(20,), dtype="int32"),
+            keras.layers.Embedding(100, 8),
+            keras.layers.GlobalAveragePooling1D(),
+            keras.layers.Dense(16, activation="relu"),
+            keras.layers.Dense(4, activation="softmax"),
+        ]
+    )
+    bundle_path = tmp_path / "model.npz"
+    export_numpy_bundle(model, bundle_path)
+    inputs = np.random.default_rng(0).integers(0, 100, size=(8, 20)).astype("int32")
+
+    expected = make_embedder(model)(inputs)
+    actual = NumpyModel.load(bundle_path).embed(inputs)
+
+    assert actual.shape == (8, 16)
+    assert np.max(np.abs(expected - actual)) < 1e-5
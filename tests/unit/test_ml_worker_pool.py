@@ -0,0 +1,100 @@
+# tests/unit/test_ml_worker_pool.py
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from app.ml_worker_pool import InferenceWorkerPool
+
+
+def _track_spawned(pool, monkeypatch):
+    spawned = []
+    spawn = pool._spawn
+
+    def tracking_spawn(index):
+        spawned.append(spawn(index))
+        return spawned[-1]
+
+    monkeypatch.setattr(pool, "_spawn", tracking_spawn)
+    return spawned
+
+
+def test_start_failure_stops_every_spawned_worker(tmp_path, monkeypatch):
+    pool = InferenceWorkerPool(
+        str(tmp_path / "tidak-ada.npz"), backend="numpy", num_workers=3
+    )
+    spawned = _track_spawned(pool, monkeypatch)
+
+    with pytest.raises(RuntimeError):
+        pool.start()
+
+    assert len(spawned) == 3
+    assert not any(handle.process.is_alive() for handle in spawned)
+    for handle in spawned:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=handle.input_shm.name)
+    assert pool._handles == [] and pool._free.empty()
+
+
+def test_chunks_by_output_row_size_when_output_is_larger(tmp_path):
+    keras = pytest.importorskip("tensorflow").keras
+    from app.ml_runtime import NumpyModel, export_numpy_bundle
+
+    # 4 token int32 = 16 byte/baris masuk, 64 probabilitas float32 = 256 byte keluar
+    model = keras.Sequential(
+        [
+            keras.Input(shape=(4,), dtype="int32"),
+            keras.layers.Embedding(50, 8),
+            keras.layers.GlobalAveragePooling1D(),
+            keras.layers.Dense(64, activation="softmax"),
+        ]
+    )
+    bundle_path = tmp_path / "model.npz"
+    export_numpy_bundle(model, bundle_path)
+    batch = np.random.default_rng(0).integers(0, 50, size=(20, 4)).astype("int32")
+
+    pool = InferenceWorkerPool(str(bundle_path), backend="numpy", shm_bytes=1024)
+    pool.start()
+    try:
+        assert pool._max_rows_per_call("predict", batch) == 4
+        assert pool._max_rows_per_call("embed", batch) == 32
+        output = pool.predict(batch)
+    finally:
+        pool.shutdown()
+
+    expected = NumpyModel.load(bundle_path).predict(batch)
+    assert np.allclose(output, expected, atol=1e-6)
+
+
+def test_crashed_worker_fails_fast_and_is_restarted_in_background(tmp_path):
+    keras = pytest.importorskip("tensorflow").keras
+    from app.ml_runtime import export_numpy_bundle
+
+    model = keras.Sequential(
+        [
+            keras.Input(shape=(4,), dtype="int32"),
+            keras.layers.Embedding(50, 8),
+            keras.layers.GlobalAveragePooling1D(),
+            keras.layers.Dense(3, activation="softmax"),
+        ]
+    )
+    bundle_path = tmp_path / "model.npz"
+    export_numpy_bundle(model, bundle_path)
+    batch = np.zeros((2, 4), dtype="int32")
+
+    pool = InferenceWorkerPool(str(bundle_path), backend="numpy").start()
+    try:
+        crashed = pool._handles[0]
+        crashed.process.kill()
+        crashed.process.join()
+
+        with pytest.raises((EOFError, OSError)):
+            pool.predict(batch)
+        # Error dikembalikan tanpa menunggu proses pengganti memuat model
+        assert pool.stats()["idle_workers"] == 0
+        # Request berikutnya menunggu proses pengganti selesai memuat model
+        assert pool.predict(batch).shape == (2, 3)
+        assert pool._handles[0] is not crashed
+        assert pool.stats()["alive_workers"] == 1
+    finally:
+        pool.shutdown()
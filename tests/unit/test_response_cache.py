@@ -0,0 +1,120 @@
+# tests/unit/test_response_cache.py
+import threading
+import time
+
+from app.core.cache import DatabaseTagVersions, MemoryCacheBackend, ResponseCache
+
+
+def _builder(calls, body="ok", delay=0.0):
+    def build():
+        calls.append(1)
+        time.sleep(delay)
+        return "response", {"s": 200, "m": "application/json", "b": body}, {}
+
+    return build
+
+
+def test_concurrent_misses_build_once():
+    cache = ResponseCache(MemoryCacheBackend())
+    calls, results = [], []
+
+    def request():
+        results.append(cache.get_or_build("/k?", ["t"], _builder(calls, delay=0.2)))
+
+    threads = [threading.Thread(target=request) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(entry["b"] == "ok" for entry, _, _ in results)
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["coalesced"] == 19
+
+
+def test_invalidating_tag_expires_only_tagged_entries():
+    cache = ResponseCache(MemoryCacheBackend())
+    calls = []
+    cache.get_or_build("/a?", ["category:1"], _builder(calls))
+    cache.get_or_build("/b?", ["category:2"], _builder(calls))
+
+    cache.invalidate(["category:1"])
+
+    assert cache.get_or_build("/a?", ["category:1"], _builder(calls))[2] == "MISS"
+    assert cache.get_or_build("/b?", ["category:2"], _builder(calls))[2] == "HIT"
+    assert len(calls) == 3
+
+
+def test_invalidation_during_build_does_not_store_stale_entry():
+    cache = ResponseCache(MemoryCacheBackend())
+    calls = []
+
+    def build():
+        calls.append(1)
+        # Data lama sudah dibaca, lalu handler tulis meng-commit & menginvalidasi
+        cache.invalidate(["content:1"])
+        return "response", {"s": 200, "m": "application/json", "b": "lama"}, {}
+
+    cache.get_or_build("/c?", ["content:1"], build)
+    entry, _, _ = cache.get_or_build("/c?", ["content:1"], _builder(calls, "baru"))
+    assert entry["b"] == "baru"
+
+
+def test_memory_backend_bounds_tag_versions_without_reviving_stale_entries():
+    backend = MemoryCacheBackend(max_tags=2)
+    cache = ResponseCache(backend)
+    calls = []
+    cache.get_or_build("/a?", ["content:1"], _builder(calls))
+
+    cache.invalidate(["content:1"])
+    for content_id in range(2, 100):
+        cache.invalidate([f"content:{content_id}"])
+
+    stats = backend.stats()
+    assert stats["tags"] == 2 and stats["tag_evictions"] == 97
+    # Versi content:1 sudah dibuang, tapi entri lamanya tetap basi
+    assert cache.get_or_build("/a?", ["content:1"], _builder(calls))[2] == "MISS"
+    assert cache.get_or_build("/a?", ["content:1"], _builder(calls))[2] == "HIT"
+    cache.invalidate(["content:1"])
+    assert cache.get_or_build("/a?", ["content:1"], _builder(calls))[2] == "MISS"
+    assert len(calls) == 3
+
+
+def test_database_tag_versions_invalidate_other_processes(app):
+    # Dua proses web (cache memori masing-masing) dan satu proses CLI penulis
+    web_1 = ResponseCache(MemoryCacheBackend(), tag_versions=DatabaseTagVersions())
+    web_2 = ResponseCache(MemoryCacheBackend(), tag_versions=DatabaseTagVersions())
+    cli = ResponseCache(MemoryCacheBackend(), tag_versions=DatabaseTagVersions())
+    calls = []
+
+    def status(cache):
+        return cache.get_or_build("/contents/1?", ["content:1"], _builder(calls))[2]
+
+    assert [status(web_1), status(web_2)] == ["MISS", "MISS"]
+    assert [status(web_1), status(web_2)] == ["HIT", "HIT"]
+
+    cli.invalidate(["content:1"])
+
+    assert [status(web_1), status(web_2)] == ["MISS", "MISS"]
+    assert len(calls) == 4
+
+
+def test_extra_tag_changed_during_build_does_not_store_fresh_entry():
+    cache = ResponseCache(MemoryCacheBackend())
+    calls = []
+
+    def build():
+        # Seperti add_cache_tags: versi dibaca sebelum nama kategori dimuat,
+        # lalu kategori diganti namanya sebelum respons selesai dibangun
+        extra_versions = cache.read_tag_versions(["category:1"])
+        cache.invalidate(["category:1"])
+        entry = {"s": 200, "m": "application/json", "b": "lama"}
+        return "response", entry, extra_versions
+
+    cache.get_or_build("/c?", ["content:1"], build)
+    assert cache.get_or_build("/c?", ["content:1"], _builder(calls))[2] == "MISS"
+
+    # Versi tag tambahan yang tidak bisa dibaca: respons tidak di-cache
+    cache.get_or_build("/d?", ["content:2"], lambda: ("response", {"b": "x"}, None))
+    assert cache.get_or_build("/d?", ["content:2"], _builder(calls))[2] == "MISS"
@@ -0,0 +1,80 @@
+# tests/unit/test_serializers.py
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.categories.models import Category
+from app.contents.models import Content, ContentCategory
+from app.core.utils import CONTENT, TARGET_PROGRESS, Serializer
+from app.targets.models import TargetProgress
+
+NOW = datetime(2024, 5, 1, 8, 30, 15, 123456)
+
+
+def _content():
+    content = Content(
+        id="c1",
+        title="Judul",
+        content_type="text",
+        data_url=None,
+        metadata_tags={"genre": ["drama"]},
+        user_id="u1",
+        created_at=NOW,
+        updated_at=NOW,
+    )
+    content.categories_assoc = [
+        ContentCategory(category=Category(id=f"k{i}", name=f"Kategori {i}"))
+        for i in range(2)
+    ]
+    return content
+
+
+@pytest.mark.parametrize("compiled", [True, False])
+def test_content_schema_matches_hand_written_dict(compiled):
+    content = _content()
+    serializer = CONTENT if compiled else Serializer(*CONTENT.fields, compiled=False)
+
+    assert serializer(content) == {
+        "id": "c1",
+        "title": "Judul",
+        "content_type": "text",
+        "data_url": None,
+        "metadata_tags": {"genre": ["drama"]},
+        "user_id": "u1",
+        "created_at": "2024-05-01T08:30:15.123456Z",
+        "updated_at": "2024-05-01T08:30:15.123456Z",
+        "categories": [
+            {"id": "k0", "name": "Kategori 0"},
+            {"id": "k1", "name": "Kategori 1"},
+        ],
+    }
+    assert serializer.many([content, content]) == [serializer(content)] * 2
+
+
+def test_only_keeps_optional_fields_and_rejects_unknown_keys():
+    entry = TargetProgress(
+        id="p1", status="done", user_id="u1", created_at=NOW, updated_at=NOW
+    )
+
+    assert TARGET_PROGRESS.only("content_id", "achieved_at", "user_id_recorder")(
+        entry
+    ) == {"content_id": None, "achieved_at": None, "user_id_recorder": "u1"}
+    with pytest.raises(KeyError):
+        TARGET_PROGRESS.only("password_hash")
+
+
+def test_json_provider_matches_stdlib_output(app):
+    payload = {"b": [1, 2.5, None, True], "a": {"nama": "Ünïcode"}, "c": NOW}
+
+    encoded = app.json.dumps(payload)
+    assert list(json.loads(encoded)) == ["a", "b", "c"]
+    assert json.loads(encoded)["c"] == NOW.isoformat()
+    # Tipe yang tidak didukung orjson tetap lewat `default` provider Flask
+    assert json.loads(app.json.dumps({"x": Decimal("1.5"), "y": 2**70})) == {
+        "x": "1.5",
+        "y": 2**70,
+    }
+    response = app.json.response({"a": 1})
+    assert response.get_data() == b'{"a":1}\n'